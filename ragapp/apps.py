@@ -1,7 +1,44 @@
 # ragapp/apps.py
+import logging
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+
+def _is_server_process() -> bool:
+    """
+    실제로 요청을 받는 프로세스인지.
+    - manage.py runserver: 자동 리로더 자식(RUN_MAIN=true) 또는 --noreload 일 때만
+    - manage.py 의 다른 명령(migrate/shell/makemigrations ...): 아님
+    - 그 외(gunicorn/uwsgi 등 WSGI/ASGI 진입): 서버로 본다
+    """
+    argv = sys.argv or [""]
+    if os.path.basename(argv[0]) != "manage.py":
+        return True
+    if len(argv) < 2 or argv[1] != "runserver":
+        return False
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in argv
+
 
 class RagappConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ragapp"
     verbose_name = "RAG App"
+
+    def ready(self):
+        # google-genai Client 미리 생성 → 첫 사용자 요청이 초기화 비용을 내지 않도록
+        # - GENAI_PREWARM=True 일 때만 (news_services 전체 import + 자격 증명 로드가 따라오므로 기본 끔)
+        # - 관리 명령/리로더 부모 프로세스에서는 하지 않음
+        # (자격 증명/패키지가 없어도 기동은 계속되어야 하므로 실패는 무시)
+        if not getattr(settings, "GENAI_PREWARM", False) or not _is_server_process():
+            return
+        try:
+            from .services.news_services import _genai_client
+
+            _genai_client()
+        except Exception as e:
+            log.debug("genai client prewarm skipped: %s", e)
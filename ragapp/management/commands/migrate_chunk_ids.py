@@ -0,0 +1,93 @@
+# ragapp/management/commands/migrate_chunk_ids.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from ragapp.services.chroma_store import bust_collection_cache, chroma_collection, chroma_upsert
+from ragapp.services.ingest import _idhash
+from ragapp.services.utils import sha
+
+# ID 접두사 → 해시 원문이 들어있는 메타 키 (ingest.indexto_chroma_safe 의 ID 규칙과 동일)
+_KEY_FIELD = {"answer": "question", "news": "url", "anslink": "url"}
+
+
+def _migrated_id(old_id: str, meta: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    예전 sha() 기반 청크 ID → _idhash(blake2b) 기반 ID. 옮길 대상이 아니면 None.
+    "<접두사>:...:<해시>:<접미사>" 에서 해시가 메타 원문의 sha() 와 일치할 때만 바꾼다.
+    """
+    parts = (old_id or "").split(":")
+    if len(parts) < 3:
+        return None
+    field = _KEY_FIELD.get(parts[0])
+    key = (meta or {}).get(field) if field else None
+    if not key or parts[-2] != sha(key):
+        return None
+    return ":".join(parts[:-2] + [_idhash(key), parts[-1]])
+
+
+class Command(BaseCommand):
+    help = "ingest 청크 ID 를 예전 sha() 해시에서 blake2b(_idhash) 로 한 번 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="실제로 옮기지 않고 대상 건수만 출력",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=256,
+            help="한 번에 읽고 옮길 청크 수 (기본 256)",
+        )
+
+    def handle(self, *args, **opts):
+        dry_run: bool = bool(opts.get("dry_run"))
+        batch = max(1, int(opts.get("batch") or 256))
+
+        bust_collection_cache()
+        col = chroma_collection()
+
+        # 1) 옮길 ID 목록을 먼저 모두 모은다 (옮기는 도중 offset 이 밀리지 않도록)
+        plan: Dict[str, str] = {}
+        offset = 0
+        while True:
+            data = col.get(limit=batch, offset=offset, include=["metadatas"])
+            ids = data.get("ids") or []
+            if not ids:
+                break
+            for cid, meta in zip(ids, data.get("metadatas") or []):
+                new_id = _migrated_id(cid, meta)
+                if new_id and new_id != cid:
+                    plan[cid] = new_id
+            offset += len(ids)
+
+        self.stdout.write(f"대상 청크: {len(plan)}개 (전체 {offset}개 중)")
+        if dry_run or not plan:
+            return
+
+        # 2) 임베딩은 그대로 두고 ID 만 바꿔 다시 넣은 뒤 예전 ID 삭제
+        old_ids: List[str] = list(plan)
+        moved = 0
+        for i in range(0, len(old_ids), batch):
+            part = old_ids[i:i + batch]
+            got = col.get(ids=part, include=["documents", "metadatas", "embeddings"])
+            got_ids = list(got.get("ids") or [])
+            if not got_ids:
+                continue
+            embs = np.asarray(got.get("embeddings"), dtype=np.float32)
+            chroma_upsert(
+                ids=[plan[c] for c in got_ids],
+                docs=list(got.get("documents") or []),
+                metas=list(got.get("metadatas") or []),
+                embs=embs,
+            )
+            col.delete(ids=got_ids)
+            moved += len(got_ids)
+            self.stdout.write(f"- {moved}/{len(old_ids)}")
+
+        self.stdout.write(self.style.SUCCESS(f"청크 ID 이전 완료: {moved}개"))
@@ -2,12 +2,11 @@
 from __future__ import annotations
 
 import os
-import io
 import json
 import secrets
 import logging
 from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterable, Iterator
 
 from django.shortcuts import render
 from django.http import JsonResponse, HttpRequest, HttpResponse
@@ -38,8 +37,9 @@ except Exception:  # pragma: no cover
     Feedback = None  # type: ignore
 
 from ragapp.services.safety import is_sensitive_question, safe_block_response
-from ragapp.services.utils import client_ip_for_log
-from ragapp.qa_data import find_best_faq_answer
+from ragapp.services.utils import client_ip_for_log, chunk_text_stream
+from ragapp.services.pdf_utils import iter_extract_text_from_pdf_bytes
+from ragapp.qa_data import find_best_faq_answer, get_faq_candidates, _score_faqs
 from ragapp.utils.legal import validate_required_consents
 
 # 서비스 레이어
@@ -1177,8 +1177,15 @@ def rag_qa_view(request: HttpRequest):
         })
 
     # ── FAQ 우선 매칭 ───────────────────────────────────────
+    # FAQ 점수는 한 번만 계산해서 FAQ 확정 판단과 RAG 단계의 FAQ 후보에 같이 쓴다
     try:
-        faq_answer = find_best_faq_answer(q)
+        faq_scored = _score_faqs(q)
+    except Exception as e:
+        log.warning("_score_faqs 예외: %s", e)
+        faq_scored = None
+
+    try:
+        faq_answer = find_best_faq_answer(q, scored=faq_scored)
     except Exception as e:
         log.warning("find_best_faq_answer 예외: %s", e)
         faq_answer = None
@@ -1239,6 +1246,13 @@ def rag_qa_view(request: HttpRequest):
         fallback_topk = max(topk + 5, int(getattr(settings, "RAG_FALLBACK_TOPK", 12)))
         max_sources = int(getattr(settings, "RAG_MAX_SOURCES", 8))
 
+        faq_cands = None
+        if faq_scored is not None:
+            try:
+                faq_cands = get_faq_candidates(q, top_k=3, scored=faq_scored)
+            except Exception as e:
+                log.warning("get_faq_candidates 예외: %s", e)
+
         res = rag_answer_grounded_with_history(
             q,
             history_list,
@@ -1246,6 +1260,7 @@ def rag_qa_view(request: HttpRequest):
             initial_topk=topk,
             fallback_topk=fallback_topk,
             max_sources=max_sources,
+            faq_cands=faq_cands,
         )
         if isinstance(res, tuple) and len(res) >= 2:
             rag_text, used_hits = res[0], res[1]
@@ -1666,19 +1681,6 @@ def upload_doc_view(request: HttpRequest):
     if not str(media_url).endswith("/"):
         media_url = str(media_url) + "/"
 
-    def _pdf_to_text(fp: io.BufferedIOBase) -> str:
-        try:
-            from pdfminer.high_level import extract_text  # pdfminer.six
-            return extract_text(fp) or ""
-        except Exception as e1:
-            try:
-                from pypdf import PdfReader
-                fp.seek(0)
-                reader = PdfReader(fp)
-                return "\n".join([(p.extract_text() or "") for p in reader.pages]).strip()
-            except Exception as e2:
-                raise RuntimeError(f"PDF 추출 실패(pdfminer/pypdf 필요): {e1 or e2}")
-
     def _chunk(text: str, maxlen: int = 1600, overlap: int = 200) -> List[str]:
         t = (text or "").strip()
         if not t:
@@ -1718,99 +1720,114 @@ def upload_doc_view(request: HttpRequest):
     if request.FILES.get("file"):
         files.append(request.FILES["file"])
 
-    extracted: List[Tuple[str, str]] = []
+    size = int(getattr(settings, "EMBED_CHUNK_SIZE", 1600))
+    overlap = int(getattr(settings, "EMBED_CHUNK_OVERLAP", 200))
+    # 이 개수만큼 모일 때마다 임베딩 → 업서트 (문서 전체 청크를 메모리에 쥐고 있지 않도록)
+    window = 256
+
+    # (파일명, 청크 이터러블) — PDF 는 페이지 스트림에서 바로 자르는 지연 제너레이터
+    sources: List[Tuple[str, Iterable[str]]] = []
     file_errors: List[str] = []
 
     if pasted_text:
-        extracted.append(("__pasted__.txt", pasted_text))
+        sources.append(("__pasted__.txt", _chunk(pasted_text, maxlen=size, overlap=overlap)))
 
     for f in files:
         try:
             name = getattr(f, "name", "uploaded")
             ext = os.path.splitext(name.lower())[1]
-            buf = io.BytesIO(f.read())
+            data = f.read()
             if ext == ".pdf":
-                text = _pdf_to_text(buf)
+                chunks = chunk_text_stream(
+                    iter_extract_text_from_pdf_bytes(data), size=size, overlap=overlap
+                )
             else:
                 try:
-                    text = buf.getvalue().decode("utf-8", errors="ignore")
+                    text = data.decode("utf-8", errors="ignore")
                 except Exception:
-                    text = buf.getvalue().decode("cp949", errors="ignore")
-            text = (text or "").strip()
-            if not text:
-                file_errors.append(f"{name}: 추출된 텍스트가 없습니다.")
-            else:
-                extracted.append((name, text))
+                    text = data.decode("cp949", errors="ignore")
+                chunks = _chunk(text, maxlen=size, overlap=overlap)
+            sources.append((name, chunks))
         except Exception as e:
             log.exception("파일 처리 실패: %s", getattr(f, "name", "?"))
             file_errors.append(f"{getattr(f,'name','?')}: {e}")
 
-    if not extracted:
-        messages.error(request, "유효한 텍스트가 없어 인덱싱을 진행하지 않았습니다.")
-        return render(request, "ragadmin/upload_doc.html", {
-            "error_msg": "유효한 텍스트가 없어 인덱싱을 진행하지 않았습니다.",
-            "file_errors": file_errors,
-            "MEDIA_URL": str(media_url),
-            "MEDIA_ROOT": str(media_root),
-            "VECTOR_DB_PATH": _vector_db_path(),
-            "CHROMA_COLLECTION": getattr(settings, "CHROMA_COLLECTION", ""),
-            "CHROMA_DB_DIR": getattr(settings, "CHROMA_DB_DIR", ""),
-        })
+    def _checked(name: str, chunks: Iterable[str]) -> Iterator[str]:
+        # 추출/청킹 중 예외(손상된 PDF 등)는 그 파일의 오류로만 기록하고 다음 파일로 진행.
+        # 임베딩/업서트 예외는 소비하는 쪽에서 나므로 여기서 잡히지 않는다.
+        try:
+            yield from chunks
+        except Exception as e:
+            log.exception("파일 처리 실패: %s", name)
+            file_errors.append(f"{name}: {e}")
 
-    size = int(getattr(settings, "EMBED_CHUNK_SIZE", 1600))
-    overlap = int(getattr(settings, "EMBED_CHUNK_OVERLAP", 200))
     now_iso = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    all_ids: List[str] = []
-    all_docs: List[str] = []
-    all_metas: List[Dict] = []
     from collections import defaultdict
     per_file_cnt = defaultdict(int)
+    total = 0
 
     from ragapp.services.vector_store import _sha as _sha_vs  # 안전 해시
 
-    for name, text in extracted:
-        chunks = _chunk(text, maxlen=size, overlap=overlap)
-        doc_id = _sha_vs(f"{name}::{now_iso}")[:20]
-        for i, ch in enumerate(chunks):
-            meta = {
-                "title": common_title or name,
-                "file_name": name,
-                "source": source_label or "upload",
-                "doc_id": doc_id,
-                "chunk_index": i,
-                "ingested_at": now_iso,
-            }
-            all_docs.append(ch)
-            all_metas.append(meta)
-            all_ids.append(_sha_vs(f"{doc_id}::{i}")[:64])
-            per_file_cnt[name] += 1
-
-    if not all_docs:
-        messages.warning(request, "청킹 결과가 비어 업서트를 진행하지 않았습니다.")
-        return render(request, "ragadmin/upload_doc.html", {
-            "error_msg": "청킹 결과가 비어 업서트를 진행하지 않았습니다.",
-            "file_errors": file_errors,
-            "MEDIA_URL": str(media_url),
-            "MEDIA_ROOT": str(media_root),
-            "VECTOR_DB_PATH": _vector_db_path(),
-            "CHROMA_COLLECTION": getattr(settings, "CHROMA_COLLECTION", ""),
-            "CHROMA_DB_DIR": getattr(settings, "CHROMA_DB_DIR", ""),
-        })
-
     # 임베딩 + 업서트
     try:
         try:
             from ragapp.services.vertex_embed import embed_texts as _embed_texts  # Vertex 우선
         except Exception:
             from ragapp.services.news_services import _embed_texts       # 폴백
-        embs = _embed_texts(all_docs)
 
         try:
             from ragapp.services.vdb_store import vdb_upsert as _vup
         except Exception:
             from ragapp.services.vector_store import vdb_upsert as _vup
-        _vup(all_ids, all_docs, all_metas, embs)
+
+        w_ids: List[str] = []
+        w_docs: List[str] = []
+        w_metas: List[Dict] = []
+
+        def _flush():
+            _vup(w_ids, w_docs, w_metas, _embed_texts(w_docs))
+            w_ids.clear()
+            w_docs.clear()
+            w_metas.clear()
+
+        for name, chunks in sources:
+            doc_id = _sha_vs(f"{name}::{now_iso}")[:20]
+            cnt = 0
+            n_err = len(file_errors)
+            for i, ch in enumerate(_checked(name, chunks)):
+                w_docs.append(ch)
+                w_metas.append({
+                    "title": common_title or name,
+                    "file_name": name,
+                    "source": source_label or "upload",
+                    "doc_id": doc_id,
+                    "chunk_index": i,
+                    "ingested_at": now_iso,
+                })
+                w_ids.append(_sha_vs(f"{doc_id}::{i}")[:64])
+                cnt += 1
+                if len(w_ids) >= window:
+                    _flush()
+            if cnt:
+                per_file_cnt[name] += cnt
+                total += cnt
+            elif len(file_errors) == n_err:  # 추출 오류가 따로 기록되지 않은 경우만
+                file_errors.append(f"{name}: 추출된 텍스트가 없습니다.")
+        if w_ids:
+            _flush()
+
+        if not total:
+            messages.error(request, "유효한 텍스트가 없어 인덱싱을 진행하지 않았습니다.")
+            return render(request, "ragadmin/upload_doc.html", {
+                "error_msg": "유효한 텍스트가 없어 인덱싱을 진행하지 않았습니다.",
+                "file_errors": file_errors,
+                "MEDIA_URL": str(media_url),
+                "MEDIA_ROOT": str(media_root),
+                "VECTOR_DB_PATH": _vector_db_path(),
+                "CHROMA_COLLECTION": getattr(settings, "CHROMA_COLLECTION", ""),
+                "CHROMA_DB_DIR": getattr(settings, "CHROMA_DB_DIR", ""),
+            })
 
         result_summaries = [
             {
@@ -1822,7 +1839,7 @@ def upload_doc_view(request: HttpRequest):
             for fname, cnt in per_file_cnt.items()
         ]
 
-        messages.success(request, f"인덱싱 완료: 총 {len(all_ids)} 청크 업서트")
+        messages.success(request, f"인덱싱 완료: 총 {total} 청크 업서트")
         return render(request, "ragadmin/upload_doc.html", {
             "error_msg": None,
             "file_errors": file_errors,
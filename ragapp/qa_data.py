@@ -1,8 +1,10 @@
 # ragapp/qa_data.py
 
 from __future__ import annotations
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Set, Tuple
 import threading
+import heapq
 import math
 import re  # (안 써도 괜찮음. 네 원본에 있었으니까 그냥 둠)
 
@@ -60,12 +62,16 @@ QA_PAIRS: List[Dict[str, str]] = [
 # -----------------------------------------
 # 2) 캐시 구조
 # -----------------------------------------
-_QA_CACHE = {
-    "ready": False,
-    "questions": [],    # type: List[str]
-    "answers": [],      # type: List[str]
-    "embeddings": [],   # type: List[List[float]]
-}
+@dataclass(slots=True)
+class _QACache:
+    ready: bool = False
+    questions: List[str] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+    question_token_sets: List[Set[str]] = field(default_factory=list)  # 질문별 토큰 집합, 미리 계산
+
+
+_QA_CACHE = _QACache()
 _QA_LOCK = threading.Lock()
 
 
@@ -83,7 +89,8 @@ def _lazy_embed_texts(text_list: List[str]) -> List[List[float]]:
     except Exception:
         # 예전 배치 호환
         from ragapp.news_views.news_services import _embed_texts as _real_embed_texts
-    return _real_embed_texts(text_list)
+    # _embed_texts 는 float32 배열을 돌려주므로, 순수 파이썬 루프(_cosine_sim)용 리스트로 여기서만 변환
+    return [v.tolist() if hasattr(v, "tolist") else list(v) for v in _real_embed_texts(text_list)]
 
 
 def _prepare_qa_cache():
@@ -93,11 +100,11 @@ def _prepare_qa_cache():
     이제는 DB FaqEntry(is_active=True)에서 가져와서 캐시에 넣는다.
 
     서버 부팅 이후 첫 호출 때만 로딩해서 _QA_CACHE에 올리고
-    _QA_CACHE["ready"] = True 로 플래그 세움.
+    _QA_CACHE.ready = True 로 플래그 세움.
     (운영 중 FAQ를 바꾸면 서버 재시작 or 이 플래그를 수동으로 False로 만드는 방법으로 갱신 가능)
     """
     with _QA_LOCK:
-        if _QA_CACHE["ready"]:
+        if _QA_CACHE.ready:
             return
 
         # DB에서 활성 FAQ만 뽑는다
@@ -122,11 +129,15 @@ def _prepare_qa_cache():
         else:
             embs = []
 
+        # 질문 토큰 집합은 질의마다 다시 만들 필요 없으니 여기서 한 번만 계산
+        token_sets = [set(_tokenize(q)) for q in questions]
+
         # 캐시에 저장
-        _QA_CACHE["questions"]  = questions
-        _QA_CACHE["answers"]    = answers
-        _QA_CACHE["embeddings"] = embs
-        _QA_CACHE["ready"]      = True
+        _QA_CACHE.questions  = questions
+        _QA_CACHE.answers    = answers
+        _QA_CACHE.embeddings = embs
+        _QA_CACHE.question_token_sets = token_sets
+        _QA_CACHE.ready      = True
 
 
 def _cosine_sim(vec_a: List[float], vec_b: List[float]) -> float:
@@ -136,49 +147,69 @@ def _cosine_sim(vec_a: List[float], vec_b: List[float]) -> float:
     if not vec_a or not vec_b:
         return 0.0
 
-    dot = 0.0
-    limit = min(len(vec_a), len(vec_b))
-    for i in range(limit):
-        dot += vec_a[i] * vec_b[i]
-
-    na = math.sqrt(sum(x * x for x in vec_a))
-    nb = math.sqrt(sum(x * x for x in vec_b))
-    if na == 0.0 or nb == 0.0:
+    # 내적/노름을 한 번의 순회로 같이 누적 (리스트를 세 번 훑지 않게)
+    dot = na2 = nb2 = 0.0
+    for x, y in zip(vec_a, vec_b):
+        dot += x * y
+        na2 += x * x
+        nb2 += y * y
+
+    # 길이가 다르면 남는 꼬리도 노름에는 포함 (기존 동작 유지)
+    la, lb = len(vec_a), len(vec_b)
+    if la != lb:
+        for x in vec_a[lb:]:
+            na2 += x * x
+        for y in vec_b[la:]:
+            nb2 += y * y
+
+    if na2 == 0.0 or nb2 == 0.0:
         return 0.0
 
-    return dot / (na * nb)
+    return dot / math.sqrt(na2 * nb2)
 
 
-def find_best_faq_answer(
-    user_question: str,
-    threshold: float = 0.80,
-    min_overlap_ratio: float = 0.3,
-) -> Optional[str]:
+# 최종 점수 = 임베딩 유사도와 토큰 겹침 비율을 섞어서 계산
+_WEIGHT_SIM = 0.7               # 임베딩 유사도 가중치
+_WEIGHT_OVERLAP = 0.3           # 토큰 겹침 비율 가중치
+
+FaqScore = Tuple[float, int, float, float]  # (최종 점수, FAQ idx, 코사인 유사도, 토큰 겹침 비율)
+
+
+def _score_faqs(user_question: str) -> List[FaqScore]:
     """
-    1) 임베딩 유사도가 threshold 이상인지 확인
-    2) + 질문 단어가 실제로도 어느 정도 겹치는지 확인(min_overlap_ratio)
+    find_best_faq_answer / get_faq_candidates 공통 계산.
+    사용자 질문을 1번만 임베딩해서 모든 FAQ에 대해 점수를 매긴다.
 
-    min_overlap_ratio:
-      - 사용자 질문 토큰 중에서 FAQ 질문 토큰과 겹치는 비율
-      - 예: 사용자 토큰 5개 중 2개가 FAQ에도 있으면 2/5 = 0.4
-      - 이 비율이 너무 낮으면(거의 안 겹치면) FAQ로 안 친다.
+    - 질문이 비었거나, 토큰이 어떤 FAQ와도 안 겹치면 임베딩 없이 빈 리스트
+    - 정렬은 안 함 (호출하는 쪽마다 기준이 다름)
+    - 채팅 파이프라인에서 두 함수를 연달아 부를 땐
+      이 결과를 scored= 로 넘겨서 재계산을 피할 수 있다.
     """
     if not user_question.strip():
-        return None
+        return []
 
     _prepare_qa_cache()
 
     # 캐시에 FAQ가 1개도 없을 수 있음
-    if not _QA_CACHE["questions"]:
-        return None
+    if not _QA_CACHE.questions:
+        return []
+
+    # 0) 값싼 토큰 겹침 검사 먼저: 어떤 FAQ와도 단어가 안 겹치면
+    #    두 함수 모두 어차피 탈락이므로 임베딩 호출 자체를 생략
+    user_token_set = set(_tokenize(user_question))
+    if not user_token_set:
+        return []
+    token_sets_local = _QA_CACHE.question_token_sets
+    if not any(user_token_set & ts for ts in token_sets_local):
+        return []
 
     # 1) 유저 질문 임베딩 (예외 방지)
     try:
         user_vec_list = _lazy_embed_texts([user_question])
     except Exception:
-        return None
+        return []
     if not user_vec_list or not user_vec_list[0]:
-        return None
+        return []
     user_vec = user_vec_list[0]
 
     # 1.5) 캐시 벡터 차원 확인 → 다르면 재임베딩 시도(가능할 때만)
@@ -188,53 +219,83 @@ def find_best_faq_answer(
         except Exception:
             return -1
 
-    cached_vecs = _QA_CACHE["embeddings"] or []
+    cached_vecs = _QA_CACHE.embeddings or []
     need_reembed = (not cached_vecs) or (_dim(cached_vecs[0]) != _dim(user_vec))
-    if need_reembed and _QA_CACHE["questions"]:
+    if need_reembed and _QA_CACHE.questions:
         try:
-            new_vecs = _lazy_embed_texts(_QA_CACHE["questions"])
+            new_vecs = _lazy_embed_texts(_QA_CACHE.questions)
             # 차원 맞으면 캐시 갱신
             if new_vecs and _dim(new_vecs[0]) == _dim(user_vec):
                 with _QA_LOCK:
-                    _QA_CACHE["embeddings"] = new_vecs
+                    _QA_CACHE.embeddings = new_vecs
                 cached_vecs = new_vecs
         except Exception:
             # 재임베딩 실패 시 기존 값으로 진행(유사도는 0으로 나올 수 있음)
             pass
 
-    best_idx = -1
-    best_sim = -1.0
+    # 2) 유사도 + 토큰 겹침 비율 (루프 안 전역/속성 조회를 피하려고 로컬로 당겨둠)
+    cosine_fn = _cosine_sim
+    n_token_sets = len(token_sets_local)
+    n_user = float(len(user_token_set))
 
-    # 2) 가장 비슷한 FAQ 후보 찾기 (임베딩 기준)
+    scored: List[FaqScore] = []
     for i, q_vec in enumerate(cached_vecs):
-        sim = _cosine_sim(user_vec, q_vec)
-        if sim > best_sim:
-            best_sim = sim
-            best_idx = i
+        sim = cosine_fn(user_vec, q_vec)
+        faq_token_set = token_sets_local[i] if i < n_token_sets else None
+        overlap_ratio = (len(user_token_set & faq_token_set) / n_user) if faq_token_set else 0.0
+        final_score = _WEIGHT_SIM * sim + _WEIGHT_OVERLAP * overlap_ratio
+        scored.append((final_score, i, sim, overlap_ratio))
 
-    # 3) 임계치보다 낮으면 그냥 FAQ 포기 -> RAG로 넘김
-    if best_idx < 0 or best_sim < threshold:
+    return scored
+
+
+def find_best_faq_answer(
+    user_question: str,
+    threshold: float = 0.80,
+    min_overlap_ratio: float = 0.3,
+    scored: Optional[List[FaqScore]] = None,
+) -> Optional[str]:
+    """
+    1) 임베딩 유사도가 threshold 이상인지 확인
+    2) + 질문 단어가 실제로도 어느 정도 겹치는지 확인(min_overlap_ratio)
+
+    min_overlap_ratio:
+      - 사용자 질문 토큰 중에서 FAQ 질문 토큰과 겹치는 비율
+      - 예: 사용자 토큰 5개 중 2개가 FAQ에도 있으면 2/5 = 0.4
+      - 이 비율이 너무 낮으면(거의 안 겹치면) FAQ로 안 친다.
+
+    scored: 이미 _score_faqs() 로 계산한 결과가 있으면 넘겨서 재임베딩 생략
+    """
+    if scored is None:
+        scored = _score_faqs(user_question)
+    if not scored:
         return None
 
-    # 4) 추가 안전장치: 실제 단어 겹치는지 검사
-    user_toks = _tokenize(user_question)
-    faq_q_toks = _tokenize(_QA_CACHE["questions"][best_idx])
+    # 2) 가장 비슷한 FAQ 후보 찾기 (임베딩 기준)
+    _, best_idx, best_sim, overlap_ratio = max(scored, key=lambda x: x[2])
 
-    if not user_toks or not faq_q_toks:
+    # 3) 임계치보다 낮으면 그냥 FAQ 포기 -> RAG로 넘김
+    if best_sim < threshold:
         return None
 
-    inter = set(user_toks) & set(faq_q_toks)
-    overlap_ratio = (len(inter) / len(set(user_toks))) if user_toks else 0.0
+    # 4) 추가 안전장치: 실제 단어 겹치는지 검사
+    token_sets = _QA_CACHE.question_token_sets
+    if best_idx >= len(token_sets) or not token_sets[best_idx]:
+        return None
 
     # 단어가 거의 안 겹치면 "우연히 임베딩이 비슷한 것"일 가능성이 큼 -> FAQ로 안 본다
     if overlap_ratio < min_overlap_ratio:
         return None
 
     # 여기까지 통과하면 진짜 FAQ로 본다
-    return _QA_CACHE["answers"][best_idx]
+    return _QA_CACHE.answers[best_idx]
 
 
-def get_faq_candidates(user_question: str, top_k: int = 3) -> List[dict]:
+def get_faq_candidates(
+    user_question: str,
+    top_k: int = 3,
+    scored: Optional[List[FaqScore]] = None,
+) -> List[dict]:
     """
     FAQ 확정(threshold 통과)까지는 아니어도,
     RAG 컨텍스트로 줄만한 '유력 FAQ 후보'들을 점수 순으로 top_k개 뽑아준다.
@@ -255,90 +316,23 @@ def get_faq_candidates(user_question: str, top_k: int = 3) -> List[dict]:
     - 사용자 질문과 FAQ 질문이 '토큰이 1개도 안 겹치면' 후보에서 제외.
     - 최종 점수(best_score)가 너무 낮으면(아래 MIN_BEST_SCORE)
       "FAQ 후보 없음"으로 보고 빈 리스트 반환.
+    - scored: 이미 _score_faqs() 로 계산한 결과가 있으면 넘겨서 재임베딩 생략
     """
-
-    if not user_question.strip():
-        return []
-
-    _prepare_qa_cache()
-
-    # 캐시에 FAQ가 없으면 빈 리스트
-    if not _QA_CACHE["questions"]:
-        return []
-
-    # 0) 사용자 토큰
-    user_tokens = _tokenize(user_question)
-    user_token_set = set(user_tokens)
-    if not user_token_set:
-        return []
-
-    # 1) 사용자 질문 임베딩 (예외 방지)
-    try:
-        user_vec_list = _lazy_embed_texts([user_question])
-    except Exception:
-        return []
-    if not user_vec_list or not user_vec_list[0]:
-        return []
-    user_vec = user_vec_list[0]
-
-    # 1.5) 차원 정합성 확인 → 필요 시 캐시 재임베딩
-    def _dim(v):
-        try:
-            return len(v)
-        except Exception:
-            return -1
-
-    cached_vecs = _QA_CACHE["embeddings"] or []
-    need_reembed = (not cached_vecs) or (_dim(cached_vecs[0]) != _dim(user_vec))
-    if need_reembed and _QA_CACHE["questions"]:
-        try:
-            new_vecs = _lazy_embed_texts(_QA_CACHE["questions"])
-            if new_vecs and _dim(new_vecs[0]) == _dim(user_vec):
-                with _QA_LOCK:
-                    _QA_CACHE["embeddings"] = new_vecs
-                cached_vecs = new_vecs
-        except Exception:
-            pass
-
-    if not cached_vecs:
-        return []
-
-    # 2) 유사도 + 토큰 겹침 기반 점수 계산
-    MIN_TOKEN_OVERLAP = 1          # 공통 토큰이 1개 이상 있어야 함
     MIN_BEST_SCORE = 0.55          # 최종 점수(0~1) 이 기준보다 낮으면 FAQ 후보 없음으로 처리
-    WEIGHT_SIM = 0.7               # 임베딩 유사도 가중치
-    WEIGHT_OVERLAP = 0.3           # 토큰 겹침 비율 가중치
 
-    scored: List[tuple[float, int, float, float]] = []
-    for i, q_vec in enumerate(cached_vecs):
-        sim = _cosine_sim(user_vec, q_vec)
-
-        faq_q = _QA_CACHE["questions"][i]
-        faq_tokens = _tokenize(faq_q)
-        if not faq_tokens:
-            continue
-
-        faq_token_set = set(faq_tokens)
-        inter_tokens = user_token_set & faq_token_set
-        overlap_count = len(inter_tokens)
-
-        # 👉 공통 토큰이 하나도 없으면, 의미상 완전히 다른 질문이므로 스킵
-        if overlap_count < MIN_TOKEN_OVERLAP:
-            continue
-
-        overlap_ratio = overlap_count / float(len(user_token_set)) if user_token_set else 0.0
-
-        # 최종 점수 = 임베딩 유사도와 토큰 겹침 비율을 섞어서 계산
-        final_score = WEIGHT_SIM * sim + WEIGHT_OVERLAP * overlap_ratio
-
-        scored.append((final_score, i, sim, overlap_ratio))
+    if scored is None:
+        scored = _score_faqs(user_question)
 
+    # 👉 공통 토큰이 하나도 없으면(겹침 비율 0), 의미상 완전히 다른 질문이므로 스킵
+    scored = [row for row in scored if row[3] > 0.0]
     if not scored:
         # 어떤 FAQ도 질문과 공통 토큰이 없거나 점수가 너무 낮은 경우
         return []
 
-    # 점수 높은 순으로 정렬
-    scored.sort(key=lambda x: x[0], reverse=True)
+    max_k = max(1, int(top_k))
+
+    # 점수 높은 순 상위 max_k 개만 (전체 정렬 대신 힙, sort(reverse=True)[:max_k] 와 같은 결과)
+    scored = heapq.nlargest(max_k, scored, key=lambda x: x[0])
 
     best_final_score = scored[0][0]
     if best_final_score < MIN_BEST_SCORE:
@@ -346,11 +340,12 @@ def get_faq_candidates(user_question: str, top_k: int = 3) -> List[dict]:
         return []
 
     results: List[dict] = []
-    max_k = max(1, int(top_k))
 
-    for final_score, idx, sim, overlap_ratio in scored[:max_k]:
-        fq = _QA_CACHE["questions"][idx]
-        fa = _QA_CACHE["answers"][idx]
+    questions_local = _QA_CACHE.questions
+    answers_local = _QA_CACHE.answers
+    for final_score, idx, sim, overlap_ratio in scored:
+        fq = questions_local[idx]
+        fa = answers_local[idx]
 
         # 🔒 민감한 답변이면 여기서 제외 (예: 생일/전화 등)
         if "생일" in fq or "생일" in fa or "전화" in fq or "전화" in fa:
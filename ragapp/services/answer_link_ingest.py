@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse
 
 import requests
 from django.conf import settings
 
+# 선택: lxml 있으면 C 파서(libxml2)로 제목/메타 설명 추출 (가장 빠름)
+try:
+    import lxml.html as _lxml_html  # type: ignore
+except Exception:  # pragma: no cover
+    _lxml_html = None  # type: ignore
+
 # 선택: bs4 있으면 제목/메타 설명을 좀 더 정확하게 뽑음
 try:
     from bs4 import BeautifulSoup  # type: ignore
@@ -41,6 +49,7 @@ _SAFE_MODE_ENABLED = bool(getattr(settings, "SAFE_MODE_ENABLED", True))
 # 로봇/도메인 통제
 _RESPECT_ROBOTS = bool(getattr(settings, "RESPECT_ROBOTS", True))
 _ALLOWLIST = [d.lower() for d in getattr(settings, "ALLOWLIST_DOMAINS", []) or []]
+_ALLOWLIST_SET = frozenset(_ALLOWLIST)
 _RATE_PER_HOST = float(getattr(settings, "CRAWL_RATE_LIMIT_PER_HOST", 1.0))  # e.g. 1 req/sec/host
 
 # 스니펫 길이 제한
@@ -49,9 +58,16 @@ _SNIPPET_LEN = _MAX_EXCERPT if _MAX_EXCERPT > 0 else 500
 
 # 호스트별 마지막 요청시각(초간단 레이트리밋)
 _last_hit: Dict[str, float] = {}
+_last_hit_lock = threading.Lock()
+
+# 호스트 동시 처리 상한
+_MAX_HOST_WORKERS = 8
 
-# robots 캐시
+# robots 캐시 (robots_url → 파서). 같은 robots.txt 를 여러 스레드가 동시에 받지 않도록 키별 락
 _robots_cache: Dict[str, robotparser.RobotFileParser] = {}
+_robots_locks: Dict[str, threading.Lock] = {}
+_robots_guard = threading.Lock()
+_robots_prewarmed = False
 
 
 # ─────────────────────────────────────────────────────────────
@@ -70,46 +86,154 @@ def _is_allowed_domain(u: str) -> bool:
     if not _ALLOWLIST:
         return True  # 화이트리스트 비어있으면 전체 허용(프로덕션에선 채우는 걸 권장)
     d = _domain(u)
-    # 서브도메인 포함 허용: endswith 체크
-    return any(d == w or d.endswith("." + w) for w in _ALLOWLIST)
+    if not d:
+        return False
+    # 서브도메인 포함 허용: a.b.example.com → a.b.example.com / b.example.com / example.com / com
+    # 각 접미사를 set 조회 (허용 목록 길이와 무관하게 라벨 수만큼만 검사)
+    parts = d.split(".")
+    return any(".".join(parts[i:]) in _ALLOWLIST_SET for i in range(len(parts)))
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def _canonical_url(u: str) -> str:
+    """
+    중복 판정용 정규화 키.
+    - scheme/host 소문자, 기본 포트 제거
+    - fragment 제거, 쿼리 파라미터 정렬
+    - 끝 '/' 정리(루트 제외)
+    """
+    try:
+        p = urlparse(u.strip())
+        scheme = (p.scheme or "").lower()
+        host = (p.hostname or "").lower()
+        netloc = host
+        if p.port and p.port != _DEFAULT_PORTS.get(scheme):
+            netloc = f"{host}:{p.port}"
+        path = p.path or "/"
+        if len(path) > 1:
+            path = path.rstrip("/") or "/"
+        query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+        return p._replace(scheme=scheme, netloc=netloc, path=path, query=query, fragment="").geturl()
+    except Exception:
+        return u
+
+def _dedupe_urls(urls: List[str]) -> List[str]:
+    """정규화 키 기준 중복 제거(처음 나온 원본 URL 유지)."""
+    seen = set()
+    out: List[str] = []
+    for u in urls:
+        key = _canonical_url(u)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(u)
+    return out
+
+def _group_by_host(urls: List[str]) -> Dict[str, List[str]]:
+    """호스트별로 묶기(입력 순서 유지). 호스트 안에서는 순차, 호스트끼리는 병렬로 처리."""
+    buckets: Dict[str, List[str]] = {}
+    for u in urls:
+        buckets.setdefault(_domain(u), []).append(u)
+    return buckets
 
 def _respect_rate_limit(u: str):
     host = _domain(u)
     if not host or _RATE_PER_HOST <= 0:
         return
     now = time.time()
-    last = _last_hit.get(host, 0.0)
+    with _last_hit_lock:
+        last = _last_hit.get(host, 0.0)
     min_interval = 1.0 / _RATE_PER_HOST
     wait = last + min_interval - now
     if wait > 0:
         time.sleep(min(wait, 1.0))
-    _last_hit[host] = time.time()
+    with _last_hit_lock:
+        _last_hit[host] = time.time()
+
+def _load_robots(robots_url: str) -> robotparser.RobotFileParser:
+    rp = _robots_cache.get(robots_url)
+    if rp is not None:
+        return rp
+    with _robots_guard:
+        lock = _robots_locks.setdefault(robots_url, threading.Lock())
+    with lock:
+        rp = _robots_cache.get(robots_url)
+        if rp is not None:
+            return rp  # 다른 스레드가 먼저 받아둠
+        # requests로 로드 후 robotparser에 주입(타임아웃 제어)
+        try:
+            r = requests.get(robots_url, headers={"User-Agent": _UA}, timeout=_TIMEOUT)
+            txt = r.text if r.status_code == 200 else ""
+        except Exception:
+            txt = ""
+        rp = robotparser.RobotFileParser()
+        rp.parse(txt.splitlines())
+        _robots_cache[robots_url] = rp
+    return rp
+
+def _prewarm_robots():
+    """
+    ALLOWLIST 가 고정 목록이면 첫 수집 때 robots.txt 를 한꺼번에(병렬) 받아둔다.
+    이후 _robots_ok 는 dict 조회 + can_fetch 만 한다.
+    (import 시점에 네트워크를 타지 않도록 모듈 로드가 아니라 첫 호출 때 1회 실행)
+    """
+    global _robots_prewarmed
+    if _robots_prewarmed or not (_RESPECT_ROBOTS and _ALLOWLIST):
+        return
+    with _robots_guard:
+        if _robots_prewarmed:
+            return
+        _robots_prewarmed = True
+    urls = [f"https://{d}/robots.txt" for d in _ALLOWLIST]
+    try:
+        with ThreadPoolExecutor(max_workers=min(_MAX_HOST_WORKERS, len(urls))) as ex:
+            list(ex.map(_load_robots, urls))
+    except Exception as e:
+        log.debug("robots prewarm error: %s", e)
 
 def _robots_ok(u: str) -> bool:
     if not _RESPECT_ROBOTS:
         return True
     try:
         p = urlparse(u)
-        robots_url = f"{p.scheme}://{p.netloc}/robots.txt"
-        rp = _robots_cache.get(robots_url)
-        if rp is None:
-            # requests로 로드 후 robotparser에 주입(타임아웃 제어)
-            try:
-                r = requests.get(robots_url, headers={"User-Agent": _UA}, timeout=_TIMEOUT)
-                txt = r.text if r.status_code == 200 else ""
-            except Exception:
-                txt = ""
-            rp = robotparser.RobotFileParser()
-            rp.parse(txt.splitlines())
-            _robots_cache[robots_url] = rp
+        rp = _load_robots(f"{p.scheme}://{p.netloc}/robots.txt")
         return rp.can_fetch(_UA, u)
     except Exception:
         # 보수적으로 허용(망가진 robots로 전체 차단되면 UX 나빠짐)
         return True
 
+def _lxml_title_and_desc(html: str) -> tuple[str, str]:
+    try:
+        doc = _lxml_html.fromstring(html)
+    except ValueError:
+        # <?xml encoding=...?> 선언이 있는 str 은 lxml 이 거부 → bytes 로 재시도
+        doc = _lxml_html.fromstring(html.encode("utf-8"))
+    title, desc = "", ""
+    t = doc.find(".//title")
+    if t is not None:
+        title = (t.text_content() or "").strip()
+    # 메타 디스크립션 우선
+    m = (
+        doc.xpath('//meta[@name="description"]/@content')
+        or doc.xpath('//meta[@property="og:description"]/@content')
+    )
+    if m and m[0]:
+        desc = str(m[0]).strip()
+    if not desc:
+        # 본문 텍스트에서 초간단 스니펫
+        body = doc.find(".//body")
+        node = body if body is not None else doc
+        desc = " ".join((node.text_content() or "").split())[:_SNIPPET_LEN]
+    return title, desc
+
 def _extract_title_and_desc(html: str) -> tuple[str, str]:
     if not html:
         return "", ""
+    if _lxml_html is not None:
+        try:
+            return _lxml_title_and_desc(html)
+        except Exception:
+            pass  # 아래 bs4/문자열 폴백
     title, desc = "", ""
     if BeautifulSoup is None:
         # 최소 파싱: <title> 스캔
@@ -184,6 +308,18 @@ def _fetch_page(url: str) -> Optional[Dict]:
     return news_item
 
 
+def _fetch_host_urls(urls: List[str]) -> Dict[str, Optional[Dict]]:
+    """한 호스트의 URL들을 순서대로 가져온다(워커 스레드에서 실행)."""
+    out: Dict[str, Optional[Dict]] = {}
+    for u in urls:
+        try:
+            out[u] = _fetch_page(u)
+        except Exception as e:
+            log.debug("answer-link worker error: %s (%s)", u, e)
+            out[u] = None
+    return out
+
+
 # ─────────────────────────────────────────────────────────────
 # 공개 API
 # ─────────────────────────────────────────────────────────────
@@ -200,19 +336,21 @@ def safe_auto_ingest_answer_links(question: str, answer_text: str) -> Dict:
 
     try:
         urls: List[str] = extract_urls_from_text(answer_text or "")
-        urls = urls[:_MAX_LINKS]
+        urls = _dedupe_urls(urls)[:_MAX_LINKS]
         if not urls:
             return {"status": "skip", "reason": "no urls found in answer"}
 
-        items: List[Dict] = []
-        seen = set()
-        for u in urls:
-            if u in seen:
-                continue
-            seen.add(u)
-            item = _fetch_page(u)
-            if item:
-                items.append(item)
+        _prewarm_robots()
+
+        # 호스트 하나당 워커 하나: 같은 호스트는 순차(레이트리밋 유지), 다른 호스트는 동시에
+        buckets = _group_by_host(urls)
+        fetched: Dict[str, Optional[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=min(_MAX_HOST_WORKERS, len(buckets))) as ex:
+            futures = [ex.submit(_fetch_host_urls, host_urls) for host_urls in buckets.values()]
+            for fut in futures:
+                fetched.update(fut.result())
+
+        items: List[Dict] = [fetched[u] for u in urls if fetched.get(u)]
 
         if not items:
             return {"status": "skip", "reason": "no eligible urls after policy checks"}
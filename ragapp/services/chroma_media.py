@@ -4,32 +4,70 @@ import os
 import json
 import mimetypes
 import hashlib
+import sys
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import chromadb
 from chromadb.config import Settings
 
+# 선택: orjson 있으면 행 직렬화를 C 구현으로 (없으면 표준 json)
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 CHROMA_MEDIA_DIR = os.getenv("CHROMA_MEDIA_DIR", "chroma_media")
 
 
+# 프로세스당 클라이언트/컬렉션 1회만 생성 (검색마다 mkdir + DB 핸들 오픈 방지)
+_CLIENT: Optional[chromadb.Client] = None
+_COLLS: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
 def _client() -> chromadb.Client:
-    Path(CHROMA_MEDIA_DIR).mkdir(parents=True, exist_ok=True)
-    return chromadb.PersistentClient(settings=Settings(persist_directory=CHROMA_MEDIA_DIR))
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            Path(CHROMA_MEDIA_DIR).mkdir(parents=True, exist_ok=True)
+            _CLIENT = chromadb.PersistentClient(
+                settings=Settings(persist_directory=CHROMA_MEDIA_DIR)
+            )
+    return _CLIENT
+
+
+def _coll(name: str):
+    col = _COLLS.get(name)
+    if col is not None:
+        return col
+    c = _client()
+    with _CLIENT_LOCK:
+        col = _COLLS.get(name)
+        if col is None:
+            col = c.get_or_create_collection(name=name)
+            _COLLS[name] = col
+    return col
 
 
 def images_coll():
-    return _client().get_or_create_collection(name="media_images")
+    return _coll("media_images")
 
 
 def table_coll():
-    return _client().get_or_create_collection(name="table_rows")
+    return _coll("table_rows")
 
 
 def _sha256_file(path: str) -> str:
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        # 3.11+ : C 레벨 버퍼링 해시 (파이썬 루프 없음)
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
     return h.hexdigest()
 
@@ -76,6 +114,18 @@ def search_images_by_text_embedding(*, text_embedding: List[float], k: int = 8):
     return c.query(query_embeddings=[text_embedding], n_results=int(k))
 
 
+def _row_to_json(row: Dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(row).decode("utf-8")
+        except Exception:
+            pass
+    try:
+        return json.dumps(row, ensure_ascii=False)
+    except Exception:
+        return json.dumps({k: str(v) for k, v in row.items()}, ensure_ascii=False)
+
+
 def add_table_rows(
     *, table_name: str, rows: List[Dict[str, Any]], embeddings: List[List[float]]
 ) -> int:
@@ -85,31 +135,16 @@ def add_table_rows(
 
     c = table_coll()
 
-    ids: List[str] = []
-    docs: List[str] = []
-    metas: List[Dict[str, Any]] = []
-
-    for i, row in enumerate(rows):
-        if not isinstance(row, dict):
-            row = {"value": row}
-
-        pid = f"row:{table_name}:{i:08d}"
-        doc = " | ".join(f"{k}:{row.get(k, '')}" for k in row.keys())
-
-        try:
-            row_json = json.dumps(row, ensure_ascii=False)
-        except Exception:
-            row_json = json.dumps({k: str(v) for k, v in row.items()}, ensure_ascii=False)
-
-        # ⚠️ Chroma 메타데이터는 리스트를 허용하지 않으니, 딱 필요한 것만 단순 타입으로 저장
-        meta = {
-            "table": table_name,
-            "row_json": row_json,
-        }
+    rows = [row if isinstance(row, dict) else {"value": row} for row in rows]
 
-        ids.append(pid)
-        docs.append(doc[:2000])
-        metas.append(meta)
+    ids: List[str] = [f"row:{table_name}:{i:08d}" for i in range(len(rows))]
+    docs: List[str] = [
+        " | ".join(f"{k}:{v}" for k, v in row.items())[:2000] for row in rows
+    ]
+    # ⚠️ Chroma 메타데이터는 리스트를 허용하지 않으니, 딱 필요한 것만 단순 타입으로 저장
+    metas: List[Dict[str, Any]] = [
+        {"table": table_name, "row_json": _row_to_json(row)} for row in rows
+    ]
 
     B = 512
     for b in range(0, len(ids), B):
@@ -1,7 +1,11 @@
 # ragapp/services/chroma_store.py
 from pathlib import Path
+import functools
 import importlib
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+import numpy as np
 from django.conf import settings
 
 # ✅ 변경: 임베딩 유틸 import
@@ -18,6 +22,7 @@ except Exception:
 from .utils import normalize_where_filter
 
 
+@functools.lru_cache(maxsize=1)
 def _chroma_client():
     chromadb = importlib.import_module("chromadb")
     # settings.CHROMA_DB_DIR 은 settings.py에서 _canon()을 통해
@@ -54,22 +59,50 @@ def _want_embed_dim() -> int:
     return dim_map.get(model, 768)
 
 
+# (base, want_dim) -> 컬렉션 객체. 차원 확인용 col.get(limit=1) 을 매 호출마다 하지 않도록.
+_collection_cache: Dict[tuple, Any] = {}
+_collection_lock = threading.Lock()
+
+
+def bust_collection_cache():
+    """컬렉션을 지우거나 재생성한 뒤 호출하면 다음 호출에서 다시 확인한다."""
+    with _collection_lock:
+        _collection_cache.clear()
+
+
 def chroma_collection():
     """
     현재 임베딩 차원에 맞는 컬렉션을 가져오거나 자동 생성.
     기존 컬렉션 차원이 다르면 "컬렉션명_dim" 으로 새로 만든다.
+    (결과는 (컬렉션명, 차원) 기준으로 캐시)
     """
-    c = _chroma_client()
     base = settings.CHROMA_COLLECTION
     want_dim = _want_embed_dim()
+    key = (base, want_dim)
+
+    col = _collection_cache.get(key)
+    if col is not None:
+        return col
+
+    with _collection_lock:
+        col = _collection_cache.get(key)
+        if col is None:
+            col = _resolve_collection(base, want_dim)
+            _collection_cache[key] = col
+    return col
+
+
+def _resolve_collection(base: str, want_dim: int):
+    c = _chroma_client()
 
     cur_dim = -1
     try:
         col = c.get_or_create_collection(name=base)
         try:
             got = col.get(limit=1, include=["embeddings"])
-            embs = got.get("embeddings") or []
-            if embs and embs[0]:
+            embs = got.get("embeddings")
+            # 신버전은 ndarray 로 돌려주므로 진리값 대신 길이로 확인
+            if embs is not None and len(embs) and embs[0] is not None:
                 cur_dim = len(embs[0])
         except Exception:
             pass
@@ -87,30 +120,41 @@ def chroma_upsert(
     ids: List[str],
     docs: List[str],
     metas: List[Dict[str, Any]],
-    embs: List[List[float]],
+    embs: Union[np.ndarray, Sequence[Sequence[float]]],
 ):
     """
     upsert 지원 안하는 구버전 대응까지 포함
+    - embs 는 (N, dim) float32 행렬 권장: 행마다 파이썬 float 박싱 없이 버퍼째 전달됨
     """
     col = chroma_collection()
     if hasattr(col, "upsert"):
         return col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embs)
 
-    # 구버전은 add 전 중복 제거 필요
+    # 구버전은 add 전 중복 제거 필요 (ndarray 입력도 못 받으므로 리스트로)
     try:
         col.delete(ids=ids)
     except Exception:
         pass
+    if isinstance(embs, np.ndarray):
+        embs = embs.tolist()
     return col.add(ids=ids, documents=docs, metadatas=metas, embeddings=embs)
 
 
-def chroma_count(col=None) -> int:
+def chroma_count(col=None, page_size: int = 10_000) -> int:
     try:
         col = col or chroma_collection()
         if hasattr(col, "count"):
             return int(col.count())
-        data = col.get(limit=1_000_000)
-        return len(data.get("ids") or [])
+        # count() 없는 구버전: ids 만 페이지 단위로 세기 (문서/메타/임베딩은 안 가져옴)
+        total = 0
+        offset = 0
+        while True:
+            data = col.get(limit=page_size, offset=offset, include=[])
+            n = len(data.get("ids") or [])
+            total += n
+            if n < page_size:
+                return total
+            offset += n
     except Exception:
         return 0
 
@@ -1,8 +1,15 @@
 # ragapp/services/config_runtime.py
+import threading
+import time
+from functools import lru_cache
+
 from django.conf import settings
 from ragapp.models import RagSetting
 
-_cache: dict[str, str | None] = {}
+# 캐시 유효 시간(초). 관리자에서 바꾼 값은 늦어도 이 시간 뒤에 반영된다.
+_CACHE_TTL_SEC = 60.0
+_cache_ts = time.monotonic()
+_cache_lock = threading.Lock()
 
 def _normalize_bool(v: str | None) -> bool:
     if v is None:
@@ -20,15 +27,12 @@ def _normalize_int(v: str | None, default: int) -> int:
     except Exception:
         return default
 
-def get_conf_raw(key: str, default: str | None = None) -> str | None:
-    # 캐시
-    if key in _cache:
-        return _cache[key]
+@lru_cache(maxsize=256)
+def _lookup(key: str, default: str | None) -> str | None:
     # DB 우선
     try:
         row = RagSetting.objects.filter(key=key).first()
         if row and row.value is not None and row.value != "":
-            _cache[key] = row.value
             return row.value
     except Exception:
         pass
@@ -36,9 +40,18 @@ def get_conf_raw(key: str, default: str | None = None) -> str | None:
     fallback = getattr(settings, key, None)
     if fallback is None:
         fallback = default
-    _cache[key] = fallback
     return fallback
 
+def get_conf_raw(key: str, default: str | None = None) -> str | None:
+    global _cache_ts
+    now = time.monotonic()
+    if now - _cache_ts > _CACHE_TTL_SEC:
+        with _cache_lock:
+            if now - _cache_ts > _CACHE_TTL_SEC:
+                _lookup.cache_clear()
+                _cache_ts = now
+    return _lookup(key, default)
+
 def get_conf_bool(key: str, default_true: bool = True) -> bool:
     raw = get_conf_raw(key, default="1" if default_true else "0")
     return _normalize_bool(raw)
@@ -52,10 +65,15 @@ def get_conf_str(key: str, default_val: str = "") -> str:
     return "" if raw is None else str(raw)
 
 def bust_cache(keys: list[str] | None = None):
-    """관리자에서 값 바꾼 직후 강제 반영하고 싶을 때 호출(선택)."""
-    global _cache
-    if not keys:
-        _cache = {}
-    else:
-        for k in keys:
-            _cache.pop(k, None)
+    """관리자에서 값 바꾼 직후 강제 반영하고 싶을 때 호출(선택).
+    lru_cache 는 키 단위 삭제가 안 되므로 keys 가 있어도 전체를 비운다."""
+    global _cache_ts
+    with _cache_lock:
+        _lookup.cache_clear()
+        _cache_ts = time.monotonic()
+    # 컬렉션 핸들 캐시도 함께 비움 (컬렉션 이름/임베딩 모델 변경, 컬렉션 재생성 반영)
+    try:
+        from ragapp.services.chroma_store import bust_collection_cache
+    except Exception:
+        return
+    bust_collection_cache()
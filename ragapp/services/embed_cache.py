@@ -0,0 +1,212 @@
+# ragapp/services/embed_cache.py
+"""
+내용 해시 기반 임베딩 캐시 (SQLite).
+
+같은 청크(뉴스 제목/메타 줄, 반복 질의의 답변 등)를 다시 인덱싱할 때
+임베딩 API를 다시 부르지 않도록, (모델, 텍스트 해시) → 벡터를 저장해 둔다.
+- 벡터는 float32 BLOB 으로 저장 (JSON 대비 작고 빠름)
+- EMBED_QUANT=fp16|int8 이면 양자화해서 저장 (2배/4배 작음, 읽을 때 float32 로 복원)
+- 모델이 바뀌면 model 컬럼이 달라서 자동으로 미스 처리
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .utils import sha
+
+_lock = threading.Lock()
+
+
+# ─────────────────────────────────────────
+# 경로 결정: settings.EMBED_CACHE_PATH > ENV > BASE_DIR/embed_cache.sqlite3
+# ─────────────────────────────────────────
+def _cache_path() -> str:
+    p = getattr(settings, "EMBED_CACHE_PATH", None) or os.environ.get("EMBED_CACHE_PATH")
+    if not p:
+        base = getattr(settings, "BASE_DIR", Path.cwd())
+        p = str(Path(base) / "embed_cache.sqlite3")
+    Path(p).parent.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+_tls = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """
+    스레드별로 연결을 하나 열어 재사용 (조회마다 connect/스키마 확인 반복 X).
+    경로 설정이 바뀌면 새로 연다.
+    """
+    path = _cache_path()
+    conn = getattr(_tls, "conn", None)
+    if conn is not None and getattr(_tls, "path", None) == path:
+        return conn
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conn = _open(path)
+    _tls.conn, _tls.path = conn, path
+    return conn
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embed_cache(
+            hash  TEXT NOT NULL,
+            model TEXT NOT NULL,
+            dim   INTEGER NOT NULL,
+            vec   BLOB NOT NULL,
+            quant TEXT NOT NULL DEFAULT 'fp32',
+            PRIMARY KEY (hash, model)
+        );
+        """
+    )
+    # 예전 스키마(quant 컬럼 없음) 호환
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(embed_cache)")}
+    if "quant" not in cols:
+        conn.execute("ALTER TABLE embed_cache ADD COLUMN quant TEXT NOT NULL DEFAULT 'fp32'")
+    return conn
+
+
+def enabled() -> bool:
+    v = getattr(settings, "EMBED_CACHE_ENABLED", None)
+    if v is None:
+        v = os.environ.get("EMBED_CACHE_ENABLED", "1")
+    return str(v).strip().lower() not in ("0", "false", "no", "off")
+
+
+def _quant() -> str:
+    v = getattr(settings, "EMBED_QUANT", None) or os.environ.get("EMBED_QUANT", "fp32")
+    v = str(v).strip().lower()
+    return v if v in ("fp32", "fp16", "int8") else "fp32"
+
+
+def _encode(vec, quant: str) -> bytes:
+    arr = np.asarray(vec, dtype=np.float32)
+    if quant == "fp16":
+        return arr.astype(np.float16).tobytes()
+    if quant == "int8":
+        # 벡터별 스케일 s = max|v|/127, 앞 4바이트에 float32 로 같이 저장
+        s = float(np.abs(arr).max()) / 127.0 if arr.size else 0.0
+        q = np.zeros(arr.shape, dtype=np.int8) if s == 0.0 else (
+            np.clip(np.rint(arr / s), -127, 127).astype(np.int8)
+        )
+        return np.float32(s).tobytes() + q.tobytes()
+    return arr.tobytes()
+
+
+def _decode(blob: bytes, quant: str) -> np.ndarray:
+    if quant == "fp16":
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    if quant == "int8":
+        s = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+        return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * s
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def get_many(hashes: Sequence[str], model: str) -> Dict[str, np.ndarray]:
+    """hash 목록 중 캐시에 있는 것만 {hash: float32 벡터} 로 반환."""
+    if not hashes or not model:
+        return {}
+    out: Dict[str, np.ndarray] = {}
+    uniq = list(dict.fromkeys(hashes))
+    conn = _connect()
+    # SQLite 바인딩 변수 한도(기본 999) 안쪽으로 나눠서 조회
+    for i in range(0, len(uniq), 500):
+        part = uniq[i:i + 500]
+        marks = ",".join("?" * len(part))
+        rows = conn.execute(
+            f"SELECT hash, vec, quant FROM embed_cache WHERE model=? AND hash IN ({marks})",
+            [model, *part],
+        )
+        for h, blob, quant in rows:
+            out[h] = _decode(blob, quant)
+    return out
+
+
+def put_many(items: Dict[str, Sequence[float]], model: str) -> None:
+    if not items or not model:
+        return
+    quant = _quant()
+    rows = [(h, model, len(vec), _encode(vec, quant), quant) for h, vec in items.items()]
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.executemany(
+                "REPLACE INTO embed_cache(hash, model, dim, vec, quant) VALUES(?,?,?,?,?)",
+                rows,
+            )
+
+
+def embed_with_cache(
+    texts: List[str],
+    model: str,
+    embed_fn: Callable[[List[str]], Any],
+    returns_model: bool = False,
+) -> List[np.ndarray]:
+    """
+    texts 중 캐시에 없는 것만 embed_fn 으로 임베딩하고 결과를 캐시에 기록.
+    - model: 조회 키로 쓸 모델명
+    - returns_model=True 면 embed_fn 은 (벡터 리스트, 실제로 사용한 모델명) 을 돌려준다.
+      실제 모델(폴백 모델일 수 있음)이 조회 모델과 다르면 그 배치는 캐시를 통째로 우회한다:
+      캐시 적중분(조회 모델 벡터)도 실제 모델로 다시 임베딩해 한 결과 안에 두 모델 벡터가
+      섞이지 않게 하고, 캐시에도 쓰지 않는다. 다시 임베딩한 모델마저 다르면 RuntimeError.
+    캐시 I/O 가 실패해도 임베딩 자체는 그대로 진행한다.
+    """
+    def _call(items: List[str]) -> Tuple[List[np.ndarray], str]:
+        if returns_model:
+            vecs, used = embed_fn(items)
+            return list(vecs), used
+        return list(embed_fn(items)), model
+
+    if not texts:
+        return []
+    if not enabled() or not model:
+        return _call(texts)[0]
+
+    hashes = [sha(t) for t in texts]
+    try:
+        cached = get_many(hashes, model)
+    except Exception:
+        cached = {}
+
+    missing_idx = [i for i, h in enumerate(hashes) if h not in cached]
+    if missing_idx:
+        # 같은 내용이 여러 번 나와도 한 번만 임베딩
+        todo: Dict[str, str] = {}
+        for i in missing_idx:
+            todo.setdefault(hashes[i], texts[i])
+        new_vecs, used = _call(list(todo.values()))
+        fresh = dict(zip(todo.keys(), new_vecs))
+        if used != model:
+            # 폴백 모델로 임베딩됨 → 캐시(조회 모델) 벡터와 섞지 않음
+            if len(todo) < len(set(hashes)):
+                rest: Dict[str, str] = {}
+                for h, t in zip(hashes, texts):
+                    if h not in fresh:
+                        rest.setdefault(h, t)
+                rest_vecs, used2 = _call(list(rest.values()))
+                if used2 != used:
+                    raise RuntimeError(f"임베딩 모델 불일치: {used} / {used2}")
+                fresh.update(zip(rest.keys(), rest_vecs))
+            return [fresh[h] for h in hashes]
+        cached.update(fresh)
+        try:
+            put_many(fresh, model)
+        except Exception:
+            pass
+
+    return [cached[h] for h in hashes]
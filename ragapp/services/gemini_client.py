@@ -2,7 +2,14 @@
 from __future__ import annotations
 import os
 import inspect
-from typing import List, Optional, Any
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Any, Tuple
+
+import numpy as np
 from django.conf import settings
 
 # google-genai (통합 SDK)
@@ -11,6 +18,11 @@ try:
 except Exception as _e:
     genai = None  # 런타임에서 에러 메시지로 안내
 
+try:
+    import orjson  # 선택: 원시 JSON 응답 파싱 가속
+except Exception:
+    orjson = None  # type: ignore
+
 LAST_EMBED_META = {"param": None, "model": None, "dim": None}
 
 
@@ -111,6 +123,15 @@ def _gemini_client():
             "Vertex-only: API Key가 없습니다. .env에 API_KEY 또는 VERTEX_API_KEY/GOOGLE_API_KEY/GEMINI_API_KEY를 설정하세요."
         )
 
+    return _build_client(project, location, api_version, api_key)
+
+
+@lru_cache(maxsize=4)
+def _build_client(project: str, location: str, api_version: str, api_key: str):
+    """
+    (project, location, api_version, api_key) 당 클라이언트 1개만 만들어 재사용.
+    매 호출마다 새 Client(HTTP 풀/인증 셋업)를 만들지 않도록.
+    """
     HttpOptions = _http_options_or_none()
     if HttpOptions:
         return genai.Client(  # type: ignore[call-arg]
@@ -124,6 +145,11 @@ def _gemini_client():
     return genai.Client(vertexai=True, project=project, location=location, api_key=api_key)  # type: ignore[call-arg]
 
 
+def reset_client() -> None:
+    """캐시된 클라이언트 폐기(테스트/키 교체 후 강제 재생성용)."""
+    _build_client.cache_clear()
+
+
 def _require_env_model_text() -> str:
     """
     텍스트 생성 모델은 .env에서만 고른다.
@@ -163,6 +189,24 @@ def _embed_models_from_env() -> list[str]:
     return items or []
 
 
+@lru_cache(maxsize=8)
+def _resolve_param(fn) -> str:
+    """SDK 메서드의 입력 파라미터명(contents/content/input) 판별. 함수당 1회만 inspect."""
+    try:
+        params = inspect.signature(fn).parameters
+    except Exception:
+        return "contents"
+    for name in ("contents", "content", "input"):
+        if name in params:
+            return name
+    return "contents"
+
+
+def _param_name(method) -> str:
+    # 바운드 메서드는 접근할 때마다 새 객체라서, 밑에 있는 함수 기준으로 캐시
+    return _resolve_param(getattr(method, "__func__", method))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 텍스트 생성
 # ─────────────────────────────────────────────────────────────────────────────
@@ -171,24 +215,22 @@ def ask_gemini(prompt: str, model: Optional[str] = None) -> str:
     텍스트 생성 호출 (Vertex 전용)
     - 모델은 무조건 .env에서 선택 (model 인자 무시)
     - generate_content 파라미터명(contents/content/input) 자동 호환
+    - SEMANTIC_CACHE_ENABLED=1 이면 비슷한 프롬프트의 이전 답을 재사용(semantic_cache)
     """
+    from . import semantic_cache  # 순환 import 방지용 지연 임포트
+
+    if semantic_cache.enabled():
+        return semantic_cache.cached_answer(prompt, lambda: _ask_gemini_uncached(prompt))
+    return _ask_gemini_uncached(prompt)
+
+
+def _ask_gemini_uncached(prompt: str) -> str:
     try:
         c = _gemini_client()
         mdl = _require_env_model_text()  # ★ env 강제
 
         # 파라미터명 호환
-        try:
-            sig = inspect.signature(c.models.generate_content)  # type: ignore[attr-defined]
-            if "contents" in sig.parameters:
-                param = "contents"
-            elif "content" in sig.parameters:
-                param = "content"
-            elif "input" in sig.parameters:
-                param = "input"
-            else:
-                param = "contents"
-        except Exception:
-            param = "contents"
+        param = _param_name(c.models.generate_content)  # type: ignore[attr-defined]
 
         kwargs = {"model": mdl, param: prompt}
         r = c.models.generate_content(**kwargs)  # type: ignore[attr-defined]
@@ -218,115 +260,167 @@ def ask_gemini(prompt: str, model: Optional[str] = None) -> str:
 # ─────────────────────────────────────────────────────────────────────────────
 # 임베딩 (배치 안전)
 # ─────────────────────────────────────────────────────────────────────────────
-def _parse_embedding(resp: Any) -> Optional[List[float]]:
+def _raw_json(resp: Any) -> Any:
     """
-    google-genai 응답의 다양한 모양을 안전 파싱
+    SDK/HTTP 층이 원시 JSON(bytes/str, 또는 _raw_response 바이트)을 넘겨주면 dict 로 파싱.
+    orjson 이 있으면 그걸로(대용량 배치 응답에서 표준 json 대비 빠름), 아니면 json.
+    그 외 객체는 그대로 반환해서 기존 attr 경로로 처리.
     """
-    # attr 스타일
-    try:
-        emb = getattr(resp, "embedding", None)
-        if emb is not None:
-            vals = getattr(emb, "values", None)
-            if vals:
-                return [float(x) for x in vals]
-    except Exception:
-        pass
+    raw = resp
+    if not isinstance(raw, (bytes, bytearray, str)):
+        raw = getattr(resp, "_raw_response", None)
+        if not isinstance(raw, (bytes, bytearray, str)):
+            return resp
     try:
-        embs = getattr(resp, "embeddings", None)
-        if embs:
-            first = embs[0] if len(embs) else None
-            if first is not None:
-                vals = getattr(first, "values", None)
-                if vals:
-                    return [float(x) for x in vals]
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception:
-        pass
+        return resp
+
+
+def _parse_embedding(resp: Any) -> Optional[np.ndarray]:
+    """
+    google-genai 응답의 다양한 모양을 안전 파싱
+    (예외로 분기하지 않고 hasattr/isinstance 순서대로 확인)
+    - resp.embedding.values
+    - resp.embeddings[0].values
+    - resp.data[0].embedding(.values)
+    - dict: {"embedding": {"values"}} / {"embeddings": [{"values"}]}
+    - 원시 JSON(bytes/str/_raw_response) → _raw_json 으로 dict 화 후 위와 동일
+    """
+    if resp is None:
+        return None
+    resp = _raw_json(resp)
 
-    # dict 스타일
     if isinstance(resp, dict):
-        try:
-            vals = resp.get("embedding", {}).get("values")
-            if vals:
-                return [float(x) for x in vals]
-        except Exception:
-            pass
-        try:
-            first = (resp.get("embeddings") or [None])[0]
-            if isinstance(first, dict) and "values" in first:
-                return [float(x) for x in first["values"]]
-        except Exception:
-            pass
+        emb = resp.get("embedding")
+        if isinstance(emb, dict) and emb.get("values"):
+            return _as_vec(emb["values"])
+        items = resp.get("embeddings")
+        return _item_values(items[0]) if items else None
 
-    # data[0].embedding.values 형태
-    try:
-        data = getattr(resp, "data", None)
-        if data:
-            item = data[0]
+    # attr 스타일
+    emb = getattr(resp, "embedding", None)
+    if emb is not None:
+        vals = getattr(emb, "values", None)
+        if vals:
+            return _as_vec(vals)
+
+    items = getattr(resp, "embeddings", None) or getattr(resp, "data", None)
+    if items:
+        return _item_values(items[0])
+    return None
+
+
+def _as_vec(vals) -> np.ndarray:
+    """SDK 의 float 리스트 → float32 1차원 배열 (파이썬 float 리스트 대비 메모리 ~1/9)"""
+    return np.asarray(vals, dtype=np.float32)
+
+
+def _item_values(item: Any) -> Optional[np.ndarray]:
+    """배치 응답의 원소 1개(ContentEmbedding / data[i] / dict)에서 values 추출"""
+    if item is None:
+        return None
+    if isinstance(item, dict):
+        vals = item.get("values")
+        if vals is None:
+            emb = item.get("embedding")
+            vals = emb.get("values") if isinstance(emb, dict) else emb
+    else:
+        vals = getattr(item, "values", None)
+        if vals is None:
             emb = getattr(item, "embedding", None)
-            if emb is not None:
-                vals = getattr(emb, "values", None)
-                if vals:
-                    return [float(x) for x in vals]
+            vals = getattr(emb, "values", emb)
+    if not vals or isinstance(vals, (str, bytes, dict)) or not hasattr(vals, "__iter__"):
+        return None
+    # SDK 가 이미 float 로 돌려주므로 원소별 float() 변환 없이 바로 배열화
+    return _as_vec(vals)
+
+
+def _parse_embeddings_batch(resp: Any, n: int) -> Optional[List[np.ndarray]]:
+    """
+    배치 임베딩 응답 → 벡터 n개. 개수가 안 맞거나 하나라도 파싱 실패면 None
+    (embeddings[i].values / data[i].embedding(.values) / dict 스타일)
+    """
+    resp = _raw_json(resp)
+    if isinstance(resp, dict):
+        items = resp.get("embeddings") or resp.get("data")
+    else:
+        items = getattr(resp, "embeddings", None) or getattr(resp, "data", None)
+    if not items or len(items) != n:
+        return None
+    out: List[np.ndarray] = []
+    for item in items:
+        vals = _item_values(item)
+        if vals is None or not vals.size:
+            return None
+        out.append(vals)
+    return out
+
+
+def _embed_with(call, texts: List[str]) -> List[np.ndarray]:
+    """
+    call(입력) → SDK 응답.
+    먼저 texts 전체를 한 번의 요청(배치)으로 보내고,
+    모델이 리스트 입력을 거절하거나 응답 모양이 안 맞으면 1건씩 요청으로 폴백.
+    """
+    try:
+        vecs = _parse_embeddings_batch(call(list(texts)), len(texts))
+        if vecs:
+            return vecs
     except Exception:
         pass
 
-    return None
+    vecs = []
+    for t in texts:
+        v = _parse_embedding(call(t))
+        if v is None or not v.size:
+            raise RuntimeError("임베딩 응답 파싱 실패")
+        vecs.append(v)
+    return vecs
 
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+def embed_texts_with_model(
+    texts: List[str],
+    models: Optional[List[str]] = None,
+) -> Tuple[List[np.ndarray], str]:
     """
-    텍스트 배열 -> 임베딩 벡터 배열 (통합 SDK / Vertex 전용)
-    - 모델은 무조건 .env에서만 선택
+    텍스트 배열 -> (임베딩 벡터(float32 ndarray) 리스트, 실제로 사용한 모델명)
+    - models 미지정 시 .env 후보 모델을 순서대로 시도 (models=[이름] 이면 그 모델만)
     - 우선 embeddings.create(model=..., input=...) 시도
       실패 시 models.embed_content(model=..., contents|content|input=...) 시도
     - 파라미터명(content/contents/input) 자동 호환
+    - 텍스트 목록은 한 번의 요청으로 보내고(배치), 거절되면 1건씩 폴백
     """
     if not texts:
-        return []
+        return [], ""
     c = _gemini_client()
-    models = _embed_models_from_env()  # ★ env 강제
+    if models is None:
+        models = _embed_models_from_env()  # ★ env 강제
 
     errors: list[str] = []
     for model_name in models:
         # 1) embeddings.create 우선 시도
         try:
-            vecs: List[List[float]] = []
-            for t in texts:
-                r = c.embeddings.create(model=model_name, input=t)  # type: ignore[attr-defined]
-                v = _parse_embedding(r)
-                if not v:
-                    raise RuntimeError("임베딩 응답 파싱 실패")
-                vecs.append(v)
+            vecs = _embed_with(
+                lambda x: c.embeddings.create(model=model_name, input=x),  # type: ignore[attr-defined]
+                texts,
+            )
             LAST_EMBED_META.update({"param": "input", "model": model_name, "dim": len(vecs[0])})
-            return vecs
+            return vecs, model_name
         except Exception as e1:
             errors.append(f"{model_name} via embeddings.create(input): {e1}")
 
         # 2) models.embed_content 폴백 (파라미터명 자동)
         try:
             # 파라미터명 호환
-            try:
-                sig = inspect.signature(c.models.embed_content)  # type: ignore[attr-defined]
-                if "contents" in sig.parameters:
-                    p = "contents"
-                elif "content" in sig.parameters:
-                    p = "content"
-                elif "input" in sig.parameters:
-                    p = "input"
-                else:
-                    p = "contents"
-            except Exception:
-                p = "contents"
-
-            vecs2: List[List[float]] = []
-            for t in texts:
-                r2 = c.models.embed_content(model=model_name, **{p: t})  # type: ignore[attr-defined]
-                v2 = _parse_embedding(r2)
-                if not v2:
-                    raise RuntimeError("임베딩 응답 파싱 실패")
-                vecs2.append(v2)
+            p = _param_name(c.models.embed_content)  # type: ignore[attr-defined]
+
+            vecs2 = _embed_with(
+                lambda x: c.models.embed_content(model=model_name, **{p: x}),  # type: ignore[attr-defined]
+                texts,
+            )
             LAST_EMBED_META.update({"param": p, "model": model_name, "dim": len(vecs2[0])})
-            return vecs2
+            return vecs2, model_name
         except Exception as e2:
             errors.append(f"{model_name} via embed_content({p}): {e2}")
             continue
@@ -334,7 +428,70 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
     raise RuntimeError("임베딩 실패: " + " | ".join(errors))
 
 
+def embed_texts(texts: List[str]) -> List[np.ndarray]:
+    """텍스트 배열 -> 임베딩 벡터(float32 ndarray) 리스트 (embed_texts_with_model 참고)"""
+    return embed_texts_with_model(texts)[0]
+
+
+def embed_texts_parallel(
+    texts: List[str],
+    batch: int = 64,
+    max_in_flight: int = 4,
+) -> Tuple[List[np.ndarray], str]:
+    """
+    대량 인덱싱용: texts 를 batch 개씩 잘라 동시에 최대 max_in_flight 개 요청.
+    반환: (입력 순서 그대로의 벡터 리스트, 사용한 모델명)
+    - 모델은 호출당 한 번만 고른다: 첫 조각이 .env 후보 순서대로 폴백하며 모델을 정하고,
+      나머지 조각은 그 모델로 고정 (조각마다 다른 모델 벡터가 섞이지 않도록.
+      고정 모델이 실패하면 다른 모델로 넘어가지 않고 호출 전체가 실패)
+    - 제출 사이에 작은 지터를 넣어 429 몰림 방지
+    """
+    if not texts:
+        return [], ""
+    batch = max(1, int(batch))
+    slices = [(i, texts[i:i + batch]) for i in range(0, len(texts), batch)]
+
+    first_start, first_part = slices[0]
+    first_vecs, model = embed_texts_with_model(first_part)
+    if len(slices) == 1:
+        return first_vecs, model
+
+    out: List[Optional[np.ndarray]] = [None] * len(texts)
+    out[first_start:first_start + len(first_vecs)] = first_vecs
+    rest = slices[1:]
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_in_flight), len(rest)))) as ex:
+        futures = []
+        for start, part in rest:
+            time.sleep(random.uniform(0, 0.05))
+            futures.append((start, ex.submit(embed_texts_with_model, part, [model])))
+        for start, fut in futures:
+            vecs, _ = fut.result()
+            out[start:start + len(vecs)] = vecs
+    return out, model  # type: ignore[return-value]
+
+
+def current_embed_model() -> str:
+    """.env 기준 1순위 임베딩 모델명(없으면 빈 문자열). 임베딩 캐시 키로 사용."""
+    try:
+        models = _embed_models_from_env()
+    except Exception:
+        return ""
+    return models[0] if models else ""
+
+
 def current_embed_dim() -> int:
+    """
+    현재 임베딩 차원.
+    - 직전 임베딩 호출이 남긴 LAST_EMBED_META["dim"] 이 있고, 그 모델이 아직 .env 후보에 있으면 그대로 반환
+    - 처음 호출이거나 .env 모델이 바뀐 경우에만 프로브 1회(네트워크 왕복)
+    """
+    dim, model = LAST_EMBED_META.get("dim"), LAST_EMBED_META.get("model")
+    if dim and model:
+        try:
+            if model in _embed_models_from_env():
+                return int(dim)
+        except Exception:
+            pass
     try:
         v = embed_texts(["__dim_probe__"])[0]
         return len(v)
@@ -1,22 +1,45 @@
 # ragapp/services/ingest.py
+import hashlib
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterator, Tuple
 from urllib.parse import urlparse
 
+import numpy as np
 from django.conf import settings
 
 from .utils import (
     chunk_text,
     slug,
-    sha,
     iso,
     extract_urls_from_text,
 )
-from .gemini_client import embed_texts
+from .gemini_client import current_embed_model, embed_texts_parallel
+from .embed_cache import embed_with_cache
 from .chroma_store import chroma_upsert
 from .news_fetcher import fetch_article_text
 
 
+# 한 번에 임베딩/업서트할 청크 수 (embed_texts_parallel 기준 64개 x 4요청)
+EMBED_WINDOW = 256
+
+# 같은 게시일 문자열(RSS 날짜)이 반복되므로 파싱 결과를 재사용
+_iso_cached = lru_cache(maxsize=1024)(iso)
+
+# 답변 링크 본문을 동시에 가져올 최대 스레드 수 (I/O 바운드)
+LINK_FETCH_WORKERS = 5
+
+
+def _idhash(s: str) -> str:
+    """
+    청크 ID용 비암호 해시 (16 hex). 보안 용도가 아니므로 SHA-1 대신 blake2b 사용.
+    예전 sha() ID 로 저장된 청크는 `manage.py migrate_chunk_ids` 로 한 번 옮긴다.
+    """
+    return hashlib.blake2b((s or "").encode("utf-8", "ignore"), digest_size=8).hexdigest()
+
+
 def _as_bool(v) -> bool:
     if v is None:
         return False
@@ -25,24 +48,27 @@ def _as_bool(v) -> bool:
     return str(v).strip().lower() in ("1", "true", "yes", "y", "on")
 
 
-def _host_allowed(url: str, allowlist: list[str]) -> bool:
+def _compile_allowlist(allowlist: list[str]) -> tuple[frozenset, tuple]:
+    """
+    ALLOWLIST_DOMAINS → (완전일치 set, ".도메인" 접미사 tuple).
+    indexto_chroma_safe 호출당 1번만 만들고, URL마다 재사용.
+    """
+    doms = [d.strip().lower() for d in (allowlist or []) if d and d.strip()]
+    return frozenset(doms), tuple("." + d for d in doms)
+
+
+def _host_allowed(host: str, rules: tuple[frozenset, tuple]) -> bool:
     """
-    ALLOWLIST_DOMAINS 규칙:
+    ALLOWLIST_DOMAINS 규칙 (host 는 호출부에서 urlparse 1번 해서 소문자로 넘김):
     - allowlist가 비어있으면 전부 허용
     - 도메인 완전일치 또는 서브도메인 포함(.example.com) 허용
     """
-    if not url:
-        return False
-    if not allowlist:
+    exact, suffixes = rules
+    if not exact:
         return True
-    host = (urlparse(url).netloc or "").lower()
     if not host:
         return False
-    for d in allowlist:
-        d = d.lower()
-        if host == d or host.endswith("." + d):
-            return True
-    return False
+    return host in exact or host.endswith(suffixes)
 
 
 def indexto_chroma_safe(query: str, answer: str, news: list):
@@ -66,7 +92,7 @@ def indexto_chroma_safe(query: str, answer: str, news: list):
     # 1) 파라미터/플래그 정규화
     size = int(getattr(settings, "EMBED_CHUNK_SIZE", 1600))
     overlap = int(getattr(settings, "EMBED_CHUNK_OVERLAP", 200))
-    now = datetime.utcnow().isoformat()
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
     require_source = _as_bool(getattr(settings, "REQUIRE_SOURCE_FIELDS", True))
     store_full = _as_bool(getattr(settings, "STORE_FULLTEXT", False))
@@ -86,203 +112,249 @@ def indexto_chroma_safe(query: str, answer: str, news: list):
     )
 
     min_chars = int(getattr(settings, "MIN_NEWS_BODY_CHARS", 400))
-    allowlist = list(getattr(settings, "ALLOWLIST_DOMAINS", []) or [])
+    allow_rules = _compile_allowlist(list(getattr(settings, "ALLOWLIST_DOMAINS", []) or []))
 
-    ids, docs, metas = [], [], []
-
-    # ── A) 모델 답변 청크 ───────────────────────────────────────
-    a_chunks = chunk_text(answer or "", size=size, overlap=overlap)
-    base_a = f"answer:{sha(query)}"
-    for i, ch in enumerate(a_chunks):
-        if not (ch or "").strip():
-            continue
-        ids.append(f"{base_a}:{i}")
-        docs.append(ch)
-        metas.append(
-            {
-                "source": "web_answer",
-                "title": "웹검색 답변",
-                "question": query,
-                "ingested_at": now,
-            }
-        )
+    crawl_links = _as_bool(getattr(settings, "CRAWL_ANSWER_LINKS", True))
+    max_links = int(getattr(settings, "ANSWER_LINK_MAX", 5))
+    timeout_s = int(getattr(settings, "ANSWER_LINK_TIMEOUT", 12))
 
-    # ── B) 뉴스 메타/본문/발췌 ───────────────────────────────────
+    # 요약/카운터는 청크를 만들면서 누적 (전체 리스트를 쥐고 있지 않도록)
     news_summaries = []
-    meta_only_total = 0
-
-    for art in (news or []):
-        # 기본 필드 정규화
-        url = (art.get("final_url") or art.get("url") or "").strip()
-        if not _host_allowed(url, allowlist):
-            # 허용 도메인 외 URL은 스킵
-            continue
-
-        host = urlparse(url).netloc if url else ""
-        title = (art.get("title") or "").strip() or (host if host else "뉴스")
-        publisher = (art.get("publisher") or art.get("source") or host or "").strip()
-        published_at = (art.get("published_at") or "").strip()
-        snippet = (art.get("snippet") or "").strip()
-        body_in = (art.get("news_body") or art.get("body") or "").strip()
-        excerpt_in = (art.get("excerpt") or "").strip()
-
-        # 출처 4종 필수 검증(옵션)
-        if require_source and not (title and publisher and url and published_at):
-            continue
+    link_summaries = []
+    stats = {"meta_only_total": 0, "link_total_chunks": 0}
+
+    def _iter_chunks() -> Iterator[Tuple[str, str, dict]]:
+        """(id, doc, meta) 를 하나씩 흘려보낸다. 임베딩/업서트는 호출부에서 윈도 단위로."""
+        # ── A) 모델 답변 청크 ───────────────────────────────────────
+        a_chunks = chunk_text(answer or "", size=size, overlap=overlap)
+        base_a = f"answer:{_idhash(query)}"
+        for i, ch in enumerate(a_chunks):
+            if not (ch or "").strip():
+                continue
+            yield (
+                f"{base_a}:{i}",
+                ch,
+                {
+                    "source": "web_answer",
+                    "title": "웹검색 답변",
+                    "question": query,
+                    "ingested_at": now,
+                },
+            )
 
-        # 안전모드/전문금지면 본문 무시(요약으로만)
-        body = (body_in if store_full else "")
-
-        base = f"news:{slug(title)}:{sha(url or title)}"
-
-        # (1) 메타 청크(항상 저장)
-        meta_doc_lines = [
-            f"[META ONLY] {title}",
-            f"URL: {url}",
-            f"출처: {publisher}",
-            f"게시: {iso(published_at)}",
-            (snippet[:min(300, excerpt_limit)] if snippet else ""),
-        ]
-        meta_doc = "\n".join([ln for ln in meta_doc_lines if ln]).strip()
-
-        has_full_body = bool(body and len(body) >= min_chars and store_full)
-
-        ids.append(f"{base}:meta")
-        docs.append(meta_doc)
-        metas.append(
-            {
-                "source": "news",
-                "meta_only": (not has_full_body) or (not store_full),
-                "url": url,
-                "title": title,
-                "publisher": publisher,
-                "published_at": published_at,
-                "ingested_at": now,
-                "is_excerpt": 1 if not store_full else 0,
-            }
-        )
+        # ── B) 뉴스 메타/본문/발췌 ───────────────────────────────────
+        for art in (news or []):
+            # 기본 필드 정규화
+            url = (art.get("final_url") or art.get("url") or "").strip()
+            if not url:
+                continue
+            host = urlparse(url).netloc
+            if not _host_allowed(host.lower(), allow_rules):
+                # 허용 도메인 외 URL은 스킵
+                continue
 
-        # (2) 본문 or 발췌
-        body_cnt = 0
-        if store_full and has_full_body:
-            chunks = chunk_text(body, size=size, overlap=overlap)
-            for j, ch in enumerate(chunks):
-                if not ch.strip():
-                    continue
-                ids.append(f"{base}:{j}")
-                docs.append(ch)
-                metas.append(
-                    {
-                        "source": "news",
-                        "url": url,
-                        "title": title,
-                        "publisher": publisher,
-                        "published_at": published_at,
-                        "ingested_at": now,
-                        "is_excerpt": 0,
-                    }
-                )
-                body_cnt += 1
-        else:
-            # 전문 저장 금지 또는 본문 부족 → 발췌 1청크만
-            excerpt = (excerpt_in or "")
-            if not excerpt:
-                if body_in:
-                    excerpt = body_in[:excerpt_limit]
-                elif snippet:
-                    excerpt = snippet[:excerpt_limit]
-            if excerpt and excerpt.strip():
-                ids.append(f"{base}:excerpt")
-                docs.append(excerpt.strip())
-                metas.append(
-                    {
-                        "source": "news",
-                        "url": url,
-                        "title": title,
-                        "publisher": publisher,
-                        "published_at": published_at,
-                        "ingested_at": now,
-                        "is_excerpt": 1,
-                    }
-                )
-                body_cnt += 1
-
-        if (not store_full) or (not has_full_body):
-            meta_only_total += 1
-
-        news_summaries.append(
-            {
-                "title": title,
-                "url": url,
-                "chunks": 1 + body_cnt,  # meta 1 + (body/excerpt)
-                "meta_only": (not store_full) or (not has_full_body),
-            }
-        )
+            title = (art.get("title") or "").strip() or (host if host else "뉴스")
+            publisher = (art.get("publisher") or art.get("source") or host or "").strip()
+            published_at = (art.get("published_at") or "").strip()
+            snippet = (art.get("snippet") or "").strip()
+            body_in = (art.get("news_body") or art.get("body") or "").strip()
+            excerpt_in = (art.get("excerpt") or "").strip()
 
-    # ── C) 답변 속 URL(Answer 링크) 동일 규칙 ───────────────────
-    link_summaries = []
-    link_total_chunks = 0
-    if _as_bool(getattr(settings, "CRAWL_ANSWER_LINKS", True)):
-        max_links = int(getattr(settings, "ANSWER_LINK_MAX", 5))
-        timeout_s = int(getattr(settings, "ANSWER_LINK_TIMEOUT", 12))
-
-        urls = extract_urls_from_text(answer)[: max(0, max_links)]
-        for u in urls:
-            if not _host_allowed(u, allowlist):
-                # 허용 도메인 외는 크롤/저장 모두 스킵
+            # 출처 4종 필수 검증(옵션)
+            if require_source and not (title and publisher and url and published_at):
                 continue
 
-            # fetch_article_text 내부에서 robots/레이트리밋 등을 처리하도록 설계
-            body = fetch_article_text(
-                u,
-                timeout=timeout_s,
-                min_chars=min_chars,
+            # 안전모드/전문금지면 본문 무시(요약으로만)
+            body = (body_in if store_full else "")
+
+            base = f"news:{slug(title)}:{_idhash(url or title)}"
+
+            # (1) 메타 청크(항상 저장)
+            meta_doc_lines = [
+                f"[META ONLY] {title}",
+                f"URL: {url}",
+                f"출처: {publisher}",
+                f"게시: {_iso_cached(published_at)}",
+                (snippet[:min(300, excerpt_limit)] if snippet else ""),
+            ]
+            meta_doc = "\n".join([ln for ln in meta_doc_lines if ln]).strip()
+
+            has_full_body = bool(body and len(body) >= min_chars and store_full)
+
+            yield (
+                f"{base}:meta",
+                meta_doc,
+                {
+                    "source": "news",
+                    "meta_only": (not has_full_body) or (not store_full),
+                    "url": url,
+                    "title": title,
+                    "publisher": publisher,
+                    "published_at": published_at,
+                    "ingested_at": now,
+                    "is_excerpt": 1 if not store_full else 0,
+                },
             )
 
-            cnt = 0
-            base = f"anslink:{slug(urlparse(u).netloc)}:{sha(u)}"
-
-            if store_full and body:
+            # (2) 본문 or 발췌
+            body_cnt = 0
+            if store_full and has_full_body:
                 chunks = chunk_text(body, size=size, overlap=overlap)
-                for k, ch in enumerate(chunks):
+                for j, ch in enumerate(chunks):
                     if not ch.strip():
                         continue
-                    ids.append(f"{base}:{k}")
-                    docs.append(ch)
-                    metas.append(
+                    yield (
+                        f"{base}:{j}",
+                        ch,
                         {
-                            "source": "answer_link",
-                            "url": u,
-                            "question": query,
+                            "source": "news",
+                            "url": url,
+                            "title": title,
+                            "publisher": publisher,
+                            "published_at": published_at,
                             "ingested_at": now,
                             "is_excerpt": 0,
-                        }
+                        },
                     )
-                    cnt += 1
+                    body_cnt += 1
             else:
-                excerpt = ""
-                if body:
-                    excerpt = body[:excerpt_limit]
-                if excerpt.strip():
-                    ids.append(f"{base}:excerpt")
-                    docs.append(excerpt.strip())
-                    metas.append(
+                # 전문 저장 금지 또는 본문 부족 → 발췌 1청크만
+                excerpt = (excerpt_in or "")
+                if not excerpt:
+                    if body_in:
+                        excerpt = body_in[:excerpt_limit]
+                    elif snippet:
+                        excerpt = snippet[:excerpt_limit]
+                if excerpt and excerpt.strip():
+                    yield (
+                        f"{base}:excerpt",
+                        excerpt.strip(),
                         {
-                            "source": "answer_link",
-                            "url": u,
-                            "question": query,
+                            "source": "news",
+                            "url": url,
+                            "title": title,
+                            "publisher": publisher,
+                            "published_at": published_at,
                             "ingested_at": now,
                             "is_excerpt": 1,
-                        }
+                        },
                     )
-                    cnt += 1
+                    body_cnt += 1
+
+            if (not store_full) or (not has_full_body):
+                stats["meta_only_total"] += 1
+
+            news_summaries.append(
+                {
+                    "title": title,
+                    "url": url,
+                    "chunks": 1 + body_cnt,  # meta 1 + (body/excerpt)
+                    "meta_only": (not store_full) or (not has_full_body),
+                }
+            )
 
-            link_total_chunks += cnt
-            link_summaries.append({"url": u, "chunks": cnt})
+        # ── C) 답변 속 URL(Answer 링크) 동일 규칙 ───────────────────
+        if crawl_links:
+            links = []
+            for u in extract_urls_from_text(answer)[: max(0, max_links)]:
+                u_host = urlparse(u).netloc if u else ""
+                if not u or not _host_allowed(u_host.lower(), allow_rules):
+                    # 허용 도메인 외는 크롤/저장 모두 스킵
+                    continue
+                links.append((u, u_host))
+
+            # 본문 수집만 병렬로 (robots/레이트리밋은 fetch_article_text 내부에서 처리)
+            # 청크/ID 생성은 아래에서 입력 순서대로 순차 진행
+            bodies = []
+            if links:
+                with ThreadPoolExecutor(max_workers=min(LINK_FETCH_WORKERS, len(links))) as ex:
+                    bodies = list(
+                        ex.map(
+                            lambda l: fetch_article_text(l[0], timeout=timeout_s, min_chars=min_chars),
+                            links,
+                        )
+                    )
 
-    # ── D) 실제 업서트 ─────────────────────────────────────────
-    clean = [(i, d, m) for i, d, m in zip(ids, docs, metas) if d and str(d).strip()]
-    if not clean:
+            for (u, u_host), body in zip(links, bodies):
+                cnt = 0
+                base = f"anslink:{slug(u_host)}:{_idhash(u)}"
+
+                if store_full and body:
+                    chunks = chunk_text(body, size=size, overlap=overlap)
+                    for k, ch in enumerate(chunks):
+                        if not ch.strip():
+                            continue
+                        yield (
+                            f"{base}:{k}",
+                            ch,
+                            {
+                                "source": "answer_link",
+                                "url": u,
+                                "question": query,
+                                "ingested_at": now,
+                                "is_excerpt": 0,
+                            },
+                        )
+                        cnt += 1
+                else:
+                    excerpt = ""
+                    if body:
+                        excerpt = body[:excerpt_limit]
+                    if excerpt.strip():
+                        yield (
+                            f"{base}:excerpt",
+                            excerpt.strip(),
+                            {
+                                "source": "answer_link",
+                                "url": u,
+                                "question": query,
+                                "ingested_at": now,
+                                "is_excerpt": 1,
+                            },
+                        )
+                        cnt += 1
+
+                stats["link_total_chunks"] += cnt
+                link_summaries.append({"url": u, "chunks": cnt})
+
+    # ── D) 실제 업서트 (EMBED_WINDOW 개씩 임베딩 → 업서트) ─────────────
+    inserted = 0
+    ans_chunks = 0
+    news_chunks = 0
+    w_ids, w_docs, w_metas = [], [], []
+
+    def _flush():
+        # 이미 임베딩한 적 있는 청크(내용 해시 기준)는 캐시 재사용, 나머지만 API 호출
+        embs = embed_with_cache(
+            w_docs,
+            current_embed_model(),
+            embed_texts_parallel,
+            returns_model=True,  # 윈도 전체가 한 모델로 임베딩되고, 그 모델명을 함께 돌려받음
+        )
+        # 윈도우 전체를 (N, dim) float32 행렬 하나로 넘겨 Chroma 에 버퍼째 전달
+        embs_mat = np.stack(embs).astype(np.float32, copy=False)
+        chroma_upsert(ids=w_ids, docs=w_docs, metas=w_metas, embs=embs_mat)
+
+    for cid, doc, meta in _iter_chunks():
+        # 청크 생성 단계에서 바로 거름 (doc 은 항상 str 이라 str() 변환 불필요)
+        if not doc or not doc.strip():
+            continue
+        w_ids.append(cid)
+        w_docs.append(doc)
+        w_metas.append(meta)
+        inserted += 1
+        src = meta.get("source")
+        if src == "web_answer":
+            ans_chunks += 1
+        elif src == "news":
+            news_chunks += 1
+        if len(w_ids) >= EMBED_WINDOW:
+            _flush()
+            w_ids, w_docs, w_metas = [], [], []
+    if w_ids:
+        _flush()
+
+    if not inserted:
         return {
             "inserted": 0,
             "answer_chunks": 0,
@@ -297,19 +369,12 @@ def indexto_chroma_safe(query: str, answer: str, news: list):
             "note": "인덱싱할 데이터가 없습니다.",
         }
 
-    ids, docs, metas = map(list, zip(*clean))
-    embs = embed_texts(docs)
-    chroma_upsert(ids=ids, docs=docs, metas=metas, embs=embs)
-
-    ans_chunks = sum(1 for m in metas if m.get("source") == "web_answer")
-    news_chunks = sum(1 for m in metas if m.get("source") == "news")
-
     return {
-        "inserted": len(ids),
+        "inserted": inserted,
         "answer_chunks": ans_chunks,
         "news_total_chunks": news_chunks,         # meta/excerpt 포함
-        "news_meta_only_chunks": meta_only_total, # 전문 저장 금지 또는 본문 부족 기사 수
-        "answer_link_total_chunks": link_total_chunks,
+        "news_meta_only_chunks": stats["meta_only_total"], # 전문 저장 금지 또는 본문 부족 기사 수
+        "answer_link_total_chunks": stats["link_total_chunks"],
         "news_items": news_summaries,
         "answer_links": link_summaries,
         "collection": settings.CHROMA_COLLECTION,
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import logging
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 
 from django.conf import settings
@@ -34,6 +35,12 @@ def _client() -> genai.Client:
     if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
         raise RuntimeError("GOOGLE_APPLICATION_CREDENTIALS 가 .env에 설정되어야 합니다.")
 
+    return _build_client(proj, loc)
+
+
+@lru_cache(maxsize=2)
+def _build_client(proj: str, loc: str) -> genai.Client:
+    """(project, location) 당 1회만 생성해서 재사용."""
     c = genai.Client(vertexai=True, project=proj, location=loc)
     log.info("google-genai (Vertex) initialized: project=%s, location=%s", proj, loc)
     return c
@@ -1,22 +1,28 @@
 # ragapp/services/log_utils.py
 from __future__ import annotations
 
-import hmac
 import hashlib
 import logging
-from typing import Optional, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import timedelta
 
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 log = logging.getLogger(__name__)
 
 def _hash_ip(ip: str) -> str:
+    """
+    키드 BLAKE2b(96bit, 24 hex) 로 IP 가명화. 시크릿이 없으면 원문 그대로.
+    - HMAC-SHA256 을 24자로 자르던 이전 방식과 출력이 다르므로,
+      교체 이전에 저장된 해시와는 더 이상 일치하지 않음(같은 IP 이력 연결이 끊김)
+    - BLAKE2b 키 최대 길이가 64바이트라 시크릿은 앞 64바이트만 사용
+    """
     secret = (getattr(settings, "LOG_IP_HASH_SECRET", "") or "").encode("utf-8")
     if not secret or not ip:
         return ip or ""
-    return hmac.new(secret, ip.encode("utf-8"), hashlib.sha256).hexdigest()[:24]
+    return hashlib.blake2b(ip.encode("utf-8"), key=secret[:64], digest_size=12).hexdigest()
 
 def _client_ip_from_request(request) -> str:
     try:
@@ -29,11 +35,40 @@ def _client_ip_from_request(request) -> str:
     except Exception:
         return ""
 
+# log_query 대상 모델: [(모델 클래스, payload 키 → 모델 필드명)] 우선순위 순.
+# 최초 호출 때 1번만 import 해서 결정 (None = 아직 미결정)
+_LOG_TARGETS: Optional[List[Tuple[Any, Dict[str, str]]]] = None
+
+
+def _resolve_log_models() -> List[Tuple[Any, Dict[str, str]]]:
+    global _LOG_TARGETS
+    if _LOG_TARGETS is not None:
+        return _LOG_TARGETS
+    targets: List[Tuple[Any, Dict[str, str]]] = []
+    try:
+        from ragapp.models import ChatQueryLog  # type: ignore
+        targets.append(
+            (ChatQueryLog, {"ip": "ip", "query": "query", "extra": "extra", "created_at": "created_at"})
+        )
+    except Exception:
+        pass
+    try:
+        from ragapp.models import MyLog  # type: ignore
+        targets.append(
+            (MyLog, {"ip": "ip", "query": "message", "extra": "meta", "created_at": "created_at"})
+        )
+    except Exception:
+        pass
+    _LOG_TARGETS = targets
+    return targets
+
+
 def log_query(request, query: str, *, context: Optional[Dict[str, Any]] = None) -> None:
     """
     사용자 질의/행위를 로깅.
     - LOG_IP_HASHED=1이면 IP를 해시하여 저장
     - 모델이 없으면 안전하게 패스
+    - 저장 대상 모델은 _resolve_log_models() 가 최초 1회만 결정
     """
     ip = _client_ip_from_request(request) if request is not None else ""
     if getattr(settings, "LOG_IP_HASHED", False):
@@ -47,35 +82,45 @@ def log_query(request, query: str, *, context: Optional[Dict[str, Any]] = None)
     }
 
     try:
-        # 네가 쓰는 모델이 있으면 우선 시도
-        try:
-            from ragapp.models import ChatQueryLog  # type: ignore
-            ChatQueryLog.objects.create(
-                ip=payload["ip"],
-                query=payload["query"],
-                extra=payload["extra"],
-                created_at=payload["created_at"],
-            )
-        except Exception:
-            # 대체 모델 시도
+        # ChatQueryLog 우선, 실패하면 MyLog 로 대체
+        for model, fields in _resolve_log_models():
             try:
-                from ragapp.models import MyLog  # type: ignore
-                MyLog.objects.create(
-                    ip=payload["ip"],
-                    message=payload["query"],
-                    meta=payload["extra"],
-                    created_at=payload["created_at"],
-                )
+                model.objects.create(**{fields[k]: v for k, v in payload.items()})
+                return
             except Exception:
-                # 모델이 없거나 에러면 콘솔 로깅만
-                log.info("query_log %s", payload)
+                continue
+        # 모델이 없거나 에러면 콘솔 로깅만
+        log.info("query_log %s", payload)
     except Exception as e:
         log.warning("log_query failed: %s", e)
 
+_PURGE_CHUNK = 10_000
+
+
+def _purge_in_chunks(model, cutoff, chunk: int = _PURGE_CHUNK) -> int:
+    """
+    created_at < cutoff 행을 PK chunk 개씩 끊어서 삭제 (청크마다 트랜잭션).
+    한 번에 qs.delete() 하면 PK 전체를 메모리에 올리고 테이블을 오래 잠그므로.
+    """
+    qs = model.objects.filter(created_at__lt=cutoff).order_by().values_list("pk", flat=True)
+    deleted = 0
+    while True:
+        ids = list(qs[:chunk])
+        if not ids:
+            break
+        with transaction.atomic():
+            n, _ = model.objects.filter(pk__in=ids).delete()
+        deleted += n
+        if len(ids) < chunk:
+            break
+    return deleted
+
+
 def purge_old_logs() -> int:
     """
     보관기간(RETENTION_DAYS) 초과 로그를 삭제.
     - 모델이 없으면 0 반환
+    - count() 사전 조회 없이 delete() 가 돌려주는 개수를 합산
     """
     days = int(getattr(settings, "RETENTION_DAYS", 0) or 0)
     if days <= 0:
@@ -85,17 +130,13 @@ def purge_old_logs() -> int:
 
     try:
         from ragapp.models import ChatQueryLog  # type: ignore
-        qs = ChatQueryLog.objects.filter(created_at__lt=cutoff)
-        deleted += qs.count()
-        qs.delete()
+        deleted += _purge_in_chunks(ChatQueryLog, cutoff)
     except Exception:
         pass
 
     try:
         from ragapp.models import MyLog  # type: ignore
-        qs = MyLog.objects.filter(created_at__lt=cutoff)
-        deleted += qs.count()
-        qs.delete()
+        deleted += _purge_in_chunks(MyLog, cutoff)
     except Exception:
         pass
 
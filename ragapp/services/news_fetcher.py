@@ -1,20 +1,77 @@
 # ragapp/services/news_fetcher.py
 from __future__ import annotations
 
+import functools
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from html import unescape as _html_unescape
+from io import BytesIO
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlencode, urlparse, urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import CData, NavigableString
 from django.conf import settings
 from urllib import robotparser as _robotparser
 
+try:
+    import httpx  # 선택: HTTP/2 + 커넥션 풀
+except Exception:
+    httpx = None  # type: ignore
+
+try:
+    # requests 가 쓰는 인코딩 추정기(charset_normalizer 또는 chardet)
+    from requests.compat import chardet as _chardet  # type: ignore
+except Exception:
+    _chardet = None  # type: ignore
+
+try:
+    from cachetools import TTLCache  # 선택: 본문 캐시
+except Exception:
+    TTLCache = None  # type: ignore
+
+# 선택: lxml 있으면 BeautifulSoup 백엔드/RSS 스트리밍 파서를 C 구현으로
+try:
+    from lxml.etree import iterparse as _iterparse  # type: ignore
+    _HTML_PARSER = "lxml"
+except Exception:
+    from xml.etree.ElementTree import iterparse as _iterparse
+    _HTML_PARSER = "html.parser"
+
 log = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
+class NewsRow:
+    """
+    search_news_rss / crawl_news_bodies 결과 1건.
+    dict 대비 인스턴스당 메모리가 작음(__slots__). 기존 dict 호출부 호환용으로
+    get()/to_dict() 제공 (row.get("title") 그대로 동작).
+    """
+    title: str
+    url: str
+    final_url: str = ""
+    source: str = ""
+    published_at: str = ""
+    snippet: str = ""
+    news_body: str = ""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+
 # ─────────────────────────────────────────────────────────────
 # 기본 설정/헤더
 # ─────────────────────────────────────────────────────────────
@@ -28,21 +85,105 @@ _DEFAULT_TIMEOUT = int(getattr(settings, "HEADLESS_TIMEOUT_SEC", 12) or 12)
 _RESPECT_ROBOTS = bool(getattr(settings, "RESPECT_ROBOTS", True))
 _RATE_PER_HOST = float(getattr(settings, "CRAWL_RATE_LIMIT_PER_HOST", 1.0) or 1.0)  # req/sec
 _ALLOWLIST = list(getattr(settings, "ALLOWLIST_DOMAINS", []) or [])
+_MAX_HTML_BYTES = int(getattr(settings, "MAX_HTML_BYTES", 2_000_000) or 2_000_000)
+
+_HEADERS = {
+    "User-Agent": _UA,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
 
 _session = requests.Session()
-_session.headers.update(
-    {
-        "User-Agent": _UA,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "ko,en;q=0.9",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-    }
+_session.headers.update(_HEADERS)
+
+
+def _build_httpx_client():
+    """
+    httpx 가 있으면 HTTP/2 + 큰 커넥션 풀 클라이언트 (스레드 안전, CDN 연결 재사용).
+    h2 미설치면 HTTP/1.1 로, httpx 자체가 없으면 None → requests 세션 사용.
+    """
+    if httpx is None:
+        return None
+    limits = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+    try:
+        return httpx.Client(http2=True, headers=_HEADERS, limits=limits)
+    except ImportError:
+        return httpx.Client(headers=_HEADERS, limits=limits)
+
+
+_client = _build_httpx_client()
+
+
+@dataclass(slots=True)
+class _Resp:
+    url: str
+    status_code: int
+    headers: Any
+    encoding: Optional[str]  # 응답 헤더에 명시된 charset (없으면 None)
+    read: Callable[[int], bytes]  # 최대 n 바이트까지 본문 읽기(압축 해제 후)
+
+
+def _read_upto(chunks, n: int) -> bytes:
+    buf = bytearray()
+    for c in chunks:
+        buf += c
+        if len(buf) >= n:
+            break
+    return bytes(buf[:n])
+
+
+@contextmanager
+def _open(url: str, *, timeout: int | float) -> Iterator[_Resp]:
+    """
+    스트리밍 GET (리다이렉트 따라감). 헤더만 받은 상태로 _Resp 를 넘기고,
+    본문은 호출부가 read(n) 할 때만 내려받는다. 블록을 벗어나면 연결 반환.
+    """
+    if _client is not None:
+        with _client.stream("GET", url, timeout=timeout, follow_redirects=True) as r:
+            yield _Resp(
+                str(r.url) or url,
+                r.status_code,
+                r.headers,
+                r.charset_encoding,
+                lambda n: _read_upto(r.iter_bytes(), n),
+            )
+        return
+
+    r = _session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+    try:
+        enc = r.encoding
+        if enc and enc.lower() == "iso-8859-1":
+            enc = None  # requests 기본값일 뿐 서버가 명시한 게 아닐 수 있음
+        yield _Resp(
+            r.url or url,
+            r.status_code,
+            r.headers,
+            enc,
+            lambda n: r.raw.read(n, decode_content=True) or b"",
+        )
+    finally:
+        r.close()
+
+# fetch_article_text 결과 캐시: (url, min_chars) -> 본문, 1시간 유지
+# (답변 링크는 질의가 달라도 같은 URL이 자주 반복됨)
+_ARTICLE_CACHE_TTL = int(getattr(settings, "ARTICLE_CACHE_TTL_SEC", 3600) or 0)
+_ARTICLE_CACHE = (
+    TTLCache(maxsize=1024, ttl=_ARTICLE_CACHE_TTL)
+    if TTLCache is not None and _ARTICLE_CACHE_TTL > 0
+    else None
 )
+_ARTICLE_CACHE_LOCK = threading.Lock()
 
 # per-host rate limit state
-_LAST_REQ_AT = {}  # host -> timestamp (float, time.time())
-_RP_CACHE: dict[str, _robotparser.RobotFileParser] = {}  # host -> robots parser
+_LAST_REQ_AT: dict[str, float] = {}  # host -> 마지막 요청 시각 (time.monotonic())
+_RATE_MAX_SLEEP = float(getattr(settings, "CRAWL_RATE_MAX_SLEEP_SEC", 5.0) or 5.0)
+# robots.txt 캐시: "scheme://host" -> (parser, 만료 시각 monotonic)
+_RP_CACHE: dict[str, tuple[_robotparser.RobotFileParser, float]] = {}
+_ROBOTS_TTL_SEC = int(getattr(settings, "ROBOTS_TTL_SEC", 6 * 3600) or 0)
+_ROBOTS_NEG_TTL_SEC = int(getattr(settings, "ROBOTS_NEG_TTL_SEC", 600) or 0)  # 5xx/네트워크 실패
+_ROBOTS_MAX_BYTES = 512 * 1024
 
 # ─────────────────────────────────────────────────────────────
 # 도메인 화이트리스트
@@ -66,6 +207,33 @@ def _host_allowed(url: str) -> bool:
 # ─────────────────────────────────────────────────────────────
 # robots.txt
 # ─────────────────────────────────────────────────────────────
+def _load_robots(origin: str) -> tuple[_robotparser.RobotFileParser, float]:
+    """
+    origin("scheme://host")의 robots.txt 를 받아 (parser, ttl초) 반환.
+    - 최대 _ROBOTS_MAX_BYTES 까지만 읽음 (거대한 robots.txt 방지)
+    - 상태 코드 해석은 표준 RobotFileParser.read() 와 동일:
+      401/403 → 전부 금지, 그 외 4xx → 전부 허용, 5xx/네트워크 실패 → 판정 불가(금지)
+    - 5xx/실패는 짧은 TTL 로만 캐시해서 일시 장애로 호스트가 계속 막히지 않게
+    """
+    rp = _robotparser.RobotFileParser()
+    rp.set_url(f"{origin}/robots.txt")
+    try:
+        with _open(f"{origin}/robots.txt", timeout=5) as resp:
+            code = resp.status_code
+            if code == 200:
+                body = resp.read(_ROBOTS_MAX_BYTES)
+                rp.parse(body.decode("utf-8", errors="ignore").splitlines())
+            elif code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= code < 500:
+                rp.allow_all = True
+            else:
+                return rp, _ROBOTS_NEG_TTL_SEC
+    except Exception:
+        return rp, _ROBOTS_NEG_TTL_SEC
+    return rp, _ROBOTS_TTL_SEC
+
+
 def _robots_can_fetch(url: str) -> bool:
     if not _RESPECT_ROBOTS:
         return True
@@ -74,17 +242,14 @@ def _robots_can_fetch(url: str) -> bool:
         host = parsed.netloc.lower()
         if not host:
             return False
-        rp = _RP_CACHE.get(host)
-        if rp is None:
-            robots_url = f"{parsed.scheme}://{host}/robots.txt"
-            rp = _robotparser.RobotFileParser()
-            rp.set_url(robots_url)
-            try:
-                rp.read()
-            except Exception:
-                # robots 불가시 보수적으로 허용 (혹은 False로 바꿀 수 있음)
-                pass
-            _RP_CACHE[host] = rp
+        origin = f"{parsed.scheme}://{host}"
+        now = time.monotonic()
+        cached = _RP_CACHE.get(origin)
+        if cached is None or cached[1] <= now:
+            rp, ttl = _load_robots(origin)
+            _RP_CACHE[origin] = (rp, now + ttl)
+        else:
+            rp = cached[0]
         return rp.can_fetch(_UA, url)
     except Exception:
         return True
@@ -93,23 +258,70 @@ def _robots_can_fetch(url: str) -> bool:
 # Rate limit per host
 # ─────────────────────────────────────────────────────────────
 def _rate_limit_wait(url: str) -> None:
+    """
+    호스트별 최소 간격(1/_RATE_PER_HOST 초) 보장.
+    - 시계는 time.monotonic() (NTP 보정으로 벽시계가 뒤로 가도 간격이 깨지지 않음)
+    - 1회 대기 상한은 CRAWL_RATE_MAX_SLEEP_SEC (기본 5초)
+    """
     try:
         host = (urlparse(url).netloc or "").lower()
         if not host or _RATE_PER_HOST <= 0:
             return
         min_interval = 1.0 / _RATE_PER_HOST
-        last_at = _LAST_REQ_AT.get(host, 0.0)
-        now = time.time()
-        wait = last_at + min_interval - now
-        if wait > 0:
-            time.sleep(min(wait, 1.5))
-        _LAST_REQ_AT[host] = time.time()
+        last_at = _LAST_REQ_AT.get(host)
+        if last_at is not None:
+            wait = last_at + min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, _RATE_MAX_SLEEP))
+        _LAST_REQ_AT[host] = time.monotonic()
     except Exception:
         pass
 
 # ─────────────────────────────────────────────────────────────
 # HTML 파서 유틸
 # ─────────────────────────────────────────────────────────────
+_RE_WS = re.compile(r"\s+")
+_RE_SECTION = re.compile(r"(article|content|post|story)", re.I)
+_RE_TAG = re.compile(r"<[^>]+>")
+_DROP_TAGS = ["script", "style", "noscript"]
+_LAYOUT_TAGS = ["nav", "footer", "aside"]
+_MAIN_TAGS = ["article", "main"]
+# 제목/메타 설명만 필요할 때는 <title>/<meta> 만 트리로 만든다 (본문 노드 생성 생략)
+_HEAD_STRAINER = SoupStrainer(["title", "meta"])
+
+_PARSE_MEMO_SIZE = 512
+
+
+def _memo_by_html(fn):
+    """
+    HTML 파싱 결과를 SHA1(html) 기준으로 LRU 캐시 (최대 _PARSE_MEMO_SIZE 개).
+    같은 기사를 다시 크롤해도 BeautifulSoup 파싱/스코어링을 반복하지 않음.
+    (html 문자열 자체를 키로 쥐고 있지 않도록 해시만 보관)
+    """
+    cache: "OrderedDict[tuple, Any]" = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(fn)
+    def wrapper(html: str, **kw):
+        if not html:
+            return fn(html, **kw)
+        key = (hashlib.sha1(html.encode("utf-8", "ignore")).hexdigest(), tuple(sorted(kw.items())))
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        val = fn(html, **kw)
+        with lock:
+            cache[key] = val
+            if len(cache) > _PARSE_MEMO_SIZE:
+                cache.popitem(last=False)
+        return val
+
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+@_memo_by_html
 def _extract_title_and_desc(html: str) -> Tuple[str, str]:
     """
     <title>과 <meta name='description'>, og:description 등에서 요약을 뽑는다.
@@ -117,7 +329,7 @@ def _extract_title_and_desc(html: str) -> Tuple[str, str]:
     """
     if not html:
         return "", ""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _HTML_PARSER, parse_only=_HEAD_STRAINER)
 
     # title
     title = ""
@@ -139,10 +351,33 @@ def _extract_title_and_desc(html: str) -> Tuple[str, str]:
 
 
 def _clean_text(s: str) -> str:
-    s = re.sub(r"\s+", " ", (s or "").strip())
-    return s
+    return _RE_WS.sub(" ", (s or "").strip())
 
 
+def _best_text_node(candidates, root):
+    """
+    후보 중 정리된 텍스트(_clean_text(get_text(" ", strip=True)))가 가장 긴 노드.
+    후보마다 get_text 로 하위 트리를 다시 도는 대신, 문서의 문자열을 한 번만 훑으면서
+    조상 중 후보인 노드들에 길이를 누적한다.
+    (조각 길이 합 + 조각 사이 공백 수) == get_text(" ", strip=True) 후 정리한 길이
+    """
+    acc = {id(c): [0, 0] for c in candidates}  # id → [글자 수, 조각 수]
+    for node in root.descendants:
+        if not (type(node) is NavigableString or isinstance(node, CData)):
+            continue
+        n = len(_clean_text(node))
+        if not n:
+            continue
+        for p in node.parents:
+            a = acc.get(id(p))
+            if a is not None:
+                a[0] += n
+                a[1] += 1
+    # 동점이면 먼저 나온 후보 (max 와 동일)
+    return max(candidates, key=lambda c: acc[id(c)][0] + max(acc[id(c)][1] - 1, 0), default=None)
+
+
+@_memo_by_html
 def _extract_main_text(html: str, *, hard_limit: int = 40_000) -> str:
     """
     가벼운 휴리스틱으로 본문 텍스트를 추출.
@@ -151,32 +386,28 @@ def _extract_main_text(html: str, *, hard_limit: int = 40_000) -> str:
     if not html:
         return ""
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _HTML_PARSER)
 
     # 제거: script/style/noscript/nav/footer/aside
-    for tag in soup(["script", "style", "noscript"]):
+    for tag in soup(_DROP_TAGS):
         tag.decompose()
-    for tag in soup.find_all(["nav", "footer", "aside"]):
+    for tag in soup.find_all(_LAYOUT_TAGS):
         tag.decompose()
 
     # 후보: article, main, id/class에 article|content|post|story 포함
     candidates = []
-    for sel in ["article", "main"]:
+    for sel in _MAIN_TAGS:
         candidates.extend(soup.find_all(sel))
 
-    def _score(node):
-        text = _clean_text(node.get_text(" ", strip=True))
-        return len(text)
-
     if not candidates:
         # class/id 휴리스틱
         candidates = [
-            *soup.find_all(attrs={"id": re.compile(r"(article|content|post|story)", re.I)}),
-            *soup.find_all(attrs={"class": re.compile(r"(article|content|post|story)", re.I)}),
+            *soup.find_all(attrs={"id": _RE_SECTION}),
+            *soup.find_all(attrs={"class": _RE_SECTION}),
         ]
 
     if candidates:
-        best = max(candidates, key=_score, default=None)
+        best = _best_text_node(candidates, soup)
         text = _clean_text(best.get_text(" ", strip=True)) if best else ""
     else:
         # fallback: body 전체
@@ -190,43 +421,108 @@ def _extract_main_text(html: str, *, hard_limit: int = 40_000) -> str:
 # ─────────────────────────────────────────────────────────────
 # HTTP fetch
 # ─────────────────────────────────────────────────────────────
-def _fetch_html(url: str, *, timeout: int | float) -> tuple[str, str]:
+_HTML_CTYPES = ("text/html", "application/xhtml+xml")
+_XML_CTYPES = ("xml", "rss")  # application/rss+xml, application/xml, text/xml
+
+
+def _fetch_bytes(
+    url: str, *, timeout: int | float, ctypes: Tuple[str, ...]
+) -> tuple[str, bytes, Optional[str]]:
     """
-    반환: (final_url, html)
+    allowlist/robots/rate-limit 적용 후 원시 바이트를 받아온다.
+    반환: (final_url, raw, 응답 헤더에 명시된 인코딩 또는 None)
+    - 헤더만 먼저 받고(stream) Content-Type 이 ctypes 중 하나를 포함하지 않거나
+      Content-Length 가 _MAX_HTML_BYTES 를 넘으면 본문을 내려받지 않음
     """
     if not url or not _host_allowed(url):
-        return "", ""
+        return "", b"", None
 
     if not _robots_can_fetch(url):
         log.info("robots.txt에 의해 차단: %s", url)
-        return "", ""
+        return "", b"", None
 
     _rate_limit_wait(url)
 
     try:
-        resp = _session.get(url, timeout=timeout, allow_redirects=True)
-        ctype = (resp.headers.get("Content-Type") or "").lower()
-        if "text/html" not in ctype and "application/xhtml+xml" not in ctype:
-            return resp.url or url, ""
-
-        # 인코딩 보정
-        if not resp.encoding or resp.encoding.lower() == "iso-8859-1":
-            resp.encoding = resp.apparent_encoding or "utf-8"
-
-        html = resp.text or ""
-        return resp.url or url, html
+        with _open(url, timeout=timeout) as resp:
+            final = resp.url
+            ctype = (resp.headers.get("Content-Type") or "").lower()
+            if not any(t in ctype for t in ctypes):
+                return final, b"", None
+            try:
+                clen = int(resp.headers.get("Content-Length") or 0)
+            except ValueError:
+                clen = 0
+            if clen > _MAX_HTML_BYTES:
+                log.info("응답 크기 초과(%d bytes) 스킵: %s", clen, url)
+                return final, b"", None
+
+            # Content-Length 가 없거나 거짓이어도 최대 _MAX_HTML_BYTES 까지만 읽음
+            return final, resp.read(_MAX_HTML_BYTES), resp.encoding
     except Exception as e:
         log.warning("fetch 실패: %s (%s)", url, e)
-        return "", ""
+        return "", b"", None
+
+
+def _fetch_html(url: str, *, timeout: int | float) -> tuple[str, str]:
+    """
+    반환: (final_url, html)
+    """
+    final, raw, enc = _fetch_bytes(url, timeout=timeout, ctypes=_HTML_CTYPES)
+    if not raw:
+        return final, ""
+
+    # 인코딩 보정 (apparent_encoding 은 전체 본문을 다시 읽으므로 잘린 raw 로 직접 추정)
+    if not enc and _chardet is not None:
+        try:
+            enc = _chardet.detect(raw).get("encoding")
+        except Exception:
+            enc = None
+    try:
+        return final, raw.decode(enc or "utf-8", errors="replace")
+    except LookupError:
+        return final, raw.decode("utf-8", errors="replace")
+
+
+# 세션 내 HTML 캐시: url -> ((final_url, html), 만료 시각 monotonic)
+# 여러 RSS 질의에 같은 기사가 반복될 때 robots/레이트리밋/네트워크를 모두 건너뜀
+_HTML_CACHE_TTL = float(getattr(settings, "FETCH_HTML_CACHE_TTL_SEC", 600) or 0)
+_HTML_CACHE_MAX = int(getattr(settings, "FETCH_HTML_CACHE_MAX", 128) or 128)
+_HTML_CACHE: "OrderedDict[str, tuple[tuple[str, str], float]]" = OrderedDict()
+_HTML_CACHE_LOCK = threading.Lock()
+
+
+def _fetch_html_cached(url: str, *, timeout: int | float) -> tuple[str, str]:
+    """_fetch_html 앞단 TTL LRU. 성공(html 있음)한 결과만 캐시."""
+    if _HTML_CACHE_TTL <= 0:
+        return _fetch_html(url, timeout=timeout)
+
+    now = time.monotonic()
+    with _HTML_CACHE_LOCK:
+        hit = _HTML_CACHE.get(url)
+        if hit is not None:
+            if hit[1] > now:
+                _HTML_CACHE.move_to_end(url)
+                return hit[0]
+            del _HTML_CACHE[url]
+
+    final, html = _fetch_html(url, timeout=timeout)
+    if html:
+        with _HTML_CACHE_LOCK:
+            _HTML_CACHE[url] = ((final, html), time.monotonic() + _HTML_CACHE_TTL)
+            _HTML_CACHE.move_to_end(url)
+            while len(_HTML_CACHE) > _HTML_CACHE_MAX:
+                _HTML_CACHE.popitem(last=False)
+    return final, html
 
 # ─────────────────────────────────────────────────────────────
 # 공개 API
 # ─────────────────────────────────────────────────────────────
-def search_news_rss(query: str, topk: int = 5) -> List[Dict]:
+def search_news_rss(query: str, topk: int = 5) -> List[NewsRow]:
     """
     Google News RSS 템플릿 기반으로 헤드라인만 가져온다.
-    반환 item dict 예시:
-      {title, url, source, published_at, snippet}
+    반환: NewsRow(title, url, source, published_at, snippet) 리스트
+    - <item> 단위로 스트리밍 파싱(iterparse)해서 topk 개를 채우면 바로 중단
     """
     tmpl = getattr(
         settings,
@@ -234,39 +530,36 @@ def search_news_rss(query: str, topk: int = 5) -> List[Dict]:
         "https://news.google.com/rss/search?q={query}&hl=ko&gl=KR&ceid=KR:ko",
     )
     url = tmpl.format(query=urlencode({"": query})[1:])  # 'q=...'만 치환
-    final, html = _fetch_html(url, timeout=_DEFAULT_TIMEOUT)
-    if not html:
+    final, raw, _ = _fetch_bytes(url, timeout=_DEFAULT_TIMEOUT, ctypes=_XML_CTYPES)
+    if not raw or topk <= 0:
         return []
 
-    soup = BeautifulSoup(html, "xml")
-    items = soup.find_all("item")[: max(0, topk)]
-
-    out = []
-    for it in items:
-        title = (it.title.text if it.title else "").strip()
-        link = (it.link.text if it.link else "").strip()
-        pub = (it.pubDate.text if it.pubDate else "") or (it.find_text("published") or "")
-        source = ""
-        src_tag = it.find("source")
-        if src_tag and src_tag.text:
-            source = src_tag.text.strip()
-        if not source:
-            source = (urlparse(link).netloc or "").lower()
-
-        # desc/snippet
-        desc = (it.description.text if it.description else "") or ""
-        snippet = BeautifulSoup(desc, "html.parser").get_text(" ", strip=True)
-        snippet = _clean_text(snippet)[:300]
-
-        out.append(
-            {
-                "title": title,
-                "url": link,
-                "source": source,
-                "published_at": pub,
-                "snippet": snippet,
-            }
-        )
+    out: List[NewsRow] = []
+    try:
+        # XML 선언의 인코딩은 파서가 직접 처리하므로 bytes 그대로 넘김
+        for _, it in _iterparse(BytesIO(raw), events=("end",)):
+            if it.tag != "item":
+                continue
+            title = (it.findtext("title") or "").strip()
+            link = (it.findtext("link") or "").strip()
+            pub = it.findtext("pubDate") or it.findtext("published") or ""
+            source = (it.findtext("source") or "").strip()
+            if not source:
+                source = (urlparse(link).netloc or "").lower()
+
+            # desc/snippet: 설명 안의 HTML 은 태그만 걷어내고 엔티티 복원
+            desc = it.findtext("description") or ""
+            snippet = _clean_text(_html_unescape(_RE_TAG.sub(" ", desc)))[:300]
+            it.clear()
+
+            out.append(
+                NewsRow(title=title, url=link, source=source, published_at=pub, snippet=snippet)
+            )
+            if len(out) >= topk:
+                break
+    except Exception as e:
+        # 잘린/깨진 피드: 그때까지 읽은 항목만 반환
+        log.warning("RSS 파싱 실패: %s (%s)", url, e)
     return out
 
 
@@ -276,9 +569,18 @@ def fetch_article_text(url: str, *, timeout: int | float = None, min_chars: int
     - allowlist/robots/rate-limit 적용
     - text/html 아닌 경우 빈 문자열
     - 본문 길이가 min_chars 미만이면 빈 문자열(노이즈 방지)
+    - 성공한 본문은 _ARTICLE_CACHE(TTL) 에 보관해서 같은 URL 재요청 시 네트워크 생략
+      (일시적 실패일 수 있는 빈 결과는 캐시하지 않음)
     """
+    key = (url, int(min_chars or 0))
+    if _ARTICLE_CACHE is not None:
+        with _ARTICLE_CACHE_LOCK:
+            hit = _ARTICLE_CACHE.get(key)
+        if hit is not None:
+            return hit
+
     timeout = timeout or _DEFAULT_TIMEOUT
-    final, html = _fetch_html(url, timeout=timeout)
+    final, html = _fetch_html_cached(url, timeout=timeout)
     if not html:
         return ""
 
@@ -286,57 +588,79 @@ def fetch_article_text(url: str, *, timeout: int | float = None, min_chars: int
     if len(text) < max(0, int(min_chars or 0)):
         # 메타 설명이라도 반환할지? 저장 로직은 상위에서 결정하므로 여기선 빈값 유지
         return ""
+    if _ARTICLE_CACHE is not None:
+        with _ARTICLE_CACHE_LOCK:
+            _ARTICLE_CACHE[key] = text
     return text
 
 
-def crawl_news_bodies(news_headers: List[Dict], *, timeout: int | float = None) -> List[Dict]:
+def _crawl_one(h: Any, timeout: int | float) -> Optional[NewsRow]:
+    """헤드라인 1건(NewsRow 또는 dict) → 본문/요약 포함 NewsRow. allowlist 밖이면 None."""
+    url = (h.get("url") or "").strip()
+    if not url or not _host_allowed(url):
+        # allowlist 밖이면 아예 스킵
+        return None
+
+    final, html = _fetch_html_cached(url, timeout=timeout)
+    if not html:
+        # 본문 실패시 기본 메타만 유지
+        desc = h.get("snippet") or ""
+        if not desc:
+            _, desc = _extract_title_and_desc(html or "")
+        return NewsRow(
+            title=h.get("title") or "",
+            url=url,
+            final_url=final or url,
+            source=h.get("source") or (urlparse(url).netloc or ""),
+            published_at=h.get("published_at") or "",
+            snippet=desc,
+        )
+
+    # 요약/본문 추출
+    title0, desc0 = _extract_title_and_desc(html)
+    main_text = _extract_main_text(html)
+
+    return NewsRow(
+        title=(h.get("title") or title0 or (urlparse(url).netloc or "뉴스")).strip(),
+        url=url,
+        final_url=final or url,
+        source=h.get("source") or (urlparse(url).netloc or ""),
+        published_at=h.get("published_at") or "",
+        snippet=(h.get("snippet") or desc0 or "").strip(),
+        news_body=main_text,
+    )
+
+
+def crawl_news_bodies(
+    news_headers: List[Any], *, timeout: int | float = None, max_workers: int = 16
+) -> List[NewsRow]:
     """
     search_news_rss 결과에 대해 (허용 시) 본문을 추가로 가져온다.
     안전모드/요약저장 여부는 '저장 단계'에서 이미 강제되므로 여기서는 단순 수집만 담당.
+    - 호스트별로 묶어서 호스트끼리는 동시에, 같은 호스트 안에서는 순서대로 가져옴
+      (per-host rate limit 이 스레드 경쟁 없이 그대로 지켜짐)
+    - 결과 순서는 입력 순서 유지
     """
     timeout = timeout or _DEFAULT_TIMEOUT
-    out = []
-    for h in news_headers or []:
-        url = (h.get("url") or "").strip()
-        if not url or not _host_allowed(url):
-            # allowlist 밖이면 아예 스킵
-            continue
+    headers = list(news_headers or [])
+    if not headers:
+        return []
 
-        final, html = _fetch_html(url, timeout=timeout)
-        if not html:
-            # 본문 실패시 기본 메타만 유지
-            title = h.get("title") or ""
-            source = h.get("source") or (urlparse(url).netloc or "")
-            pub = h.get("published_at") or ""
-            desc = h.get("snippet") or ""
-            if not desc:
-                _, desc = _extract_title_and_desc(html or "")
-            out.append(
-                {
-                    "title": title,
-                    "url": url,
-                    "final_url": final or url,
-                    "source": source,
-                    "published_at": pub,
-                    "snippet": desc,
-                    "news_body": "",
-                }
-            )
-            continue
+    buckets: Dict[str, List[int]] = {}
+    for i, h in enumerate(headers):
+        host = (urlparse((h.get("url") or "").strip()).netloc or "").lower()
+        buckets.setdefault(host, []).append(i)
 
-        # 요약/본문 추출
-        title0, desc0 = _extract_title_and_desc(html)
-        main_text = _extract_main_text(html)
-
-        out.append(
-            {
-                "title": (h.get("title") or title0 or (urlparse(url).netloc or "뉴스")).strip(),
-                "url": url,
-                "final_url": final or url,
-                "source": h.get("source") or (urlparse(url).netloc or ""),
-                "published_at": h.get("published_at") or "",
-                "snippet": (h.get("snippet") or desc0 or "").strip(),
-                "news_body": main_text,
-            }
-        )
-    return out
+    results: List[Optional[NewsRow]] = [None] * len(headers)
+
+    def _crawl_host(idxs: List[int]) -> None:
+        for i in idxs:
+            try:
+                results[i] = _crawl_one(headers[i], timeout)
+            except Exception as e:
+                log.warning("crawl_news_bodies 작업 실패: %s", e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(buckets)))) as ex:
+        for f in as_completed([ex.submit(_crawl_host, idxs) for idxs in buckets.values()]):
+            f.result()
+    return [r for r in results if r is not None]
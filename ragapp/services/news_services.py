@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import os
 import re
+import html
 import json
 import hashlib
+import heapq
 import logging
 import inspect
-from typing import List, Dict, Tuple, Optional, Any
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Dict, Tuple, Optional, Any, NamedTuple
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from urllib.parse import (
     quote_plus,
     urlparse,
@@ -16,14 +22,33 @@ from urllib.parse import (
 )
 
 from pathlib import Path
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import zip_longest
 
 # ⚠️ 순환 참조/의도치 오버라이드 방지를 위해 제거
 # from ragapp.news_views.news_services import *
 
+import numpy as np
 import requests
 from django.conf import settings
 
+from ragapp.services import semantic_cache
+from ragapp.services.embed_cache import embed_with_cache
+from ragapp.services.vector_ops import unit_cosine_dist
+
+try:
+    from cachetools import TTLCache  # 선택: 질의 임베딩 메모리 캐시
+except Exception:
+    TTLCache = None  # type: ignore
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer  # 선택: 본문 추출/구글뉴스 원문 복원
+except Exception:
+    BeautifulSoup = None  # type: ignore
+    SoupStrainer = None  # type: ignore
+
 try:
     # DB 기반 FAQ 후보 가져오는 함수
     from ragapp.qa_data import get_faq_candidates  # type: ignore
@@ -39,6 +64,7 @@ log = logging.getLogger(__name__)
 # =============================================================================
 
 _GENAI_CLIENT = None
+_GENAI_LOCK = threading.Lock()
 
 
 def _check_adc_env(project: Optional[str], location: Optional[str]) -> None:
@@ -62,41 +88,47 @@ def _check_adc_env(project: Optional[str], location: Optional[str]) -> None:
 def _genai_client():
     """
     Vertex AI 백엔드로 고정된 google-genai Client 생성(1회 캐시).
+    - 동시 첫 호출에서 Client 를 중복 생성하지 않도록 락 + 재확인(double-checked)
+    - AppConfig.ready() 에서 미리 한 번 호출해 첫 요청의 초기화 지연을 없앰
     """
     global _GENAI_CLIENT
     if _GENAI_CLIENT is not None:
         return _GENAI_CLIENT
 
-    try:
-        from google import genai
-        from google.genai import types as genai_types  # 일부 배포판 호환
-    except Exception as e:
-        raise RuntimeError(
-            "google-genai 패키지가 없습니다. `pip install -U google-genai` 후 다시 시도하세요."
-        ) from e
+    with _GENAI_LOCK:
+        if _GENAI_CLIENT is not None:
+            return _GENAI_CLIENT
 
-    project = getattr(settings, "VERTEX_PROJECT_ID", None) or os.environ.get("VERTEX_PROJECT_ID")
-    location = getattr(settings, "VERTEX_LOCATION", None) or os.environ.get("VERTEX_LOCATION") or "us-central1"
+        try:
+            from google import genai
+            from google.genai import types as genai_types  # 일부 배포판 호환
+        except Exception as e:
+            raise RuntimeError(
+                "google-genai 패키지가 없습니다. `pip install -U google-genai` 후 다시 시도하세요."
+            ) from e
 
-    _check_adc_env(project, location)
+        project = getattr(settings, "VERTEX_PROJECT_ID", None) or os.environ.get("VERTEX_PROJECT_ID")
+        location = getattr(settings, "VERTEX_LOCATION", None) or os.environ.get("VERTEX_LOCATION") or "us-central1"
 
-    if not project:
-        raise RuntimeError("VERTEX_PROJECT_ID 가 설정되어야 합니다. (settings.py 또는 환경변수)")
+        _check_adc_env(project, location)
 
-    # Vertex 라우팅 + stable v1 (가능한 한 보수적으로)
-    try:
-        http_opts = genai_types.HttpOptions(api_version="v1")
-    except Exception:
-        from google import genai as _g
-        http_opts = _g.types.HttpOptions(api_version="v1")
-
-    _GENAI_CLIENT = genai.Client(
-        vertexai=True,
-        project=project,
-        location=location,
-        http_options=http_opts,
-    )
-    return _GENAI_CLIENT
+        if not project:
+            raise RuntimeError("VERTEX_PROJECT_ID 가 설정되어야 합니다. (settings.py 또는 환경변수)")
+
+        # Vertex 라우팅 + stable v1 (가능한 한 보수적으로)
+        try:
+            http_opts = genai_types.HttpOptions(api_version="v1")
+        except Exception:
+            from google import genai as _g
+            http_opts = _g.types.HttpOptions(api_version="v1")
+
+        _GENAI_CLIENT = genai.Client(
+            vertexai=True,
+            project=project,
+            location=location,
+            http_options=http_opts,
+        )
+        return _GENAI_CLIENT
 
 
 # ── 모델 선택 유틸 (★ 모델은 .env에서만 읽기 — settings/인자 무시)
@@ -248,9 +280,107 @@ def ask_gemini(prompt: str, model: Optional[str] = None) -> str:
         return msg
 
 
-def _embed_texts(texts: List[str]) -> List[List[float]]:
+@lru_cache(maxsize=8)
+def _embed_param_name(fn) -> str:
+    """embed_content 의 입력 파라미터명(contents/content/input). SDK 함수당 1번만 inspect."""
+    try:
+        params = inspect.signature(fn).parameters
+    except Exception:
+        return "contents"
+    for name in ("contents", "content", "input"):
+        if name in params:
+            return name
+    return "contents"
+
+
+# 임베딩 메모리 캐시: sha256(모델|텍스트) -> float32 벡터
+# 같은 질문/질의가 짧은 시간에 반복(FAQ 매칭 → 벡터 검색 → 뉴스 답변)되는 경우가 많아서
+# API 왕복 전에 프로세스 메모리 → embed_cache(SQLite) 순으로 먼저 찾는다.
+_EMBED_MEMO_TTL = int(
+    os.environ.get("EMBED_CACHE_TTL_SEC") or getattr(settings, "EMBED_CACHE_TTL_SEC", None) or 3600
+)
+_EMBED_MEMO = (
+    TTLCache(maxsize=4096, ttl=_EMBED_MEMO_TTL)
+    if TTLCache is not None and _EMBED_MEMO_TTL > 0
+    else None
+)
+_EMBED_MEMO_LOCK = threading.Lock()
+_EMBED_STATS = {"hits": 0, "misses": 0}
+
+
+def _embed_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}|{text}".encode("utf-8", "ignore")).hexdigest()
+
+
+def embed_cache_stats() -> Dict[str, int]:
+    """메모리 임베딩 캐시 적중/미스 횟수 (디버그/모니터링용)."""
+    with _EMBED_MEMO_LOCK:
+        return {**_EMBED_STATS, "size": len(_EMBED_MEMO) if _EMBED_MEMO is not None else 0}
+
+
+def _embed_texts(texts: List[str]) -> List[np.ndarray]:
+    """
+    텍스트 리스트 → float32 임베딩 배열 리스트 (캐시 경유).
+    메모리 LRU+TTL → embed_cache(SQLite, 모델+내용 해시) → 실제 API(_embed_texts_remote) 순.
     """
-    텍스트 리스트 → 임베딩 리스트.
+    if not texts:
+        return []
+
+    batch = []
+    for t in texts:
+        s = ("" if t is None else str(t)).strip()
+        batch.append(s if s else " ")
+
+    model = _env_embed_model()
+    keys = [_embed_key(model, t) for t in batch]
+    vecs: List[Optional[np.ndarray]] = [None] * len(batch)
+    if _EMBED_MEMO is not None:
+        with _EMBED_MEMO_LOCK:
+            for i, k in enumerate(keys):
+                vecs[i] = _EMBED_MEMO.get(k)
+    miss = [i for i, v in enumerate(vecs) if v is None]
+
+    with _EMBED_MEMO_LOCK:
+        _EMBED_STATS["hits"] += len(batch) - len(miss)
+        _EMBED_STATS["misses"] += len(miss)
+
+    if miss:
+        fresh = embed_with_cache([batch[i] for i in miss], model, _embed_texts_remote)
+        with _EMBED_MEMO_LOCK:
+            for i, v in zip(miss, fresh):
+                vecs[i] = np.asarray(v, dtype=np.float32)
+                # 메모 캐시와 호출부가 같은 배열을 공유하므로 제자리 수정 방지
+                vecs[i].setflags(write=False)
+                if _EMBED_MEMO is not None:
+                    _EMBED_MEMO[keys[i]] = vecs[i]
+
+    return vecs  # type: ignore[return-value]
+
+
+def _embed_texts_dedup(texts: List[str]) -> List[np.ndarray]:
+    """
+    같은 내용의 텍스트(반복되는 기사 꼬리말/제목 등)는 한 번만 임베딩하고
+    결과를 원래 순서대로 펼쳐서 돌려준다.
+    """
+    uniq: Dict[bytes, int] = {}
+    order: List[str] = []
+    idx_map: List[int] = []
+    for t in texts:
+        h = hashlib.sha1((t or "").encode("utf-8")).digest()
+        j = uniq.get(h)
+        if j is None:
+            j = uniq[h] = len(order)
+            order.append(t)
+        idx_map.append(j)
+    if len(order) < len(texts):
+        log.debug("embed dedup: %d → %d", len(texts), len(order))
+    vecs_unique = _embed_texts(order)
+    return [vecs_unique[j] for j in idx_map]
+
+
+def _embed_texts_remote(texts: List[str]) -> List[np.ndarray]:
+    """
+    텍스트 리스트 → float32 임베딩 배열 리스트 (API 직접 호출).
     1) Vertex SDK(TextEmbeddingModel) 우선
     2) 실패하면 google-genai(API Key)로 폴백
     """
@@ -295,35 +425,36 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
         except TypeError:
             emb_objs = model.get_embeddings(input=batch)  # 다른 버전
 
-        def _vec_from(obj) -> List[float]:
+        def _vec_from(obj) -> np.ndarray:
+            # SDK 의 values(파이썬 float 시퀀스) → float32 배열을 C 레벨에서 한 번에 변환
             if hasattr(obj, "values"):
-                return [float(x) for x in list(getattr(obj, "values"))]
+                return np.asarray(getattr(obj, "values"), dtype=np.float32)
             if hasattr(obj, "embedding"):
                 emb = getattr(obj, "embedding")
                 if hasattr(emb, "values"):
-                    return [float(x) for x in list(getattr(emb, "values"))]
+                    return np.asarray(getattr(emb, "values"), dtype=np.float32)
                 if isinstance(emb, (list, tuple)):
-                    return [float(x) for x in emb]
+                    return np.asarray(emb, dtype=np.float32)
             if isinstance(obj, dict):
                 if "values" in obj and isinstance(obj["values"], (list, tuple)):
-                    return [float(x) for x in obj["values"]]
+                    return np.asarray(obj["values"], dtype=np.float32)
                 emb = obj.get("embedding")
                 if isinstance(emb, dict) and "values" in emb:
-                    return [float(x) for x in emb["values"]]
+                    return np.asarray(emb["values"], dtype=np.float32)
                 if isinstance(emb, (list, tuple)):
-                    return [float(x) for x in emb]
-            return [float(x) for x in list(obj)]
+                    return np.asarray(emb, dtype=np.float32)
+            return np.asarray(list(obj), dtype=np.float32)
 
         if isinstance(emb_objs, list):
-            out = [_vec_from(e) for e in emb_objs]
+            vecs = [_vec_from(e) for e in emb_objs]
         else:
             cand = getattr(emb_objs, "embeddings", None)
-            out = [_vec_from(e) for e in (cand or [emb_objs])]
+            vecs = [_vec_from(e) for e in (cand or [emb_objs])]
 
-        if not out or any(not v for v in out):
+        if not vecs or any(v.ndim != 1 or not v.size for v in vecs):
             raise RuntimeError("Vertex 임베딩 응답 파싱 실패")
 
-        return out
+        return vecs
 
     except Exception as e_vertex:
         log.warning("Vertex 임베딩 실패 → google-genai 폴백 시도: %s", e_vertex)
@@ -331,7 +462,6 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
     # ── 2) google-genai(API Key) 폴백 ───────────────────────────────
     try:
         from google import genai
-        from inspect import signature
 
         api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
         if not api_key:
@@ -344,18 +474,7 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
             cli = genai.Client(api_key=api_key)
 
         model_name = _env_embed_model()  # 예: text-embedding-004
-        try:
-            sig = signature(cli.models.embed_content)
-            if "contents" in sig.parameters:
-                param = "contents"
-            elif "content" in sig.parameters:
-                param = "content"
-            elif "input" in sig.parameters:
-                param = "input"
-            else:
-                param = "contents"
-        except Exception:
-            param = "contents"
+        param = _embed_param_name(getattr(cli.models.embed_content, "__func__", cli.models.embed_content))
 
         def _parse(resp: Any) -> List[float]:
             try:
@@ -385,12 +504,26 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
                         return list(first["values"])
             raise RuntimeError("genai 임베딩 응답 파싱 실패")
 
-        out: List[List[float]] = []
-        for t in batch:
-            r = cli.models.embed_content(model=model_name, **{param: t})
-            out.append([float(x) for x in _parse(r)])
-
-        if not out or any(not v for v in out):
+        out: List[np.ndarray] = []
+        # (a) 리스트 입력을 받는 SDK 면 요청 1번으로 전체 배치
+        try:
+            r = cli.models.embed_content(model=model_name, **{param: batch})
+            embs = getattr(r, "embeddings", None) or []
+            if len(embs) == len(batch):
+                out = [np.asarray(getattr(e, "values", None) or [], dtype=np.float32) for e in embs]
+        except Exception as e_batch:
+            log.debug("genai 배치 임베딩 불가 → 개별 요청: %s", e_batch)
+
+        # (b) 배치 실패 시 1건씩, 대신 동시에 (RTT 를 N번 직렬로 기다리지 않도록)
+        if not out or any(not v.size for v in out):
+            def _one(t: str) -> np.ndarray:
+                r1 = cli.models.embed_content(model=model_name, **{param: t})
+                return np.asarray(_parse(r1), dtype=np.float32)
+
+            with ThreadPoolExecutor(max_workers=min(8, len(batch))) as ex:
+                out = list(ex.map(_one, batch))
+
+        if not out or any(not v.size for v in out):
             raise RuntimeError("genai 임베딩 결과 비어있음")
         return out
 
@@ -402,7 +535,16 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
 # ❶ 로컬 SQLite 벡터 스토어 (Chroma 대체)
 # =============================================================================
 import sqlite3
-from math import sqrt
+
+try:
+    import sqlite_vec  # type: ignore
+except Exception:
+    sqlite_vec = None  # type: ignore
+
+try:
+    import simsimd  # type: ignore
+except Exception:
+    simsimd = None  # type: ignore
 
 
 def _normalize_vector_path(raw: str | os.PathLike | None) -> str:
@@ -437,87 +579,735 @@ _VECTOR_DB_PATH = _normalize_vector_path(
 )
 
 
-def _sqlite_conn():
+_VEC_SCHEMA_READY = False
+_VEC_SCHEMA_LOCK = threading.Lock()
+
+# 행렬 스캔 점수 계산 정밀도: fp32(기본) | int8 (메모리 대역폭 1/4, 약간의 근사)
+_VEC_SCORE_QUANT = str(
+    os.environ.get("VECTOR_SCORE_QUANT") or getattr(settings, "VECTOR_SCORE_QUANT", None) or "fp32"
+).strip().lower()
+
+# sqlite-vec(vec0) KNN 인덱스 사용 여부. 확장 로드 실패 시 자동으로 행렬 스캔 경로 사용
+_USE_VEC_INDEX = str(
+    os.environ.get("USE_VEC_INDEX") or getattr(settings, "USE_VEC_INDEX", None) or "1"
+).strip().lower() in ("1", "true", "yes", "y", "on")
+_VEC_EXT_OK: Optional[bool] = None  # None = 아직 시도 안 함
+_VEC_INDEX_CHECKED = False
+
+# 연결은 스레드마다 하나 열어 재사용 (PRAGMA/확장 로드를 매번 다시 하지 않게).
+# 한 연결을 여러 스레드가 같이 쓰면 `with conn:` 트랜잭션이 섞이므로 전역 1개가 아니라 스레드별.
+_SQLITE_TLS = threading.local()
+_SQLITE_PRAGMAS = (
+    "journal_mode=WAL",  # 읽기-쓰기 동시 진행
+    "synchronous=NORMAL",  # WAL 에선 이 정도로 충분 (fsync 횟수 감소)
+    "mmap_size=268435456",  # 256MB: 파일을 페이지 캐시로 바로 매핑
+    "cache_size=-65536",  # 64MB 페이지 캐시
+    "temp_store=MEMORY",
+)
+
+
+def _sqlite_open() -> Tuple[sqlite3.Connection, bool]:
     p = Path(_VECTOR_DB_PATH)
     p.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(p))
+    conn = sqlite3.connect(str(p), check_same_thread=False)
+    for pragma in _SQLITE_PRAGMAS:
+        try:
+            conn.execute(f"PRAGMA {pragma}")
+        except sqlite3.DatabaseError as e:
+            log.debug("PRAGMA %s 실패: %s", pragma, e)
+    return conn, _load_vec_ext(conn)
+
+
+def _sqlite_conn():
+    global _VEC_SCHEMA_READY
+    conn = getattr(_SQLITE_TLS, "conn", None)
+    if conn is None:
+        conn, _SQLITE_TLS.vec_ok = _sqlite_open()
+        _SQLITE_TLS.conn = conn
+    if not _VEC_SCHEMA_READY:
+        with _VEC_SCHEMA_LOCK:
+            if not _VEC_SCHEMA_READY:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS vector_docs (
+                        id TEXT PRIMARY KEY,
+                        doc TEXT NOT NULL,
+                        meta_json TEXT NOT NULL,
+                        emb BLOB NOT NULL,
+                        emb_i8 BLOB,
+                        emb_scale REAL,
+                        source TEXT
+                    )
+                """
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS vec_index_meta (k TEXT PRIMARY KEY, v TEXT NOT NULL)"
+                )
+                _migrate_emb_json(conn)
+                _normalize_stored_embs(conn)
+                _backfill_emb_i8(conn)
+                _backfill_source(conn)
+                _VEC_SCHEMA_READY = True
+    if _SQLITE_TLS.vec_ok and not _VEC_INDEX_CHECKED:
+        _vec_index_sync(conn)
+    return conn
+
+
+def _load_vec_ext(conn: sqlite3.Connection) -> bool:
+    """새 연결에 sqlite-vec 확장 로드. 한 번 실패하면 이 프로세스에선 다시 시도하지 않는다."""
+    global _VEC_EXT_OK
+    if not _USE_VEC_INDEX or _VEC_EXT_OK is False:
+        return False
+    try:
+        conn.enable_load_extension(True)
+        try:
+            if sqlite_vec is not None:
+                sqlite_vec.load(conn)
+            else:
+                conn.load_extension("vec0")
+        finally:
+            conn.enable_load_extension(False)
+        _VEC_EXT_OK = True
+    except Exception as e:
+        log.info("sqlite-vec 확장 로드 실패 → 행렬 스캔 경로 사용: %s", e)
+        _VEC_EXT_OK = False
+    return bool(_VEC_EXT_OK)
+
+
+def _vec_table(dim: int) -> str:
+    return f"vec_docs_{int(dim)}"
+
+
+def _vec_tables(conn: sqlite3.Connection) -> Dict[int, str]:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name GLOB 'vec_docs_[0-9]*'"
+    ).fetchall()
+    out: Dict[int, str] = {}
+    for (name,) in rows:
+        tail = name[len("vec_docs_"):]
+        if tail.isdigit():
+            out[int(tail)] = name
+    return out
+
+
+def _vec_index_mark(conn: sqlite3.Connection, synced: bool) -> None:
     conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS vector_docs (
-            id TEXT PRIMARY KEY,
-            doc TEXT NOT NULL,
-            meta_json TEXT NOT NULL,
-            emb_json  TEXT NOT NULL
+        "REPLACE INTO vec_index_meta (k, v) VALUES ('synced', ?)", ("1" if synced else "0",)
+    )
+
+
+def _vec_index_insert(conn: sqlite3.Connection, pairs) -> None:
+    """
+    (vector_docs.rowid, 단위벡터 임베딩) 들을 차원별 vec0 테이블에 넣는다.
+    단위벡터라서 L2 거리 d 에 대해 코사인 거리 = d² / 2.
+    노름 0 벡터는 인덱스에서 제외(질의 시 결과가 모자라면 행렬 스캔으로 폴백).
+    """
+    known = _vec_tables(conn)
+    for rowid, emb in pairs:
+        v = np.asarray(emb, dtype=np.float32)
+        if not v.size or not v.any():
+            continue
+        table = known.get(v.size)
+        if table is None:
+            table = _vec_table(v.size)
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0(embedding float[{v.size}])"
+            )
+            known[v.size] = table
+        conn.execute(
+            f"INSERT INTO {table} (rowid, embedding) VALUES (?, ?)",
+            (int(rowid), v.tobytes()),
         )
+
+
+def _vec_index_sync(conn: sqlite3.Connection) -> None:
     """
-    )
-    return conn
+    프로세스당 1회: 인덱스가 최신이 아니면(확장 없이 쓰였거나 마이그레이션 직후) 전체 재구성.
+    """
+    global _VEC_INDEX_CHECKED
+    with _VEC_SCHEMA_LOCK:
+        if _VEC_INDEX_CHECKED:
+            return
+        try:
+            row = conn.execute("SELECT v FROM vec_index_meta WHERE k='synced'").fetchone()
+            if not row or row[0] != "1":
+                with conn:
+                    for table in _vec_tables(conn).values():
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    rows = conn.execute("SELECT rowid, emb FROM vector_docs").fetchall()
+                    _vec_index_insert(conn, ((rid, _blob_to_emb(b)) for rid, b in rows))
+                    _vec_index_mark(conn, True)
+                log.info("sqlite-vec 인덱스 재구성 완료")
+        except Exception as e:
+            log.warning("sqlite-vec 인덱스 동기화 실패 → 행렬 스캔 경로 사용: %s", e)
+        _VEC_INDEX_CHECKED = True
+
+
+def _unit(e) -> np.ndarray:
+    """L2 정규화된 float32 벡터 (노름 0 이면 그대로)."""
+    v = np.array(e, dtype=np.float32).ravel()
+    n = float(np.linalg.norm(v)) if v.size else 0.0
+    if n > 0:
+        v /= n
+    return v
+
+
+def _quantize_i8(v) -> Tuple[np.ndarray, float]:
+    """
+    int8 스칼라 양자화: s = 127 / max|v|, q = round(v * s).
+    내적은 int32 로 누적하고 (q_a · q_b) / (s_a * s_b) 로 float 내적을 근사.
+    """
+    v = np.asarray(v, dtype=np.float32).ravel()
+    m = float(np.abs(v).max()) if v.size else 0.0
+    if m <= 0:
+        return np.zeros(v.shape, dtype=np.int8), 1.0
+    scale = 127.0 / m
+    return np.clip(np.rint(v * scale), -127, 127).astype(np.int8), scale
+
+
+def _emb_to_blob(e) -> bytes:
+    """임베딩 → float32 raw bytes (JSON 대비 파싱 없음, 크기 절반 이하)."""
+    return sqlite3.Binary(np.asarray(e, dtype=np.float32).tobytes())
+
+
+def _blob_to_emb(blob) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32) if blob else np.empty(0, dtype=np.float32)
+
+
+def _normalize_stored_embs(conn: sqlite3.Connection) -> None:
+    """
+    저장 벡터는 단위벡터로 유지한다(코사인 = 내적). 예전에 원본 그대로 저장된 행을 1회 정규화.
+    """
+    row = conn.execute("SELECT v FROM vec_index_meta WHERE k='normalized'").fetchone()
+    if row and row[0] == "1":
+        return
+    rows = conn.execute("SELECT id, emb FROM vector_docs").fetchall()
+    with conn:
+        conn.executemany(
+            "UPDATE vector_docs SET emb = ? WHERE id = ?",
+            [(_emb_to_blob(_unit(_blob_to_emb(b))), i) for i, b in rows],
+        )
+        conn.execute("REPLACE INTO vec_index_meta (k, v) VALUES ('normalized', '1')")
+    if rows:
+        log.info("vector_docs: 저장 벡터 정규화 완료 (%d행)", len(rows))
+
+
+def _backfill_emb_i8(conn: sqlite3.Connection) -> None:
+    """int8 컬럼이 없던 예전 테이블에 컬럼 추가 + 비어 있는 행 채우기."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vector_docs)")}
+    with conn:
+        if "emb_i8" not in cols:
+            conn.execute("ALTER TABLE vector_docs ADD COLUMN emb_i8 BLOB")
+        if "emb_scale" not in cols:
+            conn.execute("ALTER TABLE vector_docs ADD COLUMN emb_scale REAL")
+        rows = conn.execute("SELECT id, emb FROM vector_docs WHERE emb_i8 IS NULL").fetchall()
+        upd = []
+        for i, b in rows:
+            q, scale = _quantize_i8(_blob_to_emb(b))
+            upd.append((sqlite3.Binary(q.tobytes()), scale, i))
+        conn.executemany("UPDATE vector_docs SET emb_i8 = ?, emb_scale = ? WHERE id = ?", upd)
+
+
+def _source_of(meta: Dict[str, Any]) -> str:
+    """where 필터 기준 값: meta.source 없으면 source_name."""
+    return str((meta or {}).get("source") or (meta or {}).get("source_name") or "").strip()
+
+
+def _backfill_source(conn: sqlite3.Connection) -> None:
+    """source 컬럼(+인덱스)이 없던 예전 테이블에 추가하고 meta_json 에서 채운다."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vector_docs)")}
+    with conn:
+        if "source" not in cols:
+            conn.execute("ALTER TABLE vector_docs ADD COLUMN source TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_vector_source ON vector_docs (source)")
+        upd = []
+        for i, mjson in conn.execute("SELECT id, meta_json FROM vector_docs WHERE source IS NULL").fetchall():
+            try:
+                upd.append((_source_of(json.loads(mjson or "{}")), i))
+            except Exception:
+                upd.append(("", i))
+        conn.executemany("UPDATE vector_docs SET source = ? WHERE id = ?", upd)
+
+
+def _where_sql(where: dict | None) -> Tuple[str, List[str]]:
+    """where 필터(간단: source) → ' AND ...' SQL 조각 + 파라미터. 필터 없으면 ('', [])."""
+    if not where or not isinstance(where, dict) or "source" not in where:
+        return "", []
+    cond = where["source"]
+    if isinstance(cond, dict) and "$in" in cond:
+        vals = [str(x) for x in cond["$in"]]
+        if not vals:
+            return " AND 0", []
+        return f" AND source IN ({','.join('?' * len(vals))})", vals
+    return " AND source = ?", [str(cond)]
+
+
+def _migrate_emb_json(conn: sqlite3.Connection) -> None:
+    """
+    예전 스키마(emb_json TEXT) → emb BLOB 1회 마이그레이션.
+    DROP COLUMN 이 없는 구버전 SQLite 도 있어서 테이블을 새로 만들어 복사 후 교체한다.
+    """
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vector_docs)")}
+    if "emb_json" not in cols:
+        return
+
+    def _conv(ejson):
+        try:
+            return _emb_to_blob(json.loads(ejson or "[]"))
+        except Exception:
+            return _emb_to_blob([])
+
+    rows = conn.execute("SELECT id, doc, meta_json, emb_json FROM vector_docs").fetchall()
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS vector_docs_new")
+        conn.execute(
+            """
+            CREATE TABLE vector_docs_new (
+                id TEXT PRIMARY KEY,
+                doc TEXT NOT NULL,
+                meta_json TEXT NOT NULL,
+                emb BLOB NOT NULL
+            )
+        """
+        )
+        conn.executemany(
+            "INSERT INTO vector_docs_new (id, doc, meta_json, emb) VALUES (?, ?, ?, ?)",
+            [(i, d, m, _conv(e)) for i, d, m, e in rows],
+        )
+        conn.execute("DROP TABLE vector_docs")
+        conn.execute("ALTER TABLE vector_docs_new RENAME TO vector_docs")
+        # 테이블 재생성으로 rowid 가 바뀌었으니 KNN 인덱스는 다시 만들어야 함
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS vec_index_meta (k TEXT PRIMARY KEY, v TEXT NOT NULL)"
+        )
+        _vec_index_mark(conn, False)
+    log.info("vector_docs: emb_json → emb(BLOB) 마이그레이션 완료 (%d행)", len(rows))
 
 
 def _cosine_dist(a: list[float], b: list[float]) -> float:
     # 거리값은 "작을수록 가까움"이 되도록 1 - cosine_similarity
-    if not a or not b or len(a) != len(b):
+    a = np.asarray(a if a is not None else [], dtype=np.float32).ravel()
+    b = np.asarray(b if b is not None else [], dtype=np.float32).ravel()
+    if not a.size or a.shape != b.shape:
         return 1.0
-    dot = sum(x * y for x, y in zip(a, b))
-    na = sqrt(sum(x * x for x in a))
-    nb = sqrt(sum(y * y for y in b))
+    na = float(np.linalg.norm(a))
+    nb = float(np.linalg.norm(b))
     if na == 0 or nb == 0:
         return 1.0
-    sim = dot / (na * nb)
-    return 1.0 - float(sim)
+    if simsimd is not None:
+        # SIMD 커널(AVX2/AVX-512/NEON)이 내적+노름을 한 번에 계산, 1 - cos 를 바로 돌려줌
+        return float(simsimd.cosine(a, b))
+    return 1.0 - float(np.dot(a, b)) / (na * nb)
 
 
 def _sqlite_upsert(ids, docs, metas, embs):
-    import json as _json
-
+    global _VEC_INDEX_CHECKED
+    ids = list(ids)
+    # 저장 시점에 한 번 정규화 → 질의 때는 q 만 정규화해서 내적하면 코사인
+    embs = [_unit(e) for e in embs]
     with _sqlite_conn() as c:
+        indexed = bool(_VEC_EXT_OK) and _VEC_INDEX_CHECKED
+        if indexed:
+            # REPLACE 는 행을 지웠다 다시 넣어 rowid 가 바뀌므로 예전 인덱스 행부터 제거
+            old_rows = _rows_for_ids(c, "rowid, length(emb)", ids)
+        rows = []
+        for i, d, m, e in zip(ids, docs, metas, embs):
+            q, scale = _quantize_i8(e)
+            rows.append(
+                (
+                    i, d, json.dumps(m, ensure_ascii=False), _emb_to_blob(e),
+                    sqlite3.Binary(q.tobytes()), scale, _source_of(m),
+                )
+            )
         c.executemany(
-            "REPLACE INTO vector_docs (id, doc, meta_json, emb_json) VALUES (?, ?, ?, ?)",
-            [
-                (i, d, _json.dumps(m, ensure_ascii=False), _json.dumps(e))
-                for i, d, m, e in zip(ids, docs, metas, embs)
-            ],
+            "REPLACE INTO vector_docs (id, doc, meta_json, emb, emb_i8, emb_scale, source)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
         )
+        if not indexed:
+            _vec_index_mark(c, False)
+        else:
+            try:
+                tables = _vec_tables(c)
+                for rowid, blob_len in old_rows:
+                    table = tables.get((blob_len or 0) // 4)
+                    if table:
+                        c.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+                emb_by_id = dict(zip(ids, embs))
+                _vec_index_insert(
+                    c, [(rowid, emb_by_id[i]) for rowid, i in _rows_for_ids(c, "rowid, id", ids)]
+                )
+            except Exception as e:
+                # 인덱스 갱신이 실패해도 본 데이터는 저장. 인덱스는 낡은 것으로 표시 → 다음 연결에서 재구성
+                log.warning("sqlite-vec 인덱스 갱신 실패 → 재구성 예약: %s", e)
+                _VEC_INDEX_CHECKED = False
+                _vec_index_mark(c, False)
+    _invalidate_vec_cache()
+
+
+def _rows_for_ids(conn: sqlite3.Connection, cols: str, ids: List[str]) -> List[tuple]:
+    out: List[tuple] = []
+    # SQLite 바인딩 변수 한도(기본 999) 안쪽으로 나눠서 조회
+    for i in range(0, len(ids), 500):
+        part = ids[i:i + 500]
+        marks = ",".join("?" * len(part))
+        out += conn.execute(f"SELECT {cols} FROM vector_docs WHERE id IN ({marks})", part).fetchall()
+    return out
 
 
-def _sqlite_query_by_embedding(q_emb: list[float], topk: int, where: dict | None):
-    import json as _json
+def _sqlite_delete_stale_chunks(chunk_counts: Dict[str, int]) -> int:
+    """
+    base 별로 이번에 만든 청크 수 이상인 "<base>:<번호>" 행을 지운다.
+    청크 경계가 바뀌어 재인덱싱 때 청크 수가 줄면 예전 꼬리 청크가 고아로 남기 때문.
+    """
+    global _VEC_INDEX_CHECKED
+    if not chunk_counts:
+        return 0
+    with _sqlite_conn() as c:
+        stale: List[str] = []
+        for base, n in chunk_counts.items():
+            lo = f"{base}:"
+            # id 범위 조회 (PK 인덱스 사용): "<base>:" 이상 "<base>;" 미만
+            for (rid,) in c.execute(
+                "SELECT id FROM vector_docs WHERE id >= ? AND id < ?", (lo, f"{base};")
+            ):
+                suffix = rid[len(lo):]
+                if suffix.isdigit() and int(suffix) >= n:
+                    stale.append(rid)
+        if not stale:
+            return 0
+        if bool(_VEC_EXT_OK) and _VEC_INDEX_CHECKED:
+            try:
+                tables = _vec_tables(c)
+                for rowid, blob_len in _rows_for_ids(c, "rowid, length(emb)", stale):
+                    table = tables.get((blob_len or 0) // 4)
+                    if table:
+                        c.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+            except Exception as e:
+                log.warning("sqlite-vec 인덱스 갱신 실패 → 재구성 예약: %s", e)
+                _VEC_INDEX_CHECKED = False
+                _vec_index_mark(c, False)
+        for i in range(0, len(stale), 500):
+            part = stale[i:i + 500]
+            c.execute(f"DELETE FROM vector_docs WHERE id IN ({','.join('?' * len(part))})", part)
+    _invalidate_vec_cache()
+    return len(stale)
+
 
+def _vec_index_query(q: np.ndarray, topk: int, where: dict | None) -> Optional[dict]:
+    """
+    sqlite-vec KNN 으로 top-k. where 가 있으면 넉넉히 뽑아 조인할 때 source 컬럼으로 걸러낸다.
+    결과가 topk 에 못 미치면 None → 호출측이 행렬 스캔으로 폴백(기존 결과와 동일하게 맞추기 위함).
+    """
+    q_norm = float(np.linalg.norm(q)) if q.size else 0.0
+    if q_norm <= 0:
+        return None
     with _sqlite_conn() as c:
-        rows = list(c.execute("SELECT id, doc, meta_json, emb_json FROM vector_docs"))
-    docs, metas, dists, ids = [], [], [], []
-    for rid, doc, mjson, ejson in rows:
+        if not _VEC_EXT_OK or not _VEC_INDEX_CHECKED:
+            return None
+        table = _vec_tables(c).get(q.size)
+        if table is None:
+            return None
+        k = max(1, int(topk))
+        k_fetch = k * 8 if where else k
+        hits = c.execute(
+            f"SELECT rowid, distance FROM {table} WHERE embedding MATCH ? AND k = ? ORDER BY distance",
+            ((q / q_norm).astype(np.float32).tobytes(), k_fetch),
+        ).fetchall()
+        if not hits:
+            return None
+        marks = ",".join("?" * len(hits))
+        where_clause, where_args = _where_sql(where)
+        by_rowid = {
+            r[0]: r[1:]
+            for r in c.execute(
+                f"SELECT rowid, id, doc, meta_json FROM vector_docs WHERE rowid IN ({marks}){where_clause}",
+                [h[0] for h in hits] + where_args,
+            )
+        }
+
+    ids, docs, metas, dists = [], [], [], []
+    for rowid, dist in hits:
+        row = by_rowid.get(rowid)
+        if row is None:
+            continue
         try:
-            meta = _json.loads(mjson or "{}")
-            emb = _json.loads(ejson or "[]")
+            meta = json.loads(row[2] or "{}")
         except Exception:
             continue
-        # where 필터(간단: source / source_name)
-        if where:
-            src = (meta.get("source") or meta.get("source_name") or "").strip()
-            ok = True
-            if isinstance(where, dict) and "source" in where:
-                cond = where["source"]
-                if isinstance(cond, dict) and "$in" in cond:
-                    ok = src in [str(x) for x in cond["$in"]]
-                else:
-                    ok = src == str(cond)
-            if not ok:
-                continue
-        dist = _cosine_dist(q_emb, emb)
-        docs.append(doc)
+        ids.append(row[0])
+        docs.append(row[1])
         metas.append(meta)
-        dists.append(dist)
-        ids.append(rid)
-    order = sorted(range(len(dists)), key=lambda i: dists[i])[: max(1, int(topk))]
+        dists.append(float(dist) * float(dist) / 2.0)
+        if len(ids) >= k:
+            break
+    if len(ids) < k:
+        return None
+    return {"documents": [docs], "metadatas": [metas], "distances": [dists], "ids": [ids]}
+
+
+# ── 질의용 인메모리 행렬 캐시 ─────────────────────────────────────────────
+# 매 질의마다 전 행 JSON 파싱 + 파이썬 코사인 루프 대신,
+# 한 번 읽은 단위벡터 (N, D) float32 행렬을 들고 있다가 M @ q 한 번으로 점수 계산.
+# - 이 프로세스의 upsert → 즉시 무효화
+# - 다른 프로세스의 쓰기 → DB 파일 (mtime, size) 가 바뀌면 다시 읽음
+_VEC_CACHE: Dict[str, Any] = {
+    "stamp": None, "ids": [], "docs": [], "metas": [], "src_codes": np.zeros(0, dtype=np.int32),
+    "src_vocab": {}, "by_dim": {}, "by_dim_i8": {},
+}
+_VEC_LOCK = threading.Lock()
+
+
+def _invalidate_vec_cache() -> None:
+    with _VEC_LOCK:
+        _VEC_CACHE["stamp"] = None
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE.clear()
+
+
+def _db_stamp() -> Optional[Tuple[int, ...]]:
+    # WAL 모드에선 체크포인트 전까지 쓰기가 -wal 파일에만 반영되므로 둘 다 본다
+    try:
+        st = os.stat(_VECTOR_DB_PATH)
+    except OSError:
+        return None
+    try:
+        wal = os.stat(_VECTOR_DB_PATH + "-wal")
+        return (st.st_mtime_ns, st.st_size, wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        return (st.st_mtime_ns, st.st_size)
+
+
+def _load_vec_cache() -> Dict[str, Any]:
+    """
+    vector_docs 전체를 읽어 캐시 구성.
+    임베딩 차원이 섞여 있을 수 있어서(모델 교체) 차원별로 행렬을 따로 만든다:
+      by_dim[D]    = (행 인덱스 배열, 단위벡터 (n, D) float32 행렬)
+      by_dim_i8[D] = (행 인덱스 배열, (n, D) int8 행렬, (n,) 스케일)   ← VECTOR_SCORE_QUANT=int8 일 때만
+    """
+    with _VEC_LOCK:
+        stamp = _db_stamp()
+        if stamp is not None and _VEC_CACHE["stamp"] == stamp:
+            return _VEC_CACHE
+
+        with _sqlite_conn() as c:
+            rows = c.execute(
+                "SELECT id, doc, meta_json, source, emb, emb_i8, emb_scale FROM vector_docs"
+            ).fetchall()
+
+        use_i8 = _VEC_SCORE_QUANT == "int8"
+        ids, docs, metas, src_codes = [], [], [], []
+        src_vocab: Dict[str, int] = {}
+        groups: Dict[int, Tuple[List[int], List[Any]]] = {}
+        groups_i8: Dict[int, Tuple[List[int], List[Any], List[float]]] = {}
+        # 행마다 ndarray 를 만들지 않고 BLOB 바이트를 차원별로 모아 두었다가
+        # 한 번에 이어 붙여 (n, D) 연속 행렬로 해석 (행 객체 N 개 + np.stack 복사 생략)
+        for rid, doc, mjson, src, blob, blob_i8, scale in rows:
+            try:
+                meta = json.loads(mjson or "{}")
+            except Exception:
+                continue
+            row = len(ids)
+            ids.append(rid)
+            docs.append(doc)
+            metas.append(meta)
+            src = src if src is not None else _source_of(meta)
+            src_codes.append(src_vocab.setdefault(src, len(src_vocab)))
+            dim = len(blob) // 4 if blob else 0
+            if not dim:
+                continue
+            if use_i8 and blob_i8:
+                g8 = groups_i8.setdefault(dim, ([], [], []))
+                g8[0].append(row)
+                g8[1].append(blob_i8)
+                g8[2].append(float(scale or 1.0))
+            else:
+                g = groups.setdefault(dim, ([], []))
+                g[0].append(row)
+                g[1].append(blob)
+
+        # 저장 벡터는 이미 단위벡터(노름 0 행은 0 벡터 → 유사도 0, 거리 1.0)
+        by_dim: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for dim, (rows_idx, blobs) in groups.items():
+            mat = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), dim)
+            by_dim[dim] = (np.asarray(rows_idx, dtype=np.intp), mat)
+        by_dim_i8: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for dim, (rows_idx, blobs, scales) in groups_i8.items():
+            by_dim_i8[dim] = (
+                np.asarray(rows_idx, dtype=np.intp),
+                np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), dim),
+                np.asarray(scales, dtype=np.float32),
+            )
+
+        _VEC_CACHE.update(
+            {
+                "stamp": stamp, "ids": ids, "docs": docs, "metas": metas,
+                "src_codes": np.asarray(src_codes, dtype=np.int32), "src_vocab": src_vocab,
+                "by_dim": by_dim, "by_dim_i8": by_dim_i8,
+            }
+        )
+        return _VEC_CACHE
+
+
+def _int8_cosine_dist(q_unit: np.ndarray, mat_i8: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    int8 행렬 대상 코사인 거리. SimSIMD 가 있으면 int8 커널.
+    없으면 질의는 float32 그대로 두고(비대칭) 행렬 블록만 float32 로 풀어 BLAS GEMV
+    (NumPy 정수 matmul 은 BLAS 를 안 타서 느림). 메모리에서 읽는 건 int8 이라 대역폭은 1/4.
+    """
+    if simsimd is not None:
+        q_i8, _q_scale = _quantize_i8(q_unit)
+        return np.asarray(simsimd.cdist(q_i8[None, :], mat_i8, metric="cosine"), dtype=np.float32).ravel()
+    q32 = np.ascontiguousarray(q_unit, dtype=np.float32)
+    out = np.empty(mat_i8.shape[0], dtype=np.float32)
+    # float32 변환 임시 배열이 커지지 않게 블록 단위로
+    for i in range(0, mat_i8.shape[0], 4096):
+        dots = mat_i8[i:i + 4096].astype(np.float32) @ q32
+        out[i:i + 4096] = 1.0 - dots / scales[i:i + 4096]
+    return out
+
+
+def _where_mask(cache: Dict[str, Any], where: dict | None) -> Optional[np.ndarray]:
+    """
+    where 필터(간단: source) → 통과 행 bool 마스크. 필터 없으면 None.
+    source 문자열은 캐시 빌드 때 정수 코드로 바꿔 두어서 np.isin 한 번으로 끝난다.
+    """
+    if not where or not isinstance(where, dict) or "source" not in where:
+        return None
+    cond = where["source"]
+    vals = [str(x) for x in cond["$in"]] if isinstance(cond, dict) and "$in" in cond else [str(cond)]
+    vocab = cache["src_vocab"]
+    codes = [vocab[v] for v in vals if v in vocab]
+    return np.isin(cache["src_codes"], codes)
+
+
+def _sqlite_query_by_embedding(q_emb: list[float], topk: int, where: dict | None):
+    q = np.asarray(q_emb if q_emb is not None else [], dtype=np.float32).ravel()
+    if _USE_VEC_INDEX and _VEC_EXT_OK is not False:
+        try:
+            res = _vec_index_query(q, topk, where)
+            if res is not None:
+                return res
+        except Exception as e:
+            log.debug("sqlite-vec 질의 실패 → 행렬 스캔: %s", e)
+
+    cache = _load_vec_cache()
+    n = len(cache["ids"])
+
+    # 차원이 다르거나 임베딩이 없는 행은 기존과 같이 거리 1.0
+    dists = np.ones(n, dtype=np.float32)
+    q_norm = float(np.linalg.norm(q)) if q.size else 0.0
+    # source 필터가 있으면 통과한 행만 점수 계산
+    mask = _where_mask(cache, where)
+
+    def _masked(rows_idx: np.ndarray, *mats: np.ndarray):
+        if mask is None:
+            return (rows_idx, *mats)
+        keep = mask[rows_idx]
+        return (rows_idx[keep], *(m[keep] for m in mats))
+
+    # 질의도 한 번만 정규화 → 저장 행렬(단위벡터)과 내적만 하면 코사인 (행 노름 계산 불필요)
+    q_unit = q / q_norm if q_norm > 0 else q
+    hit = cache["by_dim"].get(q.size)
+    if hit is not None and q_norm > 0:
+        rows_idx, mat = _masked(*hit)
+        if rows_idx.size and simsimd is not None:
+            sims = np.asarray(simsimd.cdist(q_unit[None, :], mat, metric="dot"), dtype=np.float32).ravel()
+            dists[rows_idx] = 1.0 - sims
+        elif rows_idx.size:
+            dists[rows_idx] = unit_cosine_dist(q_unit, mat)
+    hit_i8 = cache["by_dim_i8"].get(q.size)
+    if hit_i8 is not None and q_norm > 0:
+        rows_idx, mat_i8, scales = _masked(*hit_i8)
+        if rows_idx.size:
+            dists[rows_idx] = _int8_cosine_dist(q_unit, mat_i8, scales)
+
+    cand = np.arange(n)
+    if mask is not None:
+        cand = cand[mask]
+
+    k = min(max(1, int(topk)), cand.size)
+    if k < cand.size:
+        cand = np.sort(cand[np.argpartition(dists[cand], k - 1)[:k]])
+    order = cand[np.argsort(dists[cand], kind="stable")][:k]
+
+    docs, metas, ids = cache["docs"], cache["metas"], cache["ids"]
     return {
         "documents": [[docs[i] for i in order]],
         "metadatas": [[metas[i] for i in order]],
-        "distances": [[dists[i] for i in order]],
+        "distances": [[float(dists[i]) for i in order]],
         "ids": [[ids[i] for i in order]],
     }
 
 
+# ── 질의 결과 LSH 캐시 ──────────────────────────────────────────────────
+# 거의 같은 질문(코사인 ≥ QUERY_CACHE_SIM)이 TTL 안에 다시 오면 벡터 스캔 없이 이전 hits 반환.
+# 랜덤 투영 16비트 부호 해시로 버킷을 나누고, 버킷 안에서만 코사인 비교.
+# 이 프로세스의 upsert → 전체 비움 / 다른 프로세스의 쓰기 → DB stamp 가 달라진 항목은 미스.
+_QUERY_CACHE_TTL = int(
+    os.environ.get("QUERY_CACHE_TTL_SEC") or getattr(settings, "QUERY_CACHE_TTL_SEC", None) or 300
+)
+_QUERY_CACHE_SIM = float(
+    os.environ.get("QUERY_CACHE_SIM") or getattr(settings, "QUERY_CACHE_SIM", None) or 0.97
+)
+_QUERY_CACHE_MAX = 2048
+_QUERY_LSH_BITS = 16
+_QUERY_CACHE: "OrderedDict[Tuple[Any, ...], List[Tuple[np.ndarray, Dict[str, Any], float, Any]]]" = OrderedDict()
+_QUERY_CACHE_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _lsh_planes(dim: int) -> np.ndarray:
+    # 차원별 고정 투영 행렬 (시드 고정 → 프로세스가 달라도 같은 버킷)
+    return np.random.default_rng(42).standard_normal((dim, _QUERY_LSH_BITS)).astype(np.float32)
+
+
+def _lsh_bucket(q_unit: np.ndarray) -> bytes:
+    return np.packbits((q_unit @ _lsh_planes(q_unit.size)) > 0).tobytes()
+
+
+def _copy_query_result(res: Dict[str, Any]) -> Dict[str, Any]:
+    # 호출부가 결과 리스트를 고쳐도 캐시 항목이 변하지 않도록 바깥 리스트만 복사
+    return {k: [list(v[0])] if v else [] for k, v in res.items()}
+
+
+def _sqlite_query_cached(q_emb: list[float], topk: int, where: dict | None):
+    if _QUERY_CACHE_TTL <= 0:
+        return _sqlite_query_by_embedding(q_emb, topk, where)
+    q = np.asarray(q_emb if q_emb is not None else [], dtype=np.float32).ravel()
+    q_norm = float(np.linalg.norm(q)) if q.size else 0.0
+    if q_norm == 0.0:
+        return _sqlite_query_by_embedding(q_emb, topk, where)
+    q_unit = q / q_norm
+
+    key = (
+        q.size,
+        _lsh_bucket(q_unit),
+        int(topk),
+        json.dumps(where, sort_keys=True, ensure_ascii=False) if where else "",
+    )
+    stamp = _db_stamp()
+    now = time.monotonic()
+    with _QUERY_CACHE_LOCK:
+        entries = _QUERY_CACHE.get(key)
+        if entries:
+            _QUERY_CACHE.move_to_end(key)
+            for v, res, ts, st in entries:
+                if now - ts <= _QUERY_CACHE_TTL and st == stamp and float(v @ q_unit) >= _QUERY_CACHE_SIM:
+                    return _copy_query_result(res)
+
+    res = _sqlite_query_by_embedding(q_emb, topk, where)
+
+    with _QUERY_CACHE_LOCK:
+        entries = [e for e in _QUERY_CACHE.get(key, []) if now - e[2] <= _QUERY_CACHE_TTL and e[3] == stamp]
+        entries.append((q_unit, _copy_query_result(res), now, stamp))
+        _QUERY_CACHE[key] = entries
+        _QUERY_CACHE.move_to_end(key)
+        while len(_QUERY_CACHE) > _QUERY_CACHE_MAX:
+            _QUERY_CACHE.popitem(last=False)
+    return res
+
+
 # (호환용) 원래 chroma의 collection 객체를 반환하던 함수 자리에 noop 제공
 def _chroma_collection():
     return None
@@ -543,8 +1333,50 @@ ACCEPT_GENERIC = (
     "q=0.9,image/avif,image/webp,*/*;q=0.8"
 )
 
+# 크롤링용 공용 세션: 같은 언론사 호스트로 가는 요청이 많아서 TCP/TLS 연결을 재사용
+# (requests.get 을 그냥 부르면 매번 새 세션 → 매번 핸드셰이크)
+_SESSION = requests.Session()
+_SESSION_ADAPTER = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=64)
+_SESSION.mount("https://", _SESSION_ADAPTER)
+_SESSION.mount("http://", _SESSION_ADAPTER)
+
+# 기사마다 여러 번 도는 정규식들은 모듈 로드 때 한 번만 컴파일
+_RE_HTML_TAG = re.compile(r"<[^>]+>")
+_RE_SPACES = re.compile(r"\s+")
+_RE_HSPACE = re.compile(r"[ \t]+")
+_RE_MULTI_BLANK = re.compile(r"\n\s*\n\s*\n+")
+# 미리보기에 남길 문자(공백류, ASCII 출력 문자, 한글 자모/호환자모/음절, CJK 한자, 전각, CJK 구두점) 외 전부
+_RE_PREVIEW_DISALLOWED = re.compile(
+    "[^\n\r\t\x20-\x7e\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3\u4e00-\u9fff\uff00-\uffef\u3000-\u303f]"
+)
+_RE_META_REFRESH = re.compile(
+    r'<meta[^>]+http-equiv=["\']refresh["\'][^>]+content=["\'][^"\']*url=([^"\']+)["\']',
+    re.IGNORECASE,
+)
+_RE_JS_LOCATION = re.compile(r'location\.(?:replace|href)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_RE_AMP_TAIL = re.compile(r"/amp(/)?$")
+_RE_HTTPS_URL = re.compile(r"https://[^\s\"\'<>]+")
+_RE_DAUM_BODY = re.compile(r"article_view|viewer")
+_RE_CHOSUN_BODY = re.compile(r"news_body|art_text|article", re.I)
+_RE_HANI_BODY = re.compile(r"article-text|article-body", re.I)
+
+
+# fetch_article_text 1회(리다이렉트 추적 → 본문/AMP 시도 → 구글뉴스 원문 재귀) 동안만 쓰는 GET 결과 메모.
+# 같은 URL 을 여러 단계에서 다시 받는 걸 막는다. 크롤링 스레드마다 따로라서 서로 지우거나 섞이지 않음.
+_HTTP_GET_MEMO: ContextVar[Optional[Dict[str, Optional[str]]]] = ContextVar("_HTTP_GET_MEMO", default=None)
+
 
 def _http_get_with_ua(url: str, timeout: int) -> Optional[str]:
+    memo = _HTTP_GET_MEMO.get()
+    if memo is not None and url in memo:
+        return memo[url]
+    text = _http_get_with_ua_uncached(url, timeout)
+    if memo is not None:
+        memo[url] = text
+    return text
+
+
+def _http_get_with_ua_uncached(url: str, timeout: int) -> Optional[str]:
     headers_list = [
         {
             "User-Agent": UA_DESKTOP,
@@ -561,7 +1393,7 @@ def _http_get_with_ua(url: str, timeout: int) -> Optional[str]:
     ]
     for hdr in headers_list:
         try:
-            r = requests.get(url, headers=hdr, timeout=timeout, allow_redirects=True)
+            r = _SESSION.get(url, headers=hdr, timeout=timeout, allow_redirects=True)
             if getattr(r, "ok", False):
                 return r.text
         except Exception as e:
@@ -569,9 +1401,40 @@ def _http_get_with_ua(url: str, timeout: int) -> Optional[str]:
     return None
 
 
-def _google_news_unwrap(url: str) -> str:
+class UrlInfo(NamedTuple):
+    url: str
+    parsed: Any  # urllib.parse.ParseResult
+    host: str  # 소문자 netloc
+
+
+@lru_cache(maxsize=4096)
+def _url_info(url: str) -> UrlInfo:
+    """
+    URL 파싱 결과 캐시. RSS → 리다이렉트 → 본문 추출 파이프라인에서
+    같은 URL 을 여러 번 urlparse 하지 않도록 한 번 파싱해 재사용한다.
+    """
     try:
         parsed = urlparse(url)
+        host = (parsed.netloc or "").lower()
+    except Exception:
+        parsed = urlparse("")
+        host = ""
+    return UrlInfo(url, parsed, host)
+
+
+def _is_external_news_url(u: str) -> bool:
+    # 구글/구글뉴스 도메인이 아닌 절대 URL 인지
+    host = _url_info(u).host
+    if not host:
+        return False
+    if "news.google." in host or host.endswith("google.com"):
+        return False
+    return True
+
+
+def _google_news_unwrap(url: str) -> str:
+    try:
+        parsed = _url_info(url).parsed
         if "news.google." in parsed.netloc:
             qs = parse_qs(parsed.query)
             if "url" in qs and qs["url"]:
@@ -594,14 +1457,14 @@ def _resolve_redirect(url: str, timeout: int = 12) -> Tuple[str, Optional[str]]:
             "Referer": "https://www.google.com/",
         }
         try:
-            r_head = requests.head(url, headers=heads, timeout=timeout, allow_redirects=True)
+            r_head = _SESSION.head(url, headers=heads, timeout=timeout, allow_redirects=True)
             if getattr(r_head, "ok", False) and getattr(r_head, "url", None):
                 return r_head.url, None
         except Exception:
             pass
 
         try:
-            r_get = requests.get(url, headers=heads, timeout=timeout, allow_redirects=True)
+            r_get = _SESSION.get(url, headers=heads, timeout=timeout, allow_redirects=True)
             final_url = getattr(r_get, "url", None) or url
             html_txt = getattr(r_get, "text", None)
             if getattr(r_get, "ok", False):
@@ -617,19 +1480,11 @@ def _detect_client_redirect(html_text: str, base_url: str) -> Optional[str]:
     if not html_text:
         return None
 
-    m = re.search(
-        r'<meta[^>]+http-equiv=["\']refresh["\'][^>]+content=["\'][^"\']*url=([^"\']+)["\']',
-        html_text,
-        flags=re.IGNORECASE,
-    )
+    m = _RE_META_REFRESH.search(html_text)
     if m:
         return urljoin(base_url, m.group(1).strip())
 
-    m2 = re.search(
-        r'location\.(?:replace|href)\s*=\s*["\']([^"\']+)["\']',
-        html_text,
-        flags=re.IGNORECASE,
-    )
+    m2 = _RE_JS_LOCATION.search(html_text)
     if m2:
         return urljoin(base_url, m2.group(1).strip())
 
@@ -664,14 +1519,14 @@ def _follow_client_redirects(
 def _text_len_score(html_candidate: Optional[str]) -> int:
     if not html_candidate:
         return 0
-    txt_only = re.sub(r"<[^>]+>", " ", html_candidate)
-    txt_only = re.sub(r"\s+", " ", txt_only).strip()
+    txt_only = _RE_HTML_TAG.sub(" ", html_candidate)
+    txt_only = _RE_SPACES.sub(" ", txt_only).strip()
     return len(txt_only)
 
 
 def _guess_amp_candidates(url: str) -> List[str]:
     cands: List[str] = []
-    if not re.search(r"/amp(/)?$", url):
+    if not _RE_AMP_TAIL.search(url):
         if url.endswith("/"):
             cands.append(url + "amp")
             cands.append(url + "amp/")
@@ -759,20 +1614,34 @@ def _fetch_html_full(
     return plain_html, rendered_html, amp_html
 
 
-def _extract_site_specific(final_url: str, html_text: str) -> str:
-    if not final_url or not html_text:
-        return ""
+# BeautifulSoup 백엔드: lxml(C) 있으면 그걸로, 없으면 순수 파이썬 html.parser
+try:
+    import lxml  # type: ignore  # noqa: F401
+
+    _BS_PARSER = "lxml"
+except Exception:
+    _BS_PARSER = "html.parser"
+
+# 본문 추출기(사이트별 룰 / bs4 본문 / ld+json)가 보는 태그만 트리로 만든다
+_ARTICLE_SOUP_TAGS = ["article", "div", "section", "span", "meta", "link", "a", "script"]
+
+
+def _parse_article_soup(html_text: Optional[str]):
+    """HTML 1건을 한 번만 파싱해서 추출기들이 같이 쓰도록. bs4 없거나 실패하면 None."""
+    if not html_text or BeautifulSoup is None:
+        return None
     try:
-        from bs4 import BeautifulSoup
-    except Exception:
+        return BeautifulSoup(html_text, _BS_PARSER, parse_only=SoupStrainer(_ARTICLE_SOUP_TAGS))
+    except Exception as e:
+        log.debug("article soup 파싱 실패: %s", e)
+        return None
+
+
+def _extract_site_specific(final_url: str, soup) -> str:
+    if not final_url or soup is None:
         return ""
 
-    soup = BeautifulSoup(html_text, "html.parser")
-    host = ""
-    try:
-        host = urlparse(final_url).netloc.lower()
-    except Exception:
-        pass
+    host = _url_info(final_url).host
 
     # NAVER
     if "naver.com" in host:
@@ -798,7 +1667,7 @@ def _extract_site_specific(final_url: str, html_text: str) -> str:
 
     # DAUM
     if "daum.net" in host:
-        for div in soup.find_all("div", class_=re.compile(r"article_view|viewer")):
+        for div in soup.find_all("div", class_=_RE_DAUM_BODY):
             txt = div.get_text(separator="\n", strip=True)
             if txt and len(txt) > 50:
                 return txt.strip()
@@ -814,7 +1683,7 @@ def _extract_site_specific(final_url: str, html_text: str) -> str:
 
     # CHOSUN
     if "chosun.com" in host:
-        target = soup.find(id=re.compile(r"news_body|art_text|article", re.I))
+        target = soup.find(id=_RE_CHOSUN_BODY)
         if target:
             t = target.get_text(separator="\n", strip=True)
             if t and len(t) > 50:
@@ -822,7 +1691,7 @@ def _extract_site_specific(final_url: str, html_text: str) -> str:
 
     # HANI
     if "hani.co.kr" in host:
-        target = soup.find("div", class_=re.compile(r"article-text|article-body", re.I))
+        target = soup.find("div", class_=_RE_HANI_BODY)
         if target:
             t = target.get_text(separator="\n", strip=True)
             if t and len(t) > 50:
@@ -886,16 +1755,10 @@ def _extract_boilerpy3(html_text: str) -> str:
         return ""
 
 
-def _extract_bs4_maintext(html_text: str) -> str:
-    try:
-        from bs4 import BeautifulSoup
-    except Exception:
-        return ""
-
-    if not html_text:
+def _extract_bs4_maintext(soup) -> str:
+    if soup is None:
         return ""
 
-    soup = BeautifulSoup(html_text, "html.parser")
     cands: List[str] = []
 
     for art in soup.find_all("article"):
@@ -955,24 +1818,12 @@ def _extract_bs4_maintext(html_text: str) -> str:
 def _extract_google_news_original_url(html_text: str, base_url: str) -> Optional[str]:
     if not html_text:
         return None
-    try:
-        from bs4 import BeautifulSoup
-    except Exception:
-        BeautifulSoup = None
 
-    def _is_external(u: str) -> bool:
-        try:
-            host = urlparse(u).netloc.lower()
-        except Exception:
-            return False
-        if not host:
-            return False
-        if "news.google." in host or host.endswith("google.com"):
-            return False
-        return True
+    # 호스트 판정은 모듈 레벨 헬퍼 + 파싱 캐시 사용 (앵커마다 클로저/urlparse 반복 X)
+    _is_external = _is_external_news_url
 
     if BeautifulSoup is not None:
-        soup = BeautifulSoup(html_text, "html.parser")
+        soup = BeautifulSoup(html_text, _BS_PARSER, parse_only=SoupStrainer(["meta", "link", "a"]))
         tag = soup.find("meta", attrs={"property": "og:url"})
         cand = tag.get("content").strip() if tag and tag.get("content") else ""
         if cand and _is_external(cand):
@@ -987,13 +1838,32 @@ def _extract_google_news_original_url(html_text: str, base_url: str) -> Optional
             if cand3.startswith("http") and _is_external(cand3):
                 return cand3
 
-    for m in re.findall(r"https://[^\s\"\'<>]+", html_text):
+    for m in _RE_HTTPS_URL.findall(html_text):
         if _is_external(m):
             return m
     return None
 
 
+# 이 길이 이상 본문이 나오면 남은 추출기/HTML 변형은 건너뜀 (0 이면 전부 돌려 최장 선택)
+try:
+    _GOOD_ENOUGH_LEN = int(
+        getattr(settings, "EXTRACT_GOOD_ENOUGH_LEN", None) or os.environ.get("EXTRACT_GOOD_ENOUGH_LEN", "800")
+    )
+except Exception:
+    _GOOD_ENOUGH_LEN = 800
+
+
 def fetch_article_text(url: str, timeout: int = 12) -> str:
+    # 최상위 호출에서만 메모를 새로 만들고, 구글뉴스 원문 재귀 호출은 같은 메모를 이어 쓴다
+    token = _HTTP_GET_MEMO.set({}) if _HTTP_GET_MEMO.get() is None else None
+    try:
+        return _fetch_article_text(url, timeout)
+    finally:
+        if token is not None:
+            _HTTP_GET_MEMO.reset(token)
+
+
+def _fetch_article_text(url: str, timeout: int) -> str:
     try:
         final_url, pre_html = _resolve_redirect(url, timeout=timeout)
         final_url2, pre_html2 = _follow_client_redirects(
@@ -1001,10 +1871,7 @@ def fetch_article_text(url: str, timeout: int = 12) -> str:
         )
 
         # 구글뉴스 중계면 원문 복원 시도
-        try:
-            host2 = urlparse(final_url2).netloc.lower()
-        except Exception:
-            host2 = ""
+        host2 = _url_info(final_url2).host
         if "news.google." in host2:
             html_for_extract = pre_html2 or _http_get_with_ua(final_url2, timeout=timeout)
             real_u = _extract_google_news_original_url(html_for_extract or "", final_url2)
@@ -1013,32 +1880,53 @@ def fetch_article_text(url: str, timeout: int = 12) -> str:
 
         plain_html, rendered_html, amp_html = _fetch_html_full(final_url2, pre_html2, timeout=timeout)
 
+        # HTML 소스마다 soup 는 한 번만 만들어 사이트별 룰/bs4 본문 추출이 같이 씀
+        soups: Dict[int, Any] = {}
+
+        def _soup_of(html_src: str):
+            key = id(html_src)
+            if key not in soups:
+                soups[key] = _parse_article_soup(html_src)
+            return soups[key]
+
         # 사이트별 룰 먼저
         for html_src in (plain_html, rendered_html, amp_html):
             if not html_src:
                 continue
-            site_txt = _extract_site_specific(final_url2, html_src)
+            site_txt = _extract_site_specific(final_url2, _soup_of(html_src))
             if site_txt and len(site_txt.strip()) > 50:
                 return site_txt.strip()
 
-        # 일반 추출기들
+        # 일반 추출기들: 빠르고 품질 좋은 순서로 돌리다가 충분히 긴 본문이 나오면 바로 종료
+        # (대부분 trafilatura 에서 끝나서 나머지 무거운 파서들을 건너뜀)
         cands: List[str] = []
+        extractors = (
+            lambda h: _extract_trafilatura(h),
+            lambda h: _extract_bs4_maintext(_soup_of(h)),
+            lambda h: _extract_readability(h),
+            lambda h: _extract_newspaper3k(final_url2, h),
+            lambda h: _extract_boilerpy3(h),
+        )
 
-        def _try_all(src_name: str, html_src: Optional[str]):
+        def _try_all(src_name: str, html_src: Optional[str]) -> bool:
             if not html_src:
-                return
-            t1 = _extract_trafilatura(html_src)
-            t2 = _extract_readability(html_src)
-            t3 = _extract_newspaper3k(final_url2, html_src)
-            t4 = _extract_boilerpy3(html_src)
-            t5 = _extract_bs4_maintext(html_src)
-            for tx in (t1, t2, t3, t4, t5):
-                if tx and tx.strip():
-                    cands.append(tx.strip())
-
-        _try_all("plain_html", plain_html)
-        _try_all("rendered_html", rendered_html)
-        _try_all("amp_html", amp_html)
+                return False
+            for fn in extractors:
+                tx = (fn(html_src) or "").strip()
+                if not tx:
+                    continue
+                cands.append(tx)
+                if _GOOD_ENOUGH_LEN > 0 and len(tx) >= _GOOD_ENOUGH_LEN:
+                    return True
+            return False
+
+        for src_name, html_src in (
+            ("plain_html", plain_html),
+            ("rendered_html", rendered_html),
+            ("amp_html", amp_html),
+        ):
+            if _try_all(src_name, html_src):
+                return cands[-1]
 
         if not cands:
             return ""
@@ -1053,21 +1941,10 @@ def _clean_text_for_preview(raw_text: str, fallback_snippet: str = "") -> str:
     if not raw_text:
         return (fallback_snippet or "").strip()[:500]
 
-    allowed_chars = []
-    for ch in raw_text:
-        code = ord(ch)
-        is_basic_ws = ch in ("\n", "\r", "\t", " ")
-        is_basic_ascii = 32 <= code <= 126
-        is_hangul = 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F or 0xAC00 <= code <= 0xD7A3
-        is_cjk = 0x4E00 <= code <= 0x9FFF
-        is_fullwidth = 0xFF00 <= code <= 0xFFEF
-        is_cjk_punct = 0x3000 <= code <= 0x303F
-        if is_basic_ws or is_basic_ascii or is_hangul or is_cjk or is_fullwidth or is_cjk_punct:
-            allowed_chars.append(ch)
-
-    cleaned = "".join(allowed_chars)
-    cleaned = re.sub(r"[ \t]+", " ", cleaned)
-    cleaned = re.sub(r"\n\s*\n\s*\n+", "\n\n", cleaned).strip()
+    # 문자 단위 파이썬 루프 대신 정규식 엔진(C) 한 번으로 허용 범위 밖 문자 제거
+    cleaned = _RE_PREVIEW_DISALLOWED.sub("", raw_text)
+    cleaned = _RE_HSPACE.sub(" ", cleaned)
+    cleaned = _RE_MULTI_BLANK.sub("\n\n", cleaned).strip()
 
     if len(cleaned) < 30 and fallback_snippet:
         cleaned = fallback_snippet.strip()
@@ -1105,6 +1982,13 @@ def crawl_news_bodies(news_list: List[Dict[str, str]], max_workers: int = 6) ->
     return out
 
 
+def _strip_snippet_html(desc: str) -> str:
+    """RSS summary 의 <a>/<font> 태그 제거 + 엔티티 복원 (항목마다 HTML 파서를 만들지 않음)."""
+    if not desc:
+        return ""
+    return _RE_SPACES.sub(" ", html.unescape(_RE_HTML_TAG.sub(" ", desc))).strip()
+
+
 def search_news_rss(query: str, top_k: int) -> List[Dict[str, str]]:
     tmpl = getattr(
         settings,
@@ -1132,10 +2016,7 @@ def search_news_rss(query: str, top_k: int) -> List[Dict[str, str]]:
         except Exception:
             src = ""
         if not src:
-            try:
-                src = urlparse(link).netloc
-            except Exception:
-                src = ""
+            src = _url_info(link).parsed.netloc
 
         arts.append(
             {
@@ -1143,18 +2024,114 @@ def search_news_rss(query: str, top_k: int) -> List[Dict[str, str]]:
                 "url": link,
                 "source": src,
                 "published_at": entry.get("published") or entry.get("updated") or "",
-                "snippet": entry.get("summary", "") or "",
+                "snippet": _strip_snippet_html(entry.get("summary", "") or ""),
             }
         )
     return arts
 
 
+# ── 뉴스 답변 의미 캐시 ─────────────────────────────────────────────────
+# 질문 임베딩이 예전 질문과 충분히 비슷하면(코사인 ≥ SEMANTIC_CACHE_THRESHOLD, TTL 이내)
+# LLM/RSS 를 다시 부르지 않고 (답변, 헤드라인)을 그대로 돌려준다.
+# 설정은 semantic_cache(ask_gemini 캐시)와 같은 SEMANTIC_CACHE_* 를 쓰고, 저장은 로컬 벡터 DB.
+_QA_CACHE_READY = False
+
+
+def _qa_cache_conn() -> sqlite3.Connection:
+    global _QA_CACHE_READY
+    conn = _sqlite_conn()
+    if not _QA_CACHE_READY:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS qa_cache (
+                id TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                headlines_json TEXT NOT NULL,
+                emb BLOB NOT NULL,
+                ts REAL NOT NULL
+            )
+        """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS qa_cache_model_ts ON qa_cache (model, ts)")
+        _QA_CACHE_READY = True
+    return conn
+
+
+def _qa_cache_lookup(model: str, q_unit: np.ndarray) -> Optional[Tuple[str, List[Dict[str, str]]]]:
+    ttl = semantic_cache._ttl_sec()
+    cutoff = time.time() - ttl if ttl > 0 else 0.0
+    with _qa_cache_conn() as c:
+        rows = c.execute(
+            "SELECT answer, headlines_json, emb FROM qa_cache WHERE model = ? AND ts >= ?",
+            (model, cutoff),
+        ).fetchall()
+    rows = [r for r in rows if len(r[2]) == q_unit.nbytes]
+    if not rows:
+        return None
+    mat = np.stack([_blob_to_emb(r[2]) for r in rows])
+    sims = mat @ q_unit
+    best = int(np.argmax(sims))
+    if float(sims[best]) < semantic_cache._threshold():
+        return None
+    answer, hjson, _ = rows[best]
+    try:
+        headlines = json.loads(hjson or "[]")
+    except Exception:
+        headlines = []
+    return answer, headlines
+
+
+def _qa_cache_store(
+    model: str, question: str, q_unit: np.ndarray, answer: str, headlines: List[Dict[str, str]]
+) -> None:
+    now = time.time()
+    ttl = semantic_cache._ttl_sec()
+    with _qa_cache_conn() as c:
+        if ttl > 0:
+            c.execute("DELETE FROM qa_cache WHERE ts < ?", (now - ttl,))
+        c.execute(
+            "REPLACE INTO qa_cache (id, model, question, answer, headlines_json, emb, ts)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                _embed_key(model, question),
+                model,
+                question,
+                answer,
+                json.dumps(headlines, ensure_ascii=False, default=str),
+                _emb_to_blob(q_unit),
+                now,
+            ),
+        )
+
+
+def _answer_cacheable(answer: str) -> bool:
+    t = (answer or "").strip()
+    return bool(t) and t != _EMPTY_FALLBACK and not t.startswith(
+        ("모델 호출 실패", "모델이 텍스트 본문을 반환하지 않았습니다")
+    )
+
+
 # ★ 변경 포인트 2: 항상 비어있지 않은 답변을 반환하도록 보강
 def gemini_answer_with_news(question: str) -> Tuple[str, List[Dict[str, str]]]:
     """
     1) Vertex로 answer_text 생성
     2) 관련 최신 뉴스 헤드라인 목록 반환
+    SEMANTIC_CACHE_ENABLED=1 이면 비슷한 질문의 이전 결과를 재사용 (캐시 오류는 무시)
     """
+    model = ""
+    q_unit: Optional[np.ndarray] = None
+    if semantic_cache.enabled():
+        try:
+            model = _env_embed_model()
+            q_unit = _unit(_embed_texts([question])[0])
+            hit = _qa_cache_lookup(model, q_unit)
+            if hit:
+                return hit
+        except Exception as e:
+            log.debug("news answer cache lookup skipped: %s", e)
+
     prompt = (
         "한국어로 간결하고 최신성을 반영해서 답하세요.\n"
         "가능하면 참고할 만한 기사나 자료 URL을 본문 하단에 목록 형태로 3~5개 적어 주세요.\n\n"
@@ -1172,8 +2149,15 @@ def gemini_answer_with_news(question: str) -> Tuple[str, List[Dict[str, str]]]:
     # 최종 보정: 빈 문자열이나 공백/형식문자만 오면 폴백 문구로 대체
     if not isinstance(answer_text, str) or not answer_text.strip():
         answer_text = _EMPTY_FALLBACK
+    answer_text = answer_text.strip()
+
+    if q_unit is not None and _answer_cacheable(answer_text):
+        try:
+            _qa_cache_store(model, question, q_unit, answer_text, headlines)
+        except Exception as e:
+            log.debug("news answer cache store skipped: %s", e)
 
-    return answer_text.strip(), headlines
+    return answer_text, headlines
 
 
 # =============================================================================
@@ -1185,50 +2169,86 @@ def _sha(s: str) -> str:
     return hashlib.sha1((s or "").encode("utf-8", "ignore")).hexdigest()[:16]
 
 
+_RE_SLUG_BAD = re.compile(r"[^0-9A-Za-z가-힣\-_. ]+")
+
+
 def _slug(s: str, n: int = 60) -> str:
-    cleaned = re.sub(r"[^0-9A-Za-z가-힣\-_. ]+", "", s or "")
-    cleaned = re.sub(r"\s+", "-", cleaned).strip("-")
-    return cleaned[:n] or "doc"
+    return _RE_SPACES.sub("-", _RE_SLUG_BAD.sub("", s or "")).strip("-")[:n] or "doc"
 
 
 def _iso(dt) -> str:
-    from email.utils import parsedate_to_datetime
-
-    try:
-        if isinstance(dt, datetime):
-            return dt.isoformat()
-        if not dt:
-            return ""
+    if isinstance(dt, datetime):
+        return dt.isoformat()
+    if not dt:
+        return ""
+    s = str(dt).strip()
+    # ISO-8601 은 숫자로 시작, RSS(RFC 2822) 는 요일/일자 → 맞는 파서를 먼저 시도해 예외 경로를 피함
+    if s[:1].isdigit():
         try:
-            return parsedate_to_datetime(dt).isoformat()
-        except Exception:
-            return datetime.fromisoformat(str(dt).replace("Z", "+00:00")).isoformat()
-    except Exception:
+            return datetime.fromisoformat(s.replace("Z", "+00:00")).isoformat()
+        except ValueError:
+            pass
+    try:
+        return parsedate_to_datetime(s).isoformat()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).isoformat()
+    except ValueError:
         return ""
 
 
-def _chunk_text(text: str, size=1600, overlap=200) -> List[str]:
-    t = (text or "").strip()
-    if not t:
-        return []
-    out = []
-    i = 0
+# 청크 끝을 당겨 맞출 경계 (우선순위 순) 와 탐색 범위(끝에서 몇 글자 안쪽까지)
+_CHUNK_SEPS = ("\n\n", "\n", ". ", "。")
+_CHUNK_SNAP = 200
+
+
+def _chunk_spans(t: str, size=1600, overlap=200, snap: int = _CHUNK_SNAP):
+    """
+    t 를 (start, end) 인덱스 쌍으로 나눈다 (슬라이스는 호출부에서 필요할 때만 생성).
+    끝 위치는 마지막 snap 글자 안의 문단/문장 경계로 당겨서 자른다 (snap=0 이면 고정 길이).
+    """
     n = len(t)
+    i = 0
     while i < n:
         j = min(i + size, n)
-        out.append(t[i:j])
-        if j == n:
+        if j < n and snap > 0:
+            # 다음 시작(j - overlap)이 반드시 i 보다 뒤가 되도록 탐색 하한을 둔다
+            lo = max(i + overlap + 1, j - snap)
+            for sep in _CHUNK_SEPS:
+                k = t.rfind(sep, lo, j)
+                if k >= 0:
+                    j = k + len(sep)
+                    break
+        yield i, j
+        if j >= n:
             break
-        i = j - overlap
-    return out
+        i = max(j - overlap, i + 1)
+
+
+def _chunk_text(text: str, size=1600, overlap=200, snap: int = 0) -> List[str]:
+    # 기본은 예전과 같은 고정 길이 경계 (다른 인덱서들의 base:idx 청크 ID 가 가리키는 내용이 바뀌지 않도록)
+    t = (text or "").strip()
+    if not t:
+        return []
+    return [t[a:b] for a, b in _chunk_spans(t, size, overlap, snap)]
+
+
+# 모델별 임베딩 차원 (프로브 임베딩은 모델당 한 번만; 실패(-1)는 캐시하지 않음)
+_EMBED_DIM_BY_MODEL: Dict[str, int] = {}
 
 
 def _current_embed_dim() -> int:
+    model = _env_embed_model()
+    dim = _EMBED_DIM_BY_MODEL.get(model)
+    if dim is not None:
+        return dim
     try:
         vec = _embed_texts(["__dim_probe__"])[0]
-        return len(vec)
     except Exception:
         return -1
+    _EMBED_DIM_BY_MODEL[model] = len(vec)
+    return len(vec)
 
 
 _URL_RAW = re.compile(r"(https?://[^\s<>\]\)\"']+)")
@@ -1238,15 +2258,7 @@ _URL_MD = re.compile(r"\[[^\]]+\]\((https?://[^\s)]+)\)")
 def _extract_urls_from_answer(text: str, max_n: int = 6) -> List[str]:
     if not text:
         return []
-    urls: List[str] = []
-    try:
-        urls += _URL_MD.findall(text)
-    except Exception:
-        pass
-    try:
-        urls += _URL_RAW.findall(text)
-    except Exception:
-        pass
+    urls = _URL_MD.findall(text) + _URL_RAW.findall(text)
 
     out: List[str] = []
     seen = set()
@@ -1299,9 +2311,9 @@ def chroma_upsert(
         else:
             metadatas = metadatas[:n]
 
-    # 임베딩이 없으면 생성
+    # 임베딩이 없으면 생성 (중복 문서는 한 번만)
     if not embeddings or len(embeddings) != n:
-        embeddings = _embed_texts(documents)
+        embeddings = _embed_texts_dedup(documents)
 
     # ID 기본값 생성 (비어있으면)
     if not ids or len(ids) != n:
@@ -1331,16 +2343,19 @@ def indexto_chroma_safe(
     ids: List[str] = []
     docs: List[str] = []
     metas: List[Dict[str, Any]] = []
+    # base → 이번에 만든 번호 청크 수 (줄어든 경우 예전 꼬리 청크 삭제용)
+    chunk_counts: Dict[str, int] = {}
 
     # A) 모델 answer → 청크
     if answer:
-        ans_chunks = _chunk_text(answer, size=size, overlap=overlap)
+        ans_t = answer.strip()
         base_a = f"answer:{_sha(question)}"
-        for i, ch in enumerate(ans_chunks):
-            ch_s = (ch or "").strip()
+        for i, (a, b) in enumerate(_chunk_spans(ans_t, size, overlap)):
+            ch_s = ans_t[a:b].strip()
             if not ch_s:
                 continue
             ids.append(f"{base_a}:{i}")
+            chunk_counts[base_a] = i + 1
             docs.append(ch_s)
             metas.append(
                 {
@@ -1391,12 +2406,12 @@ def indexto_chroma_safe(
                 news_meta_only_count += 1
 
         if body:
-            body_chunks = _chunk_text(body, size=size, overlap=overlap)
-            for idx, ch in enumerate(body_chunks):
-                ch_s = (ch or "").strip()
+            for idx, (a, b) in enumerate(_chunk_spans(body, size, overlap)):
+                ch_s = body[a:b].strip()
                 if not ch_s:
                     continue
                 ids.append(f"{base}:{idx}")
+                chunk_counts[base] = idx + 1
                 docs.append(ch_s)
                 metas.append(
                     {
@@ -1428,18 +2443,23 @@ def indexto_chroma_safe(
             )
         )
         urls = _extract_urls_from_answer(answer, max_n=max_links)
-        for u in urls:
-            body2 = fetch_article_text(u, timeout=timeout_s)
+        # 링크 본문은 동시에 받아온다 (순서는 urls 순서 유지)
+        bodies: List[str] = []
+        if urls:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_links, len(urls)))) as ex:
+                bodies = list(ex.map(lambda u: fetch_article_text(u, timeout=timeout_s), urls))
+        for u, body2 in zip(urls, bodies):
             if not body2:
                 continue
             body2_len = len(body2)
-            link_chunks = _chunk_text(body2, size=size, overlap=overlap)
-            base_l = f"anslink:{_slug(urlparse(u).netloc)}:{_sha(u)}"
-            for idx, ch in enumerate(link_chunks):
-                ch_s = (ch or "").strip()
+            body2 = body2.strip()
+            base_l = f"anslink:{_slug(_url_info(u).parsed.netloc)}:{_sha(u)}"
+            for idx, (a, b) in enumerate(_chunk_spans(body2, size, overlap)):
+                ch_s = body2[a:b].strip()
                 if not ch_s:
                     continue
                 ids.append(f"{base_l}:{idx}")
+                chunk_counts[base_l] = idx + 1
                 docs.append(ch_s)
                 metas.append(
                     {
@@ -1474,8 +2494,17 @@ def indexto_chroma_safe(
 
     ids2, docs2, metas2 = map(list, zip(*clean))
 
-    # 전역 chroma_upsert 사용 (임베딩 자동 생성/검증 포함)
-    chroma_upsert(ids=ids2, documents=docs2, metadatas=metas2)
+    # 전체 청크를 한 번에 임베딩 (내용이 같은 청크는 한 번만 모델에 보냄)
+    embs2 = _embed_texts_dedup(docs2)
+
+    # 전역 chroma_upsert 사용 (길이 검증 포함)
+    chroma_upsert(ids=ids2, documents=docs2, metadatas=metas2, embeddings=embs2)
+    try:
+        stale = _sqlite_delete_stale_chunks(chunk_counts)
+        if stale:
+            log.info("indexto_chroma_safe: 예전 꼬리 청크 %d개 삭제", stale)
+    except Exception as e:
+        log.warning("예전 꼬리 청크 정리 실패: %s", e)
 
     ans_chunks = sum(1 for m in metas2 if m.get("source") == "web_answer")
     news_chunks = sum(1 for m in metas2 if m.get("source") == "news")
@@ -1537,21 +2566,55 @@ def _chroma_query_with_embeddings(
 ):
     q_emb = _embed_texts([query])[0]
     where_fixed = _normalize_where_filter(where)
-    return _sqlite_query_by_embedding(q_emb, topk, where_fixed)
+    return _sqlite_query_cached(q_emb, topk, where_fixed)
 
-def _attach_faq_hits(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
-    기존 RAG hits 리스트에 FAQ 후보들을 '소스'로 추가.
-    - 이미 붙어 있는 FAQ 항목은 중복 제거
-    """
+# FAQ 후보 조회용 백그라운드 풀 (RAG 답변 생성과 병렬)
+_FAQ_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="faq")
+_FAQ_WAIT_SEC = 2.0
+
+
+def _submit_faq_candidates(question: str):
     if get_faq_candidates is None:
-        return hits
+        return None
+    try:
+        return _FAQ_POOL.submit(get_faq_candidates, question, 3)
+    except Exception as e:
+        log.debug("FAQ 백그라운드 조회 시작 실패: %s", e)
+        return None
+
 
+def _faq_candidates_result(fut) -> Optional[List[Dict[str, Any]]]:
+    """
+    백그라운드 FAQ 후보 결과. 미리 시작한 작업이 없으면 None (→ 호출부가 직접 조회).
+    실패/시간 초과면 빈 리스트 (FAQ 반영 생략).
+    """
+    if fut is None:
+        return None
     try:
-        faq_cands = get_faq_candidates(question, top_k=3)
+        return fut.result(timeout=_FAQ_WAIT_SEC) or []
     except Exception as e:
-        log.warning("get_faq_candidates 실패: %s", e)
-        return hits
+        log.warning("get_faq_candidates 실패/지연: %s", e)
+        return []
+
+
+def _attach_faq_hits(
+    question: str,
+    hits: List[Dict[str, Any]],
+    faq_cands: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    기존 RAG hits 리스트에 FAQ 후보들을 '소스'로 추가.
+    - 이미 붙어 있는 FAQ 항목은 중복 제거
+    - faq_cands: 미리 구한 get_faq_candidates(question, top_k=3) 결과 (없으면 여기서 조회)
+    """
+    if faq_cands is None:
+        if get_faq_candidates is None:
+            return hits
+        try:
+            faq_cands = get_faq_candidates(question, top_k=3)
+        except Exception as e:
+            log.warning("get_faq_candidates 실패: %s", e)
+            return hits
 
     if not faq_cands:
         return hits
@@ -1591,18 +2654,25 @@ def _attach_faq_hits(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str
     return merged
 
 
-def _maybe_override_with_faq_answer(question: str, answer_text: str) -> str:
+def _maybe_override_with_faq_answer(
+    question: str,
+    answer_text: str,
+    faq_cands: Optional[List[Dict[str, Any]]] = None,
+) -> str:
     """
     질문이 FAQ와 거의 동일하면, 모델 답변 대신 FAQ 답변으로 갈아끼우기.
     - get_faq_candidates 점수 기준으로 판단
+    - faq_cands: 미리 구한 후보 목록(점수순)이 있으면 첫 항목을 쓴다
     """
-    if get_faq_candidates is None:
-        return answer_text
-
-    try:
-        faq_best_list = get_faq_candidates(question, top_k=1)
-    except Exception:
-        return answer_text
+    if faq_cands is not None:
+        faq_best_list = faq_cands[:1]
+    else:
+        if get_faq_candidates is None:
+            return answer_text
+        try:
+            faq_best_list = get_faq_candidates(question, top_k=1)
+        except Exception:
+            return answer_text
 
     if not faq_best_list:
         return answer_text
@@ -1621,44 +2691,61 @@ def _maybe_override_with_faq_answer(question: str, answer_text: str) -> str:
 
     return answer_text
 
+
+def _hit_score(d) -> Optional[float]:
+    if d is None:
+        return None
+    try:
+        return float(d)
+    except Exception:
+        return None
+
+
+def _hit_snippet(doc) -> str:
+    if not isinstance(doc, str):
+        doc = str(doc)
+    return doc[:800].replace("\n", " ").strip()
+
+
 def _parse_hits_from_res(res):
     def _pick(v):
         return v[0] if (isinstance(v, list) and v and isinstance(v[0], list)) else (v or [])
 
     docs = _pick(res.get("documents"))
     metas = _pick(res.get("metadatas"))
-    ids_ = _pick(res.get("ids")) if "ids" in res else [""] * len(docs)
+    ids_ = _pick(res.get("ids")) if "ids" in res else []
     dists = _pick(res.get("distances"))
 
-    hits = []
-    for i, doc in enumerate(docs):
-        if not doc:
-            continue
-        snippet = ((doc[:800] if isinstance(doc, str) else str(doc)).replace("\n", " ").strip())
-        m = metas[i] if i < len(metas) else {}
-        try:
-            score = float(dists[i]) if (dists and i < len(dists) and dists[i] is not None) else None
-        except Exception:
-            score = None
-        hits.append(
-            {
-                "id": ids_[i] if i < len(ids_) else "",
-                "score": score,
-                "meta": m,
-                "snippet": snippet,
-            }
-        )
-    return hits
+    # 네 리스트를 한 번에 순회 (짧은 쪽은 None 으로 채움 → id "", meta {}, score None)
+    return [
+        {
+            "id": i if i is not None else "",
+            "score": _hit_score(d),
+            "meta": m if m is not None else {},
+            "snippet": _hit_snippet(doc),
+        }
+        for doc, m, i, d in zip_longest(docs, metas, ids_, dists)
+        if doc
+    ]
+
+
+try:
+    import xxhash  # type: ignore  # 선택: hits 중복 키를 64비트 정수로
+except Exception:
+    xxhash = None  # type: ignore
 
 
 def _rank_and_dedupe_hits(hits: List[Dict[str, Any]], max_n: int = 8) -> List[Dict[str, Any]]:
     def key_of(h):
         m = h.get("meta") or {}
-        return (
+        parts = (
             (m.get("url") or "").strip().lower(),
             (m.get("title") or "").strip(),
             (h.get("snippet") or "")[:120],
         )
+        if xxhash is None:
+            return parts
+        return xxhash.xxh3_64_intdigest("\x00".join(parts).encode("utf-8"))
 
     def score_of(h):
         s = h.get("score")
@@ -1694,22 +2781,28 @@ def _build_source_block(hits: List[Dict[str, Any]]) -> str:
     return "\n\n".join(lines)
 
 
+# RAG 프롬프트 공통 앞부분. 질문/근거보다 항상 앞에 두어 요청 간 프롬프트 앞부분이 같게 유지
+# (Gemini 암시적 캐시는 같은 앞부분을 자동 재사용. 이 길이는 명시적 캐시 최소 토큰에 못 미쳐 따로 올리지 않음)
+PROMPT_PREFIX_HARD = (
+    "아래 '근거 자료'에 있는 내용만 사용해 한국어로 핵심을 정리해 답하세요.\n"
+    "- 문장/항목 끝에 반드시 [1], [2]처럼 근거 번호 인용을 붙이세요.\n"
+    "- 직접적 근거가 부족하면 '자료 내 직접 근거 부족' 한 줄만 쓰고 추측은 금지합니다.\n"
+    "- 군더더기 없이 핵심만 요약하세요.\n\n"
+)
+PROMPT_PREFIX_SOFT = (
+    "아래 '근거 자료'를 최우선으로 참고해 한국어로 4~8문장으로 핵심을 답하세요.\n"
+    "- 가능하면 문장 끝에 [1], [2]처럼 근거 번호를 붙이되, 직접 근거가 없으면 인용은 생략 가능합니다.\n"
+    "- 근거가 부족한 부분은 일반 지식/상식으로 간결히 보완하세요(과도한 추측 금지).\n"
+    "- 불필요한 서론 없이 핵심만.\n\n"
+)
+
+
+def _rag_prompt_tail(question: str, source_block: str) -> str:
+    return f"[질문]\n{question}\n\n[근거 자료]\n{source_block}\n\n=== 답변 시작 ===\n"
+
+
 def _make_rag_prompt(question: str, source_block: str, hard: bool = False) -> str:
-    if hard:
-        return (
-            "아래 '근거 자료'에 있는 내용만 사용해 한국어로 핵심을 정리해 답하세요.\n"
-            "- 문장/항목 끝에 반드시 [1], [2]처럼 근거 번호 인용을 붙이세요.\n"
-            "- 직접적 근거가 부족하면 '자료 내 직접 근거 부족' 한 줄만 쓰고 추측은 금지합니다.\n"
-            "- 군더더기 없이 핵심만 요약하세요.\n\n"
-            f"[질문]\n{question}\n\n[근거 자료]\n{source_block}\n\n=== 답변 시작 ===\n"
-        )
-    return (
-        "아래 '근거 자료'를 최우선으로 참고해 한국어로 4~8문장으로 핵심을 답하세요.\n"
-        "- 가능하면 문장 끝에 [1], [2]처럼 근거 번호를 붙이되, 직접 근거가 없으면 인용은 생략 가능합니다.\n"
-        "- 근거가 부족한 부분은 일반 지식/상식으로 간결히 보완하세요(과도한 추측 금지).\n"
-        "- 불필요한 서론 없이 핵심만.\n\n"
-        f"[질문]\n{question}\n\n[근거 자료]\n{source_block}\n\n=== 답변 시작 ===\n"
-    )
+    return (PROMPT_PREFIX_HARD if hard else PROMPT_PREFIX_SOFT) + _rag_prompt_tail(question, source_block)
 
 
 def rag_answer_grounded(
@@ -1717,11 +2810,15 @@ def rag_answer_grounded(
     initial_topk: int = 5,
     fallback_topk: int = 12,
     max_sources: int = 8,
+    final_topn: Optional[int] = None,
+    faq_cands: Optional[List[Dict[str, Any]]] = None,
 ) -> Tuple[str, List[Dict[str, Any]]]:
     """
     1) 로컬 벡터 스토어(SQLite/Chroma 대체)에서 근거 검색
     2) Gemini로 답변 생성
     3) FAQ 후보를 소스(hits)에 추가하고, 필요시 메인 답변을 FAQ로 교체
+    final_topn 을 주면 반환 hits 를 점수 기준 상위 final_topn 개로 줄인다.
+    faq_cands: 호출부(채팅 뷰)가 이미 구한 get_faq_candidates 결과. 주면 FAQ 재계산을 건너뛴다.
     """
     col = _chroma_collection()
     sources_filter = getattr(settings, "RAG_SOURCES_FILTER", None)
@@ -1736,6 +2833,87 @@ def rag_answer_grounded(
     res1 = _chroma_query_with_embeddings(col, question, initial_topk, where=sources_filter)
     hits1_all = _parse_hits_from_res(res1)
     hits1 = _rank_and_dedupe_hits(hits1_all, max_sources)
+
+    # 같은 질문 + 같은 1차 근거면 이전 최종 결과 재사용 (근거가 없으면 캐시 안 함)
+    ans_key = _rag_answer_key(question, hits1, rag_force_answer) if hits1 else None
+    if ans_key is not None:
+        cached = _rag_answer_cache_get(ans_key)
+        if cached is not None:
+            ans, hits = cached
+            if final_topn is not None:
+                hits = _rerank_hits_by_relevance(question, hits, topn=final_topn)
+            return ans, hits
+
+    # FAQ 후보 계산은 답변 생성(LLM)과 겹쳐서 백그라운드로 (질문 임베딩은 방금 검색에서 메모리 캐시됨)
+    faq_future = _submit_faq_candidates(question) if faq_cands is None else None
+
+    ans, hits = _rag_answer_from_hits(
+        question, col, hits1, rag_force_answer, fallback_topk, max_sources, faq_future, faq_cands
+    )
+    if ans_key is not None and _answer_cacheable(ans):
+        _rag_answer_cache_put(ans_key, ans, hits)
+    if final_topn is not None:
+        hits = _rerank_hits_by_relevance(question, hits, topn=final_topn)
+    return ans, hits
+
+
+# ── RAG 최종 답변 캐시 ──────────────────────────────────────────────────
+# 키: (질문 해시, 1차 근거 id 지문, 강제응답 여부). 값: (답변, hits, 저장 시각). LRU + TTL.
+_ANS_CACHE: "OrderedDict[Tuple[str, str, bool], Tuple[str, List[Dict[str, Any]], float]]" = OrderedDict()
+_ANS_CACHE_LOCK = threading.Lock()
+_ANS_CACHE_MAX = 1024
+_ANS_CACHE_TTL = int(
+    os.environ.get("RAG_ANSWER_CACHE_TTL_SEC") or getattr(settings, "RAG_ANSWER_CACHE_TTL_SEC", None) or 600
+)
+
+
+def _rag_answer_key(question: str, hits: List[Dict[str, Any]], force: bool) -> Optional[Tuple[str, str, bool]]:
+    if _ANS_CACHE_TTL <= 0:
+        return None
+    joined = ",".join(sorted(str(h.get("id") or "") for h in hits))
+    sig = xxhash.xxh3_64_hexdigest(joined.encode("utf-8")) if xxhash is not None else _sha(joined)
+    return (_sha(question), sig, bool(force))
+
+
+def _rag_answer_cache_get(key) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    with _ANS_CACHE_LOCK:
+        hit = _ANS_CACHE.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[2] > _ANS_CACHE_TTL:
+            del _ANS_CACHE[key]
+            return None
+        _ANS_CACHE.move_to_end(key)
+        # 호출부가 hits 리스트를 고쳐도 캐시가 변하지 않도록 리스트는 복사해서 반환
+        return hit[0], list(hit[1])
+
+
+def _rag_answer_cache_put(key, answer: str, hits: List[Dict[str, Any]]) -> None:
+    with _ANS_CACHE_LOCK:
+        _ANS_CACHE[key] = (answer, list(hits), time.monotonic())
+        _ANS_CACHE.move_to_end(key)
+        while len(_ANS_CACHE) > _ANS_CACHE_MAX:
+            _ANS_CACHE.popitem(last=False)
+
+
+def _rag_answer_from_hits(
+    question: str,
+    col,
+    hits1: List[Dict[str, Any]],
+    rag_force_answer: bool,
+    fallback_topk: int,
+    max_sources: int,
+    faq_future=None,
+    faq_cands: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """rag_answer_grounded 의 1차 검색 이후 단계 (답변 생성 → 키워드 확장 재검색 → 폴백)."""
+    faq_memo: List[Optional[List[Dict[str, Any]]]] = [] if faq_cands is None else [faq_cands]
+
+    def _faq() -> Optional[List[Dict[str, Any]]]:
+        if not faq_memo:
+            faq_memo.append(_faq_candidates_result(faq_future))
+        return faq_memo[0]
+
     block1 = _build_source_block(hits1)
 
     ans1 = ask_gemini(_make_rag_prompt(question, block1, hard=not rag_force_answer), model=None)
@@ -1746,8 +2924,8 @@ def rag_answer_grounded(
 
     if not _weak(ans1):
         # ✅ 여기서 바로 FAQ 반영
-        ans1_fixed = _maybe_override_with_faq_answer(question, ans1)
-        hits1_fixed = _attach_faq_hits(question, hits1)
+        ans1_fixed = _maybe_override_with_faq_answer(question, ans1, faq_cands=_faq())
+        hits1_fixed = _attach_faq_hits(question, hits1, faq_cands=_faq())
         return ans1_fixed, hits1_fixed
 
     # ─ 2차(키워드 확장) 검색 ────────────────────────────────
@@ -1769,8 +2947,8 @@ def rag_answer_grounded(
     ans2 = ask_gemini(_make_rag_prompt(question, block2, hard=not rag_force_answer), model=None)
 
     if not _weak(ans2):
-        ans2_fixed = _maybe_override_with_faq_answer(question, ans2)
-        hits2_fixed = _attach_faq_hits(question, hits2)
+        ans2_fixed = _maybe_override_with_faq_answer(question, ans2, faq_cands=_faq())
+        hits2_fixed = _attach_faq_hits(question, hits2, faq_cands=_faq())
         return ans2_fixed, hits2_fixed
 
     # ─ 일반 지식 폴백 ───────────────────────────────────────
@@ -1782,16 +2960,16 @@ def rag_answer_grounded(
             model=None,
         )
         if (ans_fallback or "").strip():
-            ans_fb_fixed = _maybe_override_with_faq_answer(question, ans_fallback.strip())
-            hits_fb_fixed = _attach_faq_hits(question, hits2 or hits1)
+            ans_fb_fixed = _maybe_override_with_faq_answer(question, ans_fallback.strip(), faq_cands=_faq())
+            hits_fb_fixed = _attach_faq_hits(question, hits2 or hits1, faq_cands=_faq())
             return ans_fb_fixed, hits_fb_fixed
 
     # ─ 최종 완전 폴백 ───────────────────────────────────────
     final_ans = (ans2 or ans1 or _EMPTY_FALLBACK)
     final_hits = (hits2 or hits1)
 
-    final_ans = _maybe_override_with_faq_answer(question, final_ans)
-    final_hits = _attach_faq_hits(question, final_hits)
+    final_ans = _maybe_override_with_faq_answer(question, final_ans, faq_cands=_faq())
+    final_hits = _attach_faq_hits(question, final_hits, faq_cands=_faq())
 
     return final_ans, final_hits
 
@@ -1808,7 +2986,13 @@ def _rerank_hits_by_relevance(question: str, hits: List[Dict[str, Any]], topn: i
         except Exception:
             return 1e9
 
-    return sorted(hits, key=score)[:topn]
+    scores = [score(h) for h in hits]
+    # _rank_and_dedupe_hits 결과는 이미 점수순 → 한 번 훑어 확인되면 자르기만
+    if all(a <= b for a, b in zip(scores, scores[1:])):
+        return list(hits[:topn])
+    # 전체 정렬 대신 상위 topn 만 힙으로 (sorted(...)[:topn] 과 같은 결과, 동점 순서도 유지)
+    order = heapq.nsmallest(topn, range(len(hits)), key=scores.__getitem__)
+    return [hits[i] for i in order]
 
 
 def _build_history_context(history: List[Dict[str, str]], max_turns: int = 3) -> str:
@@ -1834,12 +3018,25 @@ def rag_answer_grounded_with_history(
     initial_topk: int = 5,
     fallback_topk: int = 12,
     max_sources: int = 8,
+    faq_cands: Optional[List[Dict[str, Any]]] = None,
 ) -> Tuple[str, List[Dict[str, Any]]]:
     """
     히스토리(최근 대화 몇 턴)를 간접적으로 참고하는 RAG.
     - 검색/생성/FAQ 처리 자체는 base_retriever_func(rag_answer_grounded)에 맡긴다.
     - 여기서는 hit 리스트를 relevance 기준으로 정리만.
+    - faq_cands: 미리 구한 FAQ 후보 (기본 검색기일 때만 전달)
     """
+    # 기본 검색기는 상위 5개 정리까지 한 번에 처리
+    if base_retriever_func is rag_answer_grounded:
+        return rag_answer_grounded(
+            question,
+            initial_topk=initial_topk,
+            fallback_topk=fallback_topk,
+            max_sources=max_sources,
+            final_topn=5,
+            faq_cands=faq_cands,
+        )
+
     answer_text, used_hits = base_retriever_func(
         question,
         initial_topk=initial_topk,
@@ -1,13 +1,18 @@
 # ragapp/services/pdf_utils.py
 from __future__ import annotations
 import io
-import tempfile
-from typing import Optional, List
+from typing import Iterator, Optional, List
 
-# 우선순위 1: pypdf
+# 우선순위 1: PyMuPDF (C 구현, 가장 빠름)
+try:
+    import fitz as _fitz  # type: ignore
+except Exception:
+    _fitz = None  # type: ignore
+
+# 우선순위 2: pypdf
 try:
     from pypdf import PdfReader as _PdfReader  # type: ignore
-except Exception:  # 우선순위 2: PyPDF2
+except Exception:  # 우선순위 2-1: PyPDF2
     try:
         from PyPDF2 import PdfReader as _PdfReader  # type: ignore
     except Exception:
@@ -20,6 +25,36 @@ except Exception:
     _pdfminer_extract_text = None  # type: ignore
 
 
+def _extract_with_fitz(data: bytes, max_pages: Optional[int] = None) -> str:
+    if _fitz is None:
+        return ""
+    try:
+        doc = _fitz.open(stream=data, filetype="pdf")
+    except Exception:
+        return ""
+    parts: List[str] = []
+    try:
+        for i, page in enumerate(doc):
+            if max_pages is not None and i >= max_pages:
+                break
+            try:
+                t = page.get_text("text") or ""
+            except Exception:
+                t = ""
+            if t:
+                parts.append(t)
+    finally:
+        doc.close()
+    return "\n".join(parts).strip()
+
+
+def _page_text(page) -> str:
+    try:
+        return page.extract_text() or ""
+    except Exception:
+        return ""
+
+
 def _extract_with_pypdf(data: bytes, max_pages: Optional[int] = None) -> str:
     if _PdfReader is None:
         return ""
@@ -28,10 +63,7 @@ def _extract_with_pypdf(data: bytes, max_pages: Optional[int] = None) -> str:
     for i, page in enumerate(getattr(reader, "pages", [])):
         if max_pages is not None and i >= max_pages:
             break
-        try:
-            t = page.extract_text() or ""
-        except Exception:
-            t = ""
+        t = _page_text(page)
         if t:
             parts.append(t)
     return "\n".join(parts).strip()
@@ -40,21 +72,21 @@ def _extract_with_pypdf(data: bytes, max_pages: Optional[int] = None) -> str:
 def _extract_with_pdfminer(data: bytes) -> str:
     if _pdfminer_extract_text is None:
         return ""
-    # pdfminer는 파일 경로 입력이 편해서 임시 파일로 우회
-    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
-        tmp.write(data)
-        tmp.flush()
-        try:
-            return (_pdfminer_extract_text(tmp.name) or "").strip()
-        except Exception:
-            return ""
+    # 파일 객체도 받으므로 임시 파일 없이 메모리에서 바로 파싱
+    try:
+        return (_pdfminer_extract_text(io.BytesIO(data)) or "").strip()
+    except Exception:
+        return ""
 
 
 def extract_text_from_pdf_bytes(data: bytes, max_pages: Optional[int] = None) -> str:
     """
     PDF 바이트에서 텍스트를 추출.
-    1) pypdf/PyPDF2 → 2) pdfminer.six 순으로 시도, 모두 실패 시 빈 문자열.
+    1) PyMuPDF → 2) pypdf/PyPDF2 → 3) pdfminer.six 순으로 시도, 모두 실패 시 빈 문자열.
     """
+    text = _extract_with_fitz(data, max_pages=max_pages)
+    if text:
+        return text
     text = _extract_with_pypdf(data, max_pages=max_pages)
     if text:
         return text
@@ -62,6 +94,78 @@ def extract_text_from_pdf_bytes(data: bytes, max_pages: Optional[int] = None) ->
     return text or ""
 
 
+def iter_extract_text_from_pdf_bytes(data: bytes, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    페이지 단위로 텍스트를 내보내는 제너레이터 (문서 전체를 한 문자열로 만들지 않음).
+    PyMuPDF → pypdf/PyPDF2 순으로 페이지를 읽고, 둘 다 아무것도 못 내면 pdfminer 전체 추출 1회.
+    어느 파서도 문서를 열지 못하면(손상된 PDF, 파서 미설치) RuntimeError 를 던진다.
+    텍스트가 없는 PDF(스캔본 등)는 예외 없이 아무것도 내보내지 않는다.
+    """
+    opened = False
+    errors: List[str] = []
+
+    if _fitz is not None:
+        try:
+            doc = _fitz.open(stream=data, filetype="pdf")
+        except Exception as e:
+            doc = None
+            errors.append(f"PyMuPDF: {e}")
+        if doc is not None:
+            opened = True
+            yielded = False
+            try:
+                for i, page in enumerate(doc):
+                    if max_pages is not None and i >= max_pages:
+                        break
+                    try:
+                        t = page.get_text("text") or ""
+                    except Exception:
+                        t = ""
+                    if t:
+                        yielded = True
+                        yield t
+            finally:
+                doc.close()
+            if yielded:
+                return
+
+    if _PdfReader is not None:
+        try:
+            pages = _PdfReader(io.BytesIO(data)).pages
+        except Exception as e:
+            pages = None
+            errors.append(f"pypdf: {e}")
+        if pages is not None:
+            opened = True
+            yielded = False
+            for i, page in enumerate(pages):
+                if max_pages is not None and i >= max_pages:
+                    break
+                t = _page_text(page)
+                if t:
+                    yielded = True
+                    yield t
+            if yielded:
+                return
+
+    if _pdfminer_extract_text is not None:
+        try:
+            t = (_pdfminer_extract_text(io.BytesIO(data)) or "").strip()
+        except Exception as e:
+            t = ""
+            errors.append(f"pdfminer: {e}")
+        else:
+            opened = True
+        if t:
+            yield t
+            return
+
+    if not opened:
+        if errors:
+            raise RuntimeError("PDF 텍스트 추출 실패 (" + "; ".join(errors) + ")")
+        raise RuntimeError("PDF 파서가 없습니다 (PyMuPDF/pypdf/pdfminer.six 중 하나 필요)")
+
+
 # (옵션) 경로 버전이 필요하면 이것도 사용 가능
 def extract_text_from_pdf(path: str, max_pages: Optional[int] = None) -> str:
     with open(path, "rb") as f:
@@ -144,6 +144,8 @@ def _run_vector_query(text: str, topk: int, where):
         if not vecs:
             raise RuntimeError("임베딩 결과 없음")
         q_vec = vecs[0]
+        if hasattr(q_vec, "tolist"):
+            q_vec = q_vec.tolist()  # Chroma query 는 리스트 계약
 
         mres = multi_query_by_embedding(query_embedding=q_vec, k=topk)
         hits = mres.get("hits") or []
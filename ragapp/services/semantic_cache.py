@@ -0,0 +1,117 @@
+# ragapp/services/semantic_cache.py
+"""
+ask_gemini 용 의미 기반(semantic) 응답 캐시.
+
+프롬프트를 임베딩해서 예전에 답한 프롬프트 중 충분히 비슷한 것(코사인 ≥ 임계치)이 있으면
+LLM 을 다시 부르지 않고 저장된 답을 돌려준다.
+- RAG 검색 결과에 섞이지 않도록 전용 Chroma 컬렉션(qa_cache, cosine 공간)을 쓴다
+- SEMANTIC_CACHE_ENABLED=1 일 때만 동작 (기본 꺼짐)
+- 실패/빈 응답은 저장하지 않음
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from django.conf import settings
+
+from .utils import sha
+
+log = logging.getLogger(__name__)
+
+_COLLECTION = "qa_cache"
+
+
+def _conf(key: str, default: str) -> str:
+    v = getattr(settings, key, None)
+    if v is None:
+        v = os.environ.get(key, default)
+    return str(v).strip()
+
+
+def enabled() -> bool:
+    return _conf("SEMANTIC_CACHE_ENABLED", "0").lower() in ("1", "true", "yes", "y", "on")
+
+
+def _threshold() -> float:
+    try:
+        return float(_conf("SEMANTIC_CACHE_THRESHOLD", "0.93"))
+    except ValueError:
+        return 0.93
+
+
+def _ttl_sec() -> int:
+    try:
+        return int(_conf("SEMANTIC_CACHE_TTL_SEC", "86400"))
+    except ValueError:
+        return 86400
+
+
+@lru_cache(maxsize=1)
+def _collection():
+    from .chroma_store import _chroma_client
+
+    return _chroma_client().get_or_create_collection(
+        name=_COLLECTION, metadata={"hnsw:space": "cosine"}
+    )
+
+
+def _is_cacheable(answer: str) -> bool:
+    t = (answer or "").strip()
+    return bool(t) and not t.startswith(("[모델 응답 실패", "[빈 응답]"))
+
+
+def lookup(prompt: str, emb: List[float]) -> Optional[str]:
+    """임베딩이 가장 가까운 과거 프롬프트의 답(임계치/TTL 통과 시)."""
+    res = _collection().query(
+        query_embeddings=[emb], n_results=1, include=["metadatas", "distances"]
+    )
+    metas = (res.get("metadatas") or [[]])[0]
+    dists = (res.get("distances") or [[]])[0]
+    if not metas or not dists or dists[0] is None:
+        return None
+    sim = 1.0 - float(dists[0])
+    meta = metas[0] or {}
+    if sim < _threshold():
+        return None
+    ttl = _ttl_sec()
+    if ttl > 0 and time.time() - float(meta.get("ts") or 0) > ttl:
+        return None
+    return meta.get("answer") or None
+
+
+def store(prompt: str, emb: List[float], answer: str) -> None:
+    _collection().upsert(
+        ids=[f"qa_cache:{sha(prompt)}"],
+        documents=[prompt],
+        metadatas=[{"source": "qa_cache", "answer": answer, "ts": time.time()}],
+        embeddings=[emb],
+    )
+
+
+def cached_answer(prompt: str, compute: Callable[[], str]) -> str:
+    """
+    캐시 히트면 저장된 답, 아니면 compute() 결과를 저장 후 반환.
+    캐시(임베딩/Chroma) 쪽 오류는 무시하고 그냥 compute() 로 진행.
+    """
+    emb: Optional[List[float]] = None
+    try:
+        from .gemini_client import embed_texts
+
+        emb = embed_texts([prompt])[0]
+        hit = lookup(prompt, emb)
+        if hit:
+            return hit
+    except Exception as e:
+        log.debug("semantic cache lookup skipped: %s", e)
+
+    answer = compute()
+    if emb is not None and _is_cacheable(answer):
+        try:
+            store(prompt, emb, answer)
+        except Exception as e:
+            log.debug("semantic cache store skipped: %s", e)
+    return answer
@@ -3,6 +3,7 @@ import re
 import hashlib
 import hmac
 from datetime import datetime
+from typing import Iterable, Iterator
 from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
 
@@ -73,20 +74,40 @@ def iso(dt) -> str:
         return ""
 
 def chunk_text(text: str, size: int = 1600, overlap: int = 200):
-    """text를 size 단위로 겹치게 슬라이스."""
+    """
+    text를 size 단위로 겹치게 슬라이스 (제너레이터).
+    시작 위치를 range 로 미리 계산해서 문자열 슬라이스만 한다.
+    마지막 청크가 끝에 닿으면 멈춤 → 시작 위치는 [0, len - overlap) 구간.
+    """
     t = (text or "").strip()
     if not t:
-        return []
-    out = []
-    i = 0
+        return iter(())
     n = len(t)
-    while i < n:
-        j = min(i + size, n)
-        out.append(t[i:j])
-        if j == n:
-            break
-        i = j - overlap
-    return out
+    step = max(1, size - overlap)
+    return (t[o:o + size] for o in range(0, max(n - overlap, 1), step))
+
+def chunk_text_stream(pieces: Iterable[str], size: int = 1600, overlap: int = 200) -> Iterator[str]:
+    """
+    조각(예: PDF 페이지) 스트림을 이어 붙이며 size 단위로 겹치게 잘라 내보내는 제너레이터.
+    전체 문서를 한 문자열로 만들지 않고 overlap + 현재 조각 길이만큼만 버퍼에 둔다.
+    조각 사이는 줄바꿈 하나로 잇는다.
+    """
+    step = max(1, size - overlap)
+    buf = ""
+    started = False
+    fresh = False  # 마지막으로 내보낸 뒤 새로 들어온 내용이 있는지
+    for piece in pieces:
+        piece = (piece or "").strip()
+        if not piece:
+            continue
+        buf = f"{buf}\n{piece}" if started else piece
+        started = fresh = True
+        while len(buf) >= size:
+            yield buf[:size]
+            buf = buf[step:]
+            fresh = len(buf) > overlap
+    if buf.strip() and fresh:
+        yield buf
 
 def normalize_where_filter(v):
     """
@@ -0,0 +1,82 @@
+# ragapp/services/vector_ops.py
+"""
+벡터 점수 계산 커널.
+
+로컬 SQLite 벡터 스토어(news_services)의 행렬 스캔에서 쓰는 코사인 거리 계산.
+- 기본은 NumPy(BLAS) 경로: 1 - mat @ q
+- VECTOR_OPS_NUMBA=1 이고 numba 가 있으면 @njit(parallel, fastmath) 루프 사용
+  (BLAS 보다 빠른 환경에서만 켤 것. 단일 코어 768차원 기준으로는 BLAS 가 더 빨랐음)
+  커널은 import 시점이 아니라 첫 호출 때 컴파일한다.
+행렬의 각 행은 이미 단위벡터라고 가정한다(저장 시 정규화). 노름 0 행은 거리 1.0.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# numba 는 import 만으로도 수백 ms 가 들므로 켜져 있을 때만 불러온다
+numba = None  # type: ignore
+if os.environ.get("VECTOR_OPS_NUMBA", "0").strip().lower() in ("1", "true", "yes", "on"):
+    try:
+        import numba  # type: ignore
+    except Exception:
+        numba = None  # type: ignore
+
+USE_NUMBA = numba is not None
+
+# None: 아직 컴파일 전, False: 컴파일 실패(→ BLAS 고정)
+_NB_KERNEL = None
+_NB_LOCK = threading.Lock()
+
+
+def _compile_nb_kernel():
+    @numba.njit(cache=True, parallel=True, fastmath=True)
+    def _unit_cosine_dist_nb(q, mat, out):
+        n, d = mat.shape
+        for i in numba.prange(n):
+            # float32 로 누적 (0.0 리터럴이면 float64 로 승격되어 SIMD 폭이 절반)
+            acc = np.float32(0.0)
+            for j in range(d):
+                acc += mat[i, j] * q[j]
+            out[i] = np.float32(1.0) - acc
+
+    return _unit_cosine_dist_nb
+
+
+def _nb_kernel():
+    global _NB_KERNEL
+    if _NB_KERNEL is None:
+        with _NB_LOCK:
+            if _NB_KERNEL is None:
+                try:
+                    _NB_KERNEL = _compile_nb_kernel()
+                except Exception as e:
+                    log.info("numba 커널 준비 실패 → NumPy 경로 사용: %s", e)
+                    _NB_KERNEL = False
+    return _NB_KERNEL
+
+
+def unit_cosine_dist(q_unit: np.ndarray, mat: np.ndarray) -> np.ndarray:
+    """
+    단위벡터 q 와 단위벡터 행렬 mat(N, D) 의 코사인 거리 (N,) = 1 - mat @ q.
+    """
+    global _NB_KERNEL
+    q = np.ascontiguousarray(q_unit, dtype=np.float32)
+    m = np.ascontiguousarray(mat, dtype=np.float32)
+    if USE_NUMBA:
+        kernel = _nb_kernel()
+        if kernel:
+            out = np.empty(m.shape[0], dtype=np.float32)
+            try:
+                # 첫 호출에서 실제 컴파일(lazy)이 일어난다
+                kernel(q, m, out)
+                return out
+            except Exception as e:
+                log.info("numba 커널 실행 실패 → NumPy 경로 사용: %s", e)
+                _NB_KERNEL = False
+    return 1.0 - m @ q
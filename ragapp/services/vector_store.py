@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import hashlib
+import heapq
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -228,6 +229,5 @@ def multi_query_by_embedding(
         except Exception as e:
             dbg[name] = {"error": str(e)}
 
-    # distance 오름차순 (작을수록 유사)
-    all_hits.sort(key=lambda x: x.get("distance", 1e9))
-    return {"hits": all_hits[:k], "debug": dbg}
+    # distance 오름차순 (작을수록 유사) 상위 k 개만
+    return {"hits": heapq.nsmallest(k, all_hits, key=lambda x: x.get("distance", 1e9)), "debug": dbg}
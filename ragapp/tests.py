@@ -1,3 +1,239 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from ragapp.services.utils import chunk_text_stream
+
+
+class ChunkTextStreamTests(SimpleTestCase):
+    def test_pieces_joined_with_single_newline(self):
+        # 빈/공백 조각은 건너뛰고, 조각 사이는 줄바꿈 하나로 잇는다
+        out = list(chunk_text_stream(["ab", "", "  ", "cd"], size=10, overlap=2))
+        self.assertEqual(out, ["ab\ncd"])
+
+    def test_chunk_spans_piece_boundary(self):
+        # 조각 경계를 넘는 청크도 전체 문자열을 자른 것과 같아야 한다
+        out = list(chunk_text_stream(["abc", "def"], size=4, overlap=1))
+        self.assertEqual(out, ["abc\n", "\ndef"])
+
+    def test_exact_size_buffer_has_no_extra_tail(self):
+        # 버퍼가 정확히 size 면 한 번만 내보내고, 겹침만 남은 꼬리는 버린다
+        out = list(chunk_text_stream(["abcd"], size=4, overlap=1))
+        self.assertEqual(out, ["abcd"])
+
+    def test_overlap_only_tail_is_dropped(self):
+        out = list(chunk_text_stream(["abcdefgh"], size=5, overlap=2))
+        self.assertEqual(out, ["abcde", "defgh"])
+
+    def test_tail_with_new_content_is_emitted(self):
+        out = list(chunk_text_stream(["abcdefghi"], size=5, overlap=2))
+        self.assertEqual(out, ["abcde", "defgh", "ghi"])
+
+    def test_empty_input(self):
+        self.assertEqual(list(chunk_text_stream([], size=5, overlap=2)), [])
+        self.assertEqual(list(chunk_text_stream(["", "   "], size=5, overlap=2)), [])
+
+
+class ChunkSpansTests(SimpleTestCase):
+    def _spans(self, t, size, overlap, **kw):
+        from ragapp.services.news_services import _chunk_spans
+
+        return list(_chunk_spans(t, size, overlap, **kw))
+
+    def _texts(self):
+        para = "문단 하나입니다. 문장이 이어집니다.\n"
+        return [
+            "",
+            "a" * 10,
+            "a" * 5000,  # 경계 없음 → 고정 길이
+            para * 200,
+            ("x" * 150 + "\n\n") * 40,
+            "." * 3000,  # 구분자가 촘촘해도 끝나야 한다
+            "\n" * 3000,
+        ]
+
+    def test_terminates_and_covers_text(self):
+        for t in self._texts():
+            for size, overlap in ((1600, 200), (100, 0), (100, 99), (300, 250)):
+                spans = self._spans(t, size, overlap)
+                if not t:
+                    self.assertEqual(spans, [])
+                    continue
+                self.assertEqual(spans[0][0], 0)
+                self.assertEqual(spans[-1][1], len(t))
+                self.assertLessEqual(len(spans), len(t))
+
+    def test_start_always_advances(self):
+        for t in self._texts():
+            for size, overlap in ((1600, 200), (100, 99), (300, 250)):
+                spans = self._spans(t, size, overlap)
+                for (a0, b0), (a1, b1) in zip(spans, spans[1:]):
+                    self.assertGreater(a1, a0)
+                    self.assertLessEqual(a1, b0)  # 다음 청크는 이전 청크와 맞닿거나 겹친다
+
+    def test_snap_stays_within_window(self):
+        from ragapp.services.news_services import _CHUNK_SNAP
+
+        for t in self._texts():
+            spans = self._spans(t, 1600, 200)
+            for a, b in spans[:-1]:
+                self.assertLessEqual(b, a + 1600)
+                self.assertGreaterEqual(b, a + 1600 - _CHUNK_SNAP)
+
+    def test_snap_prefers_paragraph_boundary(self):
+        t = ("x" * 1500 + "\n\n") * 3
+        a, b = self._spans(t, 1600, 200)[0]
+        self.assertEqual(t[a:b], "x" * 1500 + "\n\n")
+
+    def test_chunk_text_keeps_fixed_boundaries(self):
+        from ragapp.services.news_services import _chunk_text
+
+        t = ("x" * 1500 + "\n\n") * 3
+        s = t.strip()
+        expected = [s[o:o + 1600] for o in range(0, len(s) - 200, 1400)]
+        self.assertEqual(_chunk_text(t, 1600, 200), expected)
+
+
+@override_settings(CHROMA_COLLECTION="test_col")
+class ChromaCollectionCacheTests(SimpleTestCase):
+    def setUp(self):
+        from ragapp.services import chroma_store
+
+        self.cs = chroma_store
+        chroma_store.bust_collection_cache()
+        self.addCleanup(chroma_store.bust_collection_cache)
+        patcher = mock.patch.object(chroma_store, "_want_embed_dim", return_value=768)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_handle_is_cached(self):
+        with mock.patch.object(self.cs, "_resolve_collection", side_effect=[object(), object()]) as res:
+            first = self.cs.chroma_collection()
+            self.assertIs(self.cs.chroma_collection(), first)
+        self.assertEqual(res.call_count, 1)
+
+    def test_bust_cache_re_resolves_handle(self):
+        from ragapp.services.config_runtime import bust_cache
+
+        old, new = object(), object()
+        with mock.patch.object(self.cs, "_resolve_collection", side_effect=[old, new]) as res:
+            self.assertIs(self.cs.chroma_collection(), old)
+            bust_cache()
+            self.assertIs(self.cs.chroma_collection(), new)
+        self.assertEqual(res.call_count, 2)
+
+
+class MigrateChunkIdsTests(SimpleTestCase):
+    def test_legacy_ids_map_to_idhash(self):
+        from ragapp.management.commands.migrate_chunk_ids import _migrated_id
+        from ragapp.services.ingest import _idhash
+        from ragapp.services.utils import sha
+
+        q, u = "질문", "https://example.com/a"
+        self.assertEqual(
+            _migrated_id(f"answer:{sha(q)}:0", {"question": q}), f"answer:{_idhash(q)}:0"
+        )
+        self.assertEqual(
+            _migrated_id(f"news:title:{sha(u)}:meta", {"url": u}), f"news:title:{_idhash(u)}:meta"
+        )
+        self.assertEqual(
+            _migrated_id(f"anslink:example-com:{sha(u)}:3", {"url": u}),
+            f"anslink:example-com:{_idhash(u)}:3",
+        )
+
+    def test_other_ids_are_left_alone(self):
+        from ragapp.management.commands.migrate_chunk_ids import _migrated_id
+        from ragapp.services.ingest import _idhash
+
+        u = "https://example.com/a"
+        self.assertIsNone(_migrated_id(f"news:title:{_idhash(u)}:0", {"url": u}))  # 이미 옮김
+        self.assertIsNone(_migrated_id("news:title:deadbeef:0", {"url": u}))  # 해시 불일치
+        self.assertIsNone(_migrated_id("upload:abc", {}))
+
+
+class EmbedTextsParallelTests(SimpleTestCase):
+    def test_model_chosen_once_and_pinned_for_all_slices(self):
+        import numpy as np
+        from ragapp.services import gemini_client
+
+        calls = []
+
+        def fake(texts, models=None):
+            calls.append((list(texts), models))
+            # 첫 조각만 1순위 모델이 실패해 폴백 모델로 임베딩됐다고 가정
+            return [np.full(2, len(t), dtype=np.float32) for t in texts], (models or ["fallback"])[0]
+
+        with mock.patch.object(gemini_client, "embed_texts_with_model", side_effect=fake):
+            vecs, model = gemini_client.embed_texts_parallel(["a", "bb", "ccc", "dddd", "e"], batch=2)
+
+        self.assertEqual(model, "fallback")
+        self.assertEqual([int(v[0]) for v in vecs], [1, 2, 3, 4, 1])
+        self.assertIsNone(calls[0][1])
+        self.assertTrue(all(m == ["fallback"] for _, m in calls[1:]))
+
+    def test_pinned_slice_failure_fails_whole_call(self):
+        import numpy as np
+        from ragapp.services import gemini_client
+
+        def fake(texts, models=None):
+            if models is not None:
+                raise RuntimeError("primary down")
+            return [np.zeros(2, dtype=np.float32) for _ in texts], "primary"
+
+        with mock.patch.object(gemini_client, "embed_texts_with_model", side_effect=fake):
+            with self.assertRaises(RuntimeError):
+                gemini_client.embed_texts_parallel(["a", "b", "c"], batch=1)
+
+
+@override_settings(EMBED_CACHE_PATH=None, EMBED_CACHE_ENABLED=True)
+class EmbedWithCacheTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.dict("os.environ", {"EMBED_CACHE_PATH": f"{tmp.name}/ec.sqlite3"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake(self, model_of_call):
+        import numpy as np
+
+        calls = []
+
+        def embed_fn(texts):
+            model = model_of_call(len(calls))
+            calls.append(list(texts))
+            dim = 2 if model == "primary" else 3
+            return [np.full(dim, len(t), dtype=np.float32) for t in texts], model
+
+        return embed_fn, calls
+
+    def test_fallback_model_bypasses_cache_for_whole_batch(self):
+        from ragapp.services.embed_cache import embed_with_cache
+
+        # 1) 1순위 모델로 "a" 를 캐시에 넣어 둔다
+        fn, _ = self._fake(lambda i: "primary")
+        embed_with_cache(["a"], "primary", fn, returns_model=True)
+
+        # 2) 이번엔 폴백 모델이 쓰임 → 캐시 적중분("a")까지 폴백 모델로 다시 임베딩
+        fn, calls = self._fake(lambda i: "fallback")
+        vecs = embed_with_cache(["a", "bb"], "primary", fn, returns_model=True)
+        self.assertEqual([v.shape for v in vecs], [(3,), (3,)])
+        self.assertEqual(calls, [["bb"], ["a"]])
+
+        # 3) 폴백 결과는 캐시에 쓰이지 않았다
+        fn, calls = self._fake(lambda i: "primary")
+        vecs = embed_with_cache(["a", "bb"], "primary", fn, returns_model=True)
+        self.assertEqual([v.shape for v in vecs], [(2,), (2,)])
+        self.assertEqual(calls, [["bb"]])
+
+    def test_model_changing_again_raises(self):
+        from ragapp.services.embed_cache import embed_with_cache
+
+        fn, _ = self._fake(lambda i: "primary")
+        embed_with_cache(["a"], "primary", fn, returns_model=True)
+
+        fn, _ = self._fake(lambda i: "fallback" if i == 0 else "other")
+        with self.assertRaises(RuntimeError):
+            embed_with_cache(["a", "bb"], "primary", fn, returns_model=True)